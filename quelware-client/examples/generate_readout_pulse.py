@@ -52,7 +52,7 @@ from quelware_core.entities.instrument import (
 from quelware_core.entities.resource import ResourceId
 
 from quelware_client.client import create_quelware_client, create_standalone_client
-from quelware_client.client.helpers.sequencer import Sequencer
+from quelware_client.client.helpers.sequencer import Sequencer, shapes
 from quelware_client.core import QuelwareClient
 from quelware_client.core.instrument_driver import (
     create_instrument_driver_fixed_timeline,
@@ -126,8 +126,7 @@ async def run_readout(
             step_samples=inst_info.config.timeline_step_samples,
         )
 
-        n_samples = int(pulse_len_ns / sampling_period_ns)
-        seq.register_waveform("rect_pulse", np.ones(n_samples, dtype=complex))
+        shapes.register(seq, "rect_pulse", shapes.square, pulse_len_ns)
         seq.add_event(alias, "rect_pulse", start_offset_ns=0.0)
         seq.add_capture_window(
             alias,
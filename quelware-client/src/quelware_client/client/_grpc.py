@@ -1,7 +1,9 @@
 import logging
+from concurrent.futures import Executor
 
 from grpclib.client import Channel
 from quelware_core.entities.unit import UnitLabel
+from quelware_core.entities.waveform.sampled import IqEncoding
 
 from quelware_client.core import AgentContainer, AgentFactory, QuelwareClient
 from quelware_client.core.interfaces.diagnostics_agent import DiagnosticsAgent
@@ -49,10 +51,22 @@ def _create_default_resource_agent_factory(channel, pat: str):
     return _default_resource_agent_factory
 
 
-def _create_default_instrument_agent_factory(channel, pat: str):
+def _create_default_instrument_agent_factory(
+    channel,
+    pat: str,
+    iq_encoding: IqEncoding,
+    waveform_cache: bool,
+    encode_executor: Executor | None,
+    quantized_results: bool,
+):
     def _default_command_agent_factory(ul: UnitLabel):
         return InstrumentAgentGrpc(
-            channel, metadata={"x-unit-label": str(ul), "x-pat": pat}
+            channel,
+            metadata={"x-unit-label": str(ul), "x-pat": pat},
+            iq_encoding=iq_encoding,
+            waveform_cache=waveform_cache,
+            encode_executor=encode_executor,
+            quantized_results=quantized_results,
         )
 
     return _default_command_agent_factory
@@ -88,6 +102,10 @@ def create_quelware_client(  # noqa: PLR0913
     diagnostics_agent_factory: AgentFactory[DiagnosticsAgent] | None = None,
     worker_agent_factory: AgentFactory[WorkerAgent] | None = None,
     pat: PatProvider | str | None = None,
+    iq_encoding: IqEncoding = IqEncoding.LISTS,
+    waveform_cache: bool = False,
+    encode_executor: Executor | None = None,
+    quantized_results: bool = False,
 ) -> QuelwareClient:
     """Create a client connected to a QuEL system over gRPC.
 
@@ -114,6 +132,19 @@ def create_quelware_client(  # noqa: PLR0913
         pat: Personal Access Token used to authenticate. May be the token
             string, a callable returning it, or None to load it from the
             configuration file (``~/.config/quelware-client/pat``).
+        iq_encoding: Encoding of waveform samples sent by the default
+            instrument agents. Use a packed encoding only with servers that
+            support it.
+        waveform_cache: Make the default instrument agents upload each
+            waveform once per session and refer to it by digest afterwards,
+            so sweeps that only change offsets or gains resend no samples.
+            Requires server support.
+        encode_executor: Executor in which the default instrument agents
+            encode directives to protobuf, so large timelines do not block
+            the event loop. `None` encodes on the event loop.
+        quantized_results: Let the default instrument agents accept int16 and
+            int32 results. They are smaller but decode to complex64 and are
+            only exact for integer-valued data such as raw ADC counts.
 
     Returns:
         A configured, not-yet-started `QuelwareClient`.
@@ -140,7 +171,12 @@ def create_quelware_client(  # noqa: PLR0913
 
     if instrument_agent_factory is None:
         instrument_agent_factory = _create_default_instrument_agent_factory(
-            channel, _pat
+            channel,
+            _pat,
+            iq_encoding,
+            waveform_cache,
+            encode_executor,
+            quantized_results,
         )
 
     if diagnostics_agent_factory is None:
@@ -154,10 +190,18 @@ def create_quelware_client(  # noqa: PLR0913
     central_server_metadata = _CENTRAL_SERVER_METADATA_BASE | {"x-pat": _pat}
 
     agent_container = AgentContainer()
+    close_handlers = [channel.close]
     if session_agent is None:
         agent_container.session = SessionAgentGrpc(
             channel, metadata=central_server_metadata
         )
+        # Lease renewals get their own connection so that they are not queued
+        # behind large configure uploads on the shared one.
+        keepalive_channel = Channel(endpoint, port)
+        agent_container.keepalive_session = SessionAgentGrpc(
+            keepalive_channel, metadata=central_server_metadata
+        )
+        close_handlers.append(keepalive_channel.close)
     if configuration_agent is None:
         agent_container.system_configuration = SystemConfigurationAgentGrpc(
             channel, metadata=central_server_metadata
@@ -172,5 +216,5 @@ def create_quelware_client(  # noqa: PLR0913
         instrument_agent_factory=instrument_agent_factory,
         diagnostics_agent_factory=diagnostics_agent_factory,
         worker_agent_factory=worker_agent_factory,
-        close_handlers=[channel.close],
+        close_handlers=close_handlers,
     )
@@ -1,7 +1,9 @@
 import logging
+from concurrent.futures import Executor
 
 from grpclib.client import Channel
 from quelware_core.entities.unit import UnitLabel, UnitStatus
+from quelware_core.entities.waveform.sampled import IqEncoding
 
 from quelware_client.core import AgentContainer, QuelwareClient
 from quelware_client.core.interfaces.pat_provider import PatProvider
@@ -25,6 +27,10 @@ def create_standalone_client(
     unit_label: str = "mock-unit",
     skip_lock_check: bool = True,
     pat: PatProvider | str | None = None,
+    iq_encoding: IqEncoding = IqEncoding.LISTS,
+    waveform_cache: bool = False,
+    encode_executor: Executor | None = None,
+    quantized_results: bool = False,
 ) -> QuelwareClient:
     """Create a client that talks directly to a single worker server.
 
@@ -40,6 +46,14 @@ def create_standalone_client(
         skip_lock_check: When True (the default), sessions skip verifying that
             their resources are locked.
         pat: Personal Access Token, as accepted by `create_quelware_client()`.
+        iq_encoding: Encoding of waveform samples sent to the worker, as
+            accepted by `create_quelware_client()`.
+        waveform_cache: Upload each waveform once per session, as accepted by
+            `create_quelware_client()`.
+        encode_executor: Executor encoding directives to protobuf, as
+            accepted by `create_quelware_client()`.
+        quantized_results: Accept quantized results, as accepted by
+            `create_quelware_client()`.
 
     Returns:
         A configured, not-yet-started `QuelwareClient`.
@@ -69,7 +83,12 @@ def create_standalone_client(
 
     def instrument_agent_factory(ul: UnitLabel):
         return InstrumentAgentGrpc(
-            channel, metadata={"x-unit-label": str(ul), "x-pat": _pat}
+            channel,
+            metadata={"x-unit-label": str(ul), "x-pat": _pat},
+            iq_encoding=iq_encoding,
+            waveform_cache=waveform_cache,
+            encode_executor=encode_executor,
+            quantized_results=quantized_results,
         )
 
     def diagnostics_agent_factory(ul: UnitLabel):
@@ -1,39 +1,296 @@
+import asyncio
+import json
 import logging
 import math
+import os
+import tempfile
 from collections import defaultdict
-from dataclasses import dataclass
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from typing import TypeAlias
 
 import numpy as np
 import numpy.typing as npt
 from quelware_core.entities.directives import (
     CaptureWindow,
     SetFixedTimeline,
-    WaveformEvent,
+    WaveformEventTable,
+)
+from quelware_core.entities.instrument import FixedTimelineConfig
+from quelware_core.entities.waveform.ref import iq_waveform_digest
+from quelware_core.entities.waveform.sampled import IqArray, IqEncoding, IqWaveform
+from quelware_core.pb_converter.directive import directive_to_pb
+
+from quelware_client.core.timeline_footprint import (
+    TimelineFootprint,
+    TimelineLimits,
+    check_timeline_limits,
+    estimate_timeline_footprint,
 )
-from quelware_core.entities.waveform.sampled import IqArray, IqWaveform
 
 logger = logging.getLogger(__name__)
 
+_FS_PER_NS = 1_000_000
+
+# Saved sequencers: magic with format version, header length as a
+# little-endian uint64, JSON header, then raw array buffers aligned so they
+# can be viewed in place from a memory map.
+_FILE_MAGIC = b"QWSEQ\x00\x01\x00"
+_FILE_ALIGNMENT = 64
+
+
+class Femtoseconds(int):
+    """An exact time in femtoseconds.
+
+    Times given as `Femtoseconds` are converted to samples with integer
+    arithmetic, so they stay exact on arbitrarily long timelines where
+    nanosecond floats lose precision.
+    """
+
+    @classmethod
+    def from_ns(cls, ns: float) -> "Femtoseconds":
+        """Round a time in nanoseconds to the nearest femtosecond."""
+        return cls(round(ns * _FS_PER_NS))
+
+    @classmethod
+    def from_us(cls, us: float) -> "Femtoseconds":
+        """Round a time in microseconds to the nearest femtosecond."""
+        return cls(round(us * 1000 * _FS_PER_NS))
+
+
+class Samples(int):
+    """A time in samples of the sampling period bound to the target alias."""
+
+
+@dataclass(frozen=True)
+class FemtosecondArray:
+    """Exact times in femtoseconds, for the bulk scheduling methods."""
+
+    values: npt.NDArray[np.int64]
+
+    @classmethod
+    def from_ns(cls, ns: npt.ArrayLike) -> "FemtosecondArray":
+        """Round times in nanoseconds to the nearest femtoseconds."""
+        return cls(
+            np.rint(np.asarray(ns, dtype=np.float64) * _FS_PER_NS).astype(np.int64)
+        )
+
+
+@dataclass(frozen=True)
+class SampleArray:
+    """Times in samples of the target alias, for the bulk scheduling methods."""
+
+    values: npt.NDArray[np.int64]
 
-@dataclass
-class _SequencerEvent:
-    waveform_name: str
-    start_offset_ns: float
-    gain: float
-    phase_offset_deg: float
+
+Time: TypeAlias = float | Femtoseconds | Samples
+"""A time in nanoseconds (plain numbers), femtoseconds or samples."""
+
+TimeArray: TypeAlias = npt.ArrayLike | FemtosecondArray | SampleArray
+"""Times in nanoseconds (plain arrays), femtoseconds or samples."""
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """A named slot filled in per point by a `TimelineTemplate`.
+
+    Pass it to `Sequencer.add_event` in place of a start offset, gain or
+    phase offset.
+    """
+
+    name: str
+
+
+_PARAMETER_FIELDS = ("start_offsets_samples", "gains", "phase_offsets_deg")
+
+# Per storage dtype: decimals kept when hashing normalized envelopes, so
+# scalar multiples that differ by rounding errors share a key, and the
+# relative and absolute tolerances confirming a match.
+_SCALAR_MULTIPLE_MATCHING = {
+    np.dtype(np.complex128): (12, 1e-9, 1e-12),
+    np.dtype(np.complex64): (4, 1e-5, 1e-6),
+}
+
+
+def _peak_power(iq_array: IqArray) -> float:
+    """Return the largest squared magnitude in one pass over the samples."""
+    if iq_array.size == 0:
+        return 0.0
+    interleaved = np.ascontiguousarray(iq_array).view(iq_array.real.dtype)
+    components = interleaved.reshape(-1, 2)
+    return float(np.max(np.einsum("ij,ij->i", components, components)))
+
+
+def _time_to_fs(time: float | Femtoseconds) -> int:
+    if isinstance(time, Femtoseconds):
+        return int(time)
+    return round(time * _FS_PER_NS)
+
+
+_MAX_REPORTED_OVERLAPS = 10
+
+
+def _find_overlaps(
+    starts: npt.NDArray[np.int64], ends: npt.NDArray[np.int64]
+) -> list[tuple[int, int]]:
+    """Return ``(later, earlier)`` index pairs of overlapping intervals.
+
+    Intervals are half-open ``[start, end)``. Sorting by start and tracking
+    the running maximum end finds every interval that begins before an
+    earlier one has ended, in O(n log n). Each reported interval is paired
+    with the earlier interval that reaches furthest.
+    """
+    if len(starts) < 2:
+        return []
+    order = np.argsort(starts, kind="stable")
+    sorted_starts = starts[order]
+    sorted_ends = ends[order]
+    running_end = np.maximum.accumulate(sorted_ends)
+    positions = np.arange(len(order))
+    owner = np.maximum.accumulate(np.where(sorted_ends == running_end, positions, 0))
+    overlapping = np.flatnonzero(sorted_starts[1:] < running_end[:-1]) + 1
+    return [(int(order[i]), int(order[owner[i - 1]])) for i in overlapping.tolist()]
+
+
+def _describe_time(time: Time) -> str:
+    match time:
+        case Samples():
+            return f"{int(time)} samples"
+        case Femtoseconds():
+            return f"{int(time)} fs"
+        case _:
+            return f"{time} ns"
+
+
+class _EventTable:
+    """Growable struct-of-arrays storage of the events scheduled on one alias.
+
+    Columns are views of preallocated buffers that double in capacity when
+    full, so appending is amortized O(1) and export works on whole columns.
+    """
+
+    def __init__(self):
+        self._size = 0
+        self._waveform_ids = np.empty(0, dtype=np.int64)
+        self._start_offsets_samples = np.empty(0, dtype=np.int64)
+        self._gains = np.empty(0, dtype=np.float64)
+        self._phase_offsets_deg = np.empty(0, dtype=np.float64)
+
+    @classmethod
+    def from_columns(
+        cls,
+        waveform_ids: npt.NDArray[np.int64],
+        start_offsets_samples: npt.NDArray[np.int64],
+        gains: npt.NDArray[np.float64],
+        phase_offsets_deg: npt.NDArray[np.float64],
+    ) -> "_EventTable":
+        """Wrap full columns, such as read-only views, without copying.
+
+        The first append moves the columns to new, growable buffers.
+        """
+        table = cls()
+        table._size = len(waveform_ids)
+        table._waveform_ids = waveform_ids
+        table._start_offsets_samples = start_offsets_samples
+        table._gains = gains
+        table._phase_offsets_deg = phase_offsets_deg
+        return table
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def waveform_ids(self) -> npt.NDArray[np.int64]:
+        return self._waveform_ids[: self._size]
+
+    @property
+    def start_offsets_samples(self) -> npt.NDArray[np.int64]:
+        return self._start_offsets_samples[: self._size]
+
+    @property
+    def gains(self) -> npt.NDArray[np.float64]:
+        return self._gains[: self._size]
+
+    @property
+    def phase_offsets_deg(self) -> npt.NDArray[np.float64]:
+        return self._phase_offsets_deg[: self._size]
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._waveform_ids):
+            return
+        capacity = max(capacity, 2 * len(self._waveform_ids), 16)
+        for attr in (
+            "_waveform_ids",
+            "_start_offsets_samples",
+            "_gains",
+            "_phase_offsets_deg",
+        ):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, attr, new)
+
+    def append(
+        self,
+        waveform_id: int,
+        start_offset_samples: int,
+        gain: float,
+        phase_offset_deg: float,
+    ):
+        self._reserve(self._size + 1)
+        i = self._size
+        self._waveform_ids[i] = waveform_id
+        self._start_offsets_samples[i] = start_offset_samples
+        self._gains[i] = gain
+        self._phase_offsets_deg[i] = phase_offset_deg
+        self._size += 1
+
+    def extend(
+        self,
+        waveform_ids: npt.NDArray[np.int64],
+        start_offsets_samples: npt.NDArray[np.int64],
+        gains: npt.NDArray[np.float64],
+        phase_offsets_deg: npt.NDArray[np.float64],
+    ):
+        n = len(waveform_ids)
+        if n == 0:
+            # Loaded columns are read-only; even an empty write would fail.
+            return
+        self._reserve(self._size + n)
+        end = self._size + n
+        self._waveform_ids[self._size : end] = waveform_ids
+        self._start_offsets_samples[self._size : end] = start_offsets_samples
+        self._gains[self._size : end] = gains
+        self._phase_offsets_deg[self._size : end] = phase_offsets_deg
+        self._size = end
 
 
 @dataclass
 class _SequencerCaptureWindow:
     name: str
-    start_offset_ns: float
-    length_ns: float
+    start_offset_samples: int
+    length_samples: int
 
 
 @dataclass
 class _Waveform:
-    sampling_period_ns: float
+    sampling_period_fs: int
     iq_array: IqArray
+    _shared: IqWaveform | None = None
+
+    def as_iq_waveform(self) -> IqWaveform:
+        """Return the same `IqWaveform` for every export, keeping its digest."""
+        shared = self._shared
+        if (
+            shared is None
+            or shared.iq_array is not self.iq_array
+            or shared.sampling_period_fs != self.sampling_period_fs
+        ):
+            shared = self._shared = IqWaveform(
+                sampling_period_fs=self.sampling_period_fs, iq_array=self.iq_array
+            )
+        return shared
 
 
 @dataclass
@@ -42,40 +299,204 @@ class _AliasBinding:
     step_samples: int
 
 
+class TimelineTemplate:
+    """A fixed timeline with parameter slots, built once and patched per point.
+
+    Obtained from `Sequencer.template()`. Each directive produced by
+    `instantiate()` or `sweep()` shares the waveform library, capture
+    windows and unpatched event columns of the template; only the columns
+    that hold parameters are copied and patched, so producing a point costs
+    O(events) with no sequencer rebuild.
+    """
+
+    def __init__(
+        self,
+        directive: SetFixedTimeline,
+        slots: Mapping[str, Mapping[str, npt.NDArray[np.intp]]],
+        offset_to_samples: Callable[[Time], int],
+        end_samples_after_offset: npt.NDArray[np.int64],
+        gain_scales: npt.NDArray[np.float64],
+        phase_shifts_deg: npt.NDArray[np.float64],
+    ):
+        if not isinstance(directive.events, WaveformEventTable):
+            raise TypeError("A template needs a directive with a WaveformEventTable.")
+        self._directive = directive
+        self._events: WaveformEventTable = directive.events
+        self._slots = slots
+        self._offset_to_samples = offset_to_samples
+        self._end_samples_after_offset = end_samples_after_offset
+        # Per-event factors of waveforms stored as multiples of a shared entry.
+        self._gain_scales = gain_scales
+        self._phase_shifts_deg = phase_shifts_deg
+
+    @property
+    def parameters(self) -> list[str]:
+        """Names of the parameters, in order of first use."""
+        return list(self._slots)
+
+    def instantiate(self, **values: Time) -> SetFixedTimeline:
+        """Return the directive with every parameter set to the given value.
+
+        Start offset parameters take the same time forms as
+        `Sequencer.add_event`; gains and phase offsets take numbers.
+
+        Raises:
+            ValueError: If a parameter is missing or unknown, or an offset is
+                off the sample grid or moves an event past the timeline end.
+        """
+        missing = [name for name in self._slots if name not in values]
+        unknown = [name for name in values if name not in self._slots]
+        if missing or unknown:
+            raise ValueError(
+                f"Template parameters mismatch: missing {missing}, unknown {unknown}."
+            )
+
+        events = self._events
+        columns = {field: getattr(events, field) for field in _PARAMETER_FIELDS}
+        copied: set[str] = set()
+        for name, fields in self._slots.items():
+            for field, rows in fields.items():
+                if field not in copied:
+                    columns[field] = columns[field].copy()
+                    copied.add(field)
+                value = values[name]
+                if field == "start_offsets_samples":
+                    columns[field][rows] = self._offset_to_samples(value)
+                elif field == "gains":
+                    columns[field][rows] = value * self._gain_scales[rows]
+                else:
+                    columns[field][rows] = value + self._phase_shifts_deg[rows]
+
+        if "start_offsets_samples" in copied:
+            ends = columns["start_offsets_samples"] + self._end_samples_after_offset
+            if len(ends) and int(ends.max()) > self._directive.length:
+                raise ValueError(
+                    f"Offsets {values} move an event past the timeline end "
+                    f"({self._directive.length} samples). Reserve room with "
+                    "Sequencer.extend_length_ns()."
+                )
+
+        return replace(
+            self._directive,
+            events=WaveformEventTable(
+                waveform_indices=events.waveform_indices, **columns
+            ),
+        )
+
+    def sweep(self, **values: TimeArray) -> Iterator[SetFixedTimeline]:
+        """Yield one directive per point of the broadcast parameter arrays.
+
+        Start offset parameters take the forms of `Sequencer.add_events`,
+        including `FemtosecondArray` and `SampleArray`, and sequences of
+        `Femtoseconds` or `Samples`; each point is converted as in
+        `instantiate()`.
+        """
+        names = list(values)
+        arrays = np.broadcast_arrays(*(_sweep_axis(values[n]) for n in names))
+        for point in zip(*(a.reshape(-1).tolist() for a in arrays), strict=True):
+            yield self.instantiate(**dict(zip(names, point, strict=True)))
+
+
+def _sweep_axis(values: TimeArray) -> npt.NDArray[np.object_]:
+    """Return ``values`` as an object array that keeps the time wrappers."""
+    if isinstance(values, SampleArray | FemtosecondArray):
+        unit = Samples if isinstance(values, SampleArray) else Femtoseconds
+        raw = np.asarray(values.values, dtype=np.int64)
+        axis = np.empty(raw.shape, dtype=object)
+        axis.flat[:] = [unit(v) for v in raw.reshape(-1).tolist()]
+        return axis
+    return np.asarray(values, dtype=object)
+
+
+@dataclass
+class _CompiledTimeline:
+    directive: SetFixedTimeline
+    waveform_ids: frozenset[int]
+
+
 class Sequencer:
     """Build fixed timelines of waveform events and capture windows.
 
     Waveforms are registered by name and then scheduled on instruments at
-    nanosecond offsets, alongside capture windows. Each instrument alias is
-    bound to its hardware sampling period so offsets and lengths can be
-    validated against the sample grid and converted to samples. The assembled
-    timeline for an instrument is exported as a `SetFixedTimeline` directive.
+    given offsets, alongside capture windows. Each instrument alias is bound
+    to its hardware sampling period so offsets and lengths can be validated
+    against the sample grid and converted to samples when they are added.
+    The assembled timeline for an instrument is exported as a
+    `SetFixedTimeline` directive.
+
+    Exported directives are cached per alias and rebuilt only when the
+    alias's events, capture windows, binding or used waveforms change, so
+    re-exporting a large sequencer after a small edit is cheap. Callers must
+    not mutate the returned directives.
+
+    Times are nanoseconds when given as plain numbers. Wrap them in
+    `Femtoseconds` or `Samples` (`FemtosecondArray` or `SampleArray` for the
+    bulk methods) for exact integer timing.
     """
 
     def __init__(
-        self, default_sampling_period_ns: float, enforce_sample_grid: bool = True
+        self,
+        default_sampling_period_ns: float | Femtoseconds,
+        enforce_sample_grid: bool = True,
+        dedupe_scalar_multiples: bool = False,
+        strict_overlaps: bool = False,
+        iq_dtype: type[np.complex128] | type[np.complex64] = np.complex128,
     ):
         """Create a sequencer.
 
         Args:
-            default_sampling_period_ns: Sampling period, in nanoseconds, used
-                for waveforms registered without an explicit period.
+            default_sampling_period_ns: Sampling period, in nanoseconds or as
+                `Femtoseconds`, used for waveforms registered without an
+                explicit period.
             enforce_sample_grid: When True, offsets and lengths that do not
                 land on the sample grid raise `ValueError`; when False, they
                 are rounded to the nearest sample with a warning.
+            dedupe_scalar_multiples: When True, waveforms that are complex
+                scalar multiples of each other share one library entry, and
+                the factor is applied through the event gain and phase offset.
+                Identical waveforms are always shared.
+            strict_overlaps: When True, exporting an alias whose events or
+                capture windows overlap raises `ValueError`; when False, the
+                overlaps are logged as a warning.
+            iq_dtype: Storage dtype of registered waveforms. `np.complex64`
+                halves the memory of large libraries; the samples are sent
+                as they are stored.
         """
-        self._waveform_library: dict[str, _Waveform] = {}
-        self._alias_to_events: dict[str, list[_SequencerEvent]] = defaultdict(list)
+        # Registration order of waveform names; event tables store positions.
+        self._waveform_names: list[str] = []
+        self._waveform_ids: dict[str, int] = {}
+        # Distinct waveform contents. Each name refers to an entry and the
+        # complex factor that turns the entry into the registered waveform.
+        self._entries: list[_Waveform] = []
+        self._entry_ids: dict[bytes, int] = {}
+        self._entry_of_name: list[int] = []
+        self._scale_of_name: list[complex] = []
+        self._dedupe_scalar_multiples = dedupe_scalar_multiples
+        self._iq_dtype = np.dtype(iq_dtype)
+        self._alias_to_events: dict[str, _EventTable] = defaultdict(_EventTable)
         self._alias_to_capwin: dict[str, list[_SequencerCaptureWindow]] = defaultdict(
             list
         )
 
-        self._default_sampling_period_ns: float = default_sampling_period_ns
+        self._default_sampling_period_fs: int = _time_to_fs(default_sampling_period_ns)
         self._iterations: int = 1
 
         self._bindings: dict[str, _AliasBinding] = {}
         self._enforce_sample_grid: bool = enforce_sample_grid
-        self._length_ns: float = 0.0
+        self._strict_overlaps: bool = strict_overlaps
+        self._length_fs: int = 0
+
+        # Parameter name -> event column -> rows holding the parameter.
+        self._alias_to_slots: dict[str, dict[str, dict[str, list[int]]]] = defaultdict(
+            dict
+        )
+
+        self._compiled: dict[str, _CompiledTimeline] = {}
+        self._lcm_step_fs: int | None = None
+        self._encoded_directives: dict[str, npt.NDArray[np.uint8]] = {}
+
+    def _invalidate(self, alias: str):
+        self._compiled.pop(alias, None)
 
     def bind(self, alias: str, sampling_period_fs: int, step_samples: int):
         """Bind an instrument alias to its hardware timing.
@@ -88,29 +509,56 @@ class Sequencer:
                 femtoseconds.
             step_samples: Granularity, in samples, that the timeline length is
                 aligned to for this alias.
+
+        Raises:
+            ValueError: If the alias already has events or capture windows
+                and the timing differs from its current binding.
         """
-        self._bindings[alias] = _AliasBinding(
+        binding = _AliasBinding(
             sampling_period_fs=sampling_period_fs,
             step_samples=step_samples,
         )
+        has_content = self._alias_to_events.get(alias) or self._alias_to_capwin.get(
+            alias
+        )
+        if has_content and self._bindings[alias] != binding:
+            raise ValueError(
+                f"Alias '{alias}' already has scheduled events or capture windows "
+                "and cannot be rebound to a different timing."
+            )
+        if self._bindings.get(alias) != binding:
+            self._bindings[alias] = binding
+            self._invalidate(alias)
+            self._lcm_step_fs = None
 
-    def _check_and_convert_to_samples(
-        self, alias: str, time_ns: float, name_for_log: str
-    ) -> int:
+    def _sampling_period_fs(self, alias: str) -> int:
         if alias not in self._bindings:
             raise ValueError(
                 f"Alias '{alias}' is not bound to the sequencer. Call bind() first."
             )
+        return self._bindings[alias].sampling_period_fs
 
-        period_fs = self._bindings[alias].sampling_period_fs
-        time_fs = time_ns * 1e6
-        samples = time_fs / period_fs
-        rounded_samples = round(samples)
+    def _check_and_convert_to_samples(
+        self, alias: str, time: Time, name_for_log: str
+    ) -> int:
+        period_fs = self._sampling_period_fs(alias)
+        if isinstance(time, Samples):
+            return int(time)
 
-        if abs(samples - rounded_samples) > 0.001:
+        if isinstance(time, Femtoseconds):
+            rounded_samples, remainder = divmod(int(time), period_fs)
+            if 2 * remainder >= period_fs:
+                rounded_samples += 1
+            on_grid = remainder == 0
+        else:
+            samples = time * _FS_PER_NS / period_fs
+            rounded_samples = round(samples)
+            on_grid = abs(samples - rounded_samples) <= 0.001
+
+        if not on_grid:
             msg = (
-                f"{name_for_log} ({time_ns} ns) is not a multiple of sampling period "
-                f"({period_fs} fs) for alias '{alias}'. Calculated samples: {samples}"
+                f"{name_for_log} ({_describe_time(time)}) is not a multiple of "
+                f"sampling period ({period_fs} fs) for alias '{alias}'"
             )
             if self._enforce_sample_grid:
                 raise ValueError(msg)
@@ -119,47 +567,180 @@ class Sequencer:
 
         return rounded_samples
 
+    def _check_and_convert_array_to_samples(
+        self, alias: str, times: TimeArray, name_for_log: str
+    ) -> npt.NDArray[np.int64]:
+        (samples,) = self._check_and_convert_arrays_to_samples(
+            alias, (times, name_for_log)
+        )
+        return samples
+
+    def _check_and_convert_arrays_to_samples(
+        self, alias: str, *named_times: tuple[TimeArray, str]
+    ) -> list[npt.NDArray[np.int64]]:
+        """Convert arrays to samples, reporting every off-grid element at once."""
+        period_fs = self._sampling_period_fs(alias)
+        converted = []
+        problems = []
+        for times, name_for_log in named_times:
+            if isinstance(times, SampleArray):
+                converted.append(np.asarray(times.values, dtype=np.int64).reshape(-1))
+                continue
+
+            if isinstance(times, FemtosecondArray):
+                values = np.asarray(times.values, dtype=np.int64).reshape(-1)
+                rounded_samples, remainder = np.divmod(values, period_fs)
+                rounded_samples += 2 * remainder >= period_fs
+                off_grid = np.flatnonzero(remainder)
+                unit = "fs"
+            else:
+                values = np.asarray(times, dtype=np.float64).reshape(-1)
+                samples = values * _FS_PER_NS / period_fs
+                rounded_samples = np.rint(samples).astype(np.int64)
+                off_grid = np.flatnonzero(np.abs(samples - rounded_samples) > 0.001)
+                unit = "ns"
+            converted.append(rounded_samples)
+
+            if len(off_grid):
+                elements = ", ".join(
+                    f"[{i}] {values[i]} {unit}" for i in off_grid.tolist()
+                )
+                problems.append(f"{len(off_grid)} {name_for_log} value(s): {elements}")
+
+        if problems:
+            msg = (
+                f"Values are not multiples of sampling period ({period_fs} fs) "
+                f"for alias '{alias}': " + "; ".join(problems)
+            )
+            if self._enforce_sample_grid:
+                raise ValueError(msg)
+            else:
+                logger.warning(f"{msg}. Rounding to the nearest samples.")
+
+        return converted
+
     def register_waveform(
         self,
         name: str,
         waveform: npt.ArrayLike,
-        sampling_period_ns: float | None = None,
+        sampling_period_ns: float | Femtoseconds | None = None,
     ):
         """Register a named IQ waveform.
 
+        A C-contiguous array of the sequencer's ``iq_dtype`` is stored as a
+        read-only view without copying, so it must not be modified after
+        registration. Other inputs are converted to a new array.
+
+        Waveforms with the same content as an earlier one (or a scalar
+        multiple of it, see ``dedupe_scalar_multiples``) share its library
+        entry, so they are exported and uploaded once.
+
         Args:
             name: Name used to reference the waveform in `add_event()`.
             waveform: Complex IQ samples; every amplitude must lie within
                 ``[-1, 1]``.
             sampling_period_ns: Sampling period of the waveform, in
-                nanoseconds. Defaults to the sequencer's default period.
+                nanoseconds or as `Femtoseconds`. Defaults to the sequencer's
+                default period.
 
         Raises:
             ValueError: If any sample amplitude exceeds 1 in magnitude.
         """
         if sampling_period_ns is None:
-            sampling_period_ns = self._default_sampling_period_ns
-        if np.any(np.abs(waveform) > 1):
+            sampling_period_fs = self._default_sampling_period_fs
+        else:
+            sampling_period_fs = _time_to_fs(sampling_period_ns)
+        iq_array = np.asarray(waveform)
+        if iq_array.dtype != self._iq_dtype or not iq_array.flags.c_contiguous:
+            iq_array = np.ascontiguousarray(iq_array, dtype=self._iq_dtype)
+        if _peak_power(iq_array) > 1:
             raise ValueError("The amplitude must be in the range -1 to 1.")
-        self._waveform_library[name] = _Waveform(
-            sampling_period_ns=sampling_period_ns,
-            iq_array=np.array(waveform, dtype=complex),
+        iq_array = iq_array.view()
+        iq_array.flags.writeable = False
+
+        entry_id, scale = self._find_or_add_entry(sampling_period_fs, iq_array)
+        if name not in self._waveform_ids:
+            self._waveform_ids[name] = len(self._waveform_names)
+            self._waveform_names.append(name)
+            self._entry_of_name.append(entry_id)
+            self._scale_of_name.append(scale)
+        else:
+            waveform_id = self._waveform_ids[name]
+            self._entry_of_name[waveform_id] = entry_id
+            self._scale_of_name[waveform_id] = scale
+            self._invalidate_waveforms({waveform_id})
+
+    def _invalidate_waveforms(self, waveform_ids: set[int]):
+        for alias, compiled in list(self._compiled.items()):
+            if not waveform_ids.isdisjoint(compiled.waveform_ids):
+                self._invalidate(alias)
+
+    def _find_or_add_entry(
+        self, sampling_period_fs: int, iq_array: IqArray
+    ) -> tuple[int, complex]:
+        """Return the library entry holding ``iq_array`` and its scale factor."""
+        if not self._dedupe_scalar_multiples:
+            key = iq_waveform_digest(
+                IqWaveform(sampling_period_fs, iq_array), IqEncoding.LISTS
+            )
+            if key not in self._entry_ids:
+                self._entry_ids[key] = len(self._entries)
+                self._entries.append(_Waveform(sampling_period_fs, iq_array))
+            return self._entry_ids[key], 1.0
+
+        # Normalize by the peak sample so that multiples share the key.
+        peak = int(np.argmax(np.abs(iq_array))) if len(iq_array) else 0
+        pivot = iq_array[peak] if len(iq_array) else 0j
+        normalized = iq_array / pivot if pivot != 0 else iq_array
+        decimals, rtol, atol = _SCALAR_MULTIPLE_MATCHING[self._iq_dtype]
+        normalized = np.round(normalized, decimals) + 0.0
+        key = iq_waveform_digest(
+            IqWaveform(sampling_period_fs, normalized), IqEncoding.LISTS
         )
+        entry_id = self._entry_ids.get(key)
+        if entry_id is None:
+            self._entry_ids[key] = len(self._entries)
+            self._entries.append(_Waveform(sampling_period_fs, iq_array))
+            return len(self._entries) - 1, 1.0
+
+        entry = self._entries[entry_id]
+        scale = complex(pivot / entry.iq_array[peak]) if pivot != 0 else 1.0
+        if not np.allclose(scale * entry.iq_array, iq_array, rtol=rtol, atol=atol):
+            # Hash collision of the rounded envelopes; keep a separate entry.
+            self._entries.append(_Waveform(sampling_period_fs, iq_array))
+            return len(self._entries) - 1, 1.0
+        if abs(scale) > 1:
+            # Store the largest multiple so that every gain stays within 1.
+            entry.iq_array = iq_array
+            sharing = {i for i, e in enumerate(self._entry_of_name) if e == entry_id}
+            for i in sharing:
+                self._scale_of_name[i] /= scale
+            self._invalidate_waveforms(sharing)
+            scale = 1.0
+        return entry_id, scale
+
+    def _waveform_duration_fs(self, waveform_id: int) -> int:
+        waveform = self._entries[self._entry_of_name[waveform_id]]
+        return len(waveform.iq_array) * waveform.sampling_period_fs
 
     def add_event(
         self,
         instrument_alias: str,
         waveform_name: str,
-        start_offset_ns: float,
-        gain: float = 1.0,
-        phase_offset_deg: float = 0.0,
+        start_offset_ns: Time | Parameter,
+        gain: float | Parameter = 1.0,
+        phase_offset_deg: float | Parameter = 0.0,
     ):
         """Schedule a registered waveform on an instrument.
 
+        Any of the start offset, gain and phase offset may be a `Parameter`,
+        which makes the alias a template to be exported with `template()`.
+
         Args:
             instrument_alias: Alias of the (bound) target instrument.
             waveform_name: Name of a registered waveform.
-            start_offset_ns: Start time of the event, in nanoseconds.
+            start_offset_ns: Start time of the event, in nanoseconds, or as
+                `Femtoseconds` or `Samples`.
             gain: Linear gain applied to the waveform.
             phase_offset_deg: Phase offset applied to the waveform, in degrees.
 
@@ -167,67 +748,247 @@ class Sequencer:
             ValueError: If the waveform is not registered, or the offset is off
                 the sample grid while grid enforcement is on.
         """
-        if waveform_name not in self._waveform_library:
+        if waveform_name not in self._waveform_ids:
             raise ValueError(f"waveform '{waveform_name}' is not registered.")
 
-        self._check_and_convert_to_samples(
-            instrument_alias, start_offset_ns, "Event start_offset_ns"
+        slots = {
+            field: value
+            for field, value in zip(
+                _PARAMETER_FIELDS,
+                (start_offset_ns, gain, phase_offset_deg),
+                strict=True,
+            )
+            if isinstance(value, Parameter)
+        }
+        if isinstance(start_offset_ns, Parameter):
+            self._sampling_period_fs(instrument_alias)
+            start_offset_samples = 0
+        else:
+            start_offset_samples = self._check_and_convert_to_samples(
+                instrument_alias, start_offset_ns, "Event start_offset_ns"
+            )
+
+        waveform_id = self._waveform_ids[waveform_name]
+        table = self._alias_to_events[instrument_alias]
+        alias_slots = self._alias_to_slots[instrument_alias]
+        for field, parameter in slots.items():
+            rows = alias_slots.setdefault(parameter.name, {}).setdefault(field, [])
+            rows.append(len(table))
+        table.append(
+            waveform_id,
+            start_offset_samples,
+            1.0 if isinstance(gain, Parameter) else gain,
+            0.0 if isinstance(phase_offset_deg, Parameter) else phase_offset_deg,
         )
+        self._invalidate(instrument_alias)
 
-        event = _SequencerEvent(
-            waveform_name=waveform_name,
-            start_offset_ns=start_offset_ns,
-            gain=gain,
-            phase_offset_deg=phase_offset_deg,
+        period_fs = self._bindings[instrument_alias].sampling_period_fs
+        end_at_fs = start_offset_samples * period_fs + self._waveform_duration_fs(
+            waveform_id
         )
-        self._alias_to_events[instrument_alias].append(event)
+        self._length_fs = max(self._length_fs, end_at_fs)
 
-        waveform = self._waveform_library[waveform_name]
-        end_at_ns = (
-            start_offset_ns + len(waveform.iq_array) * waveform.sampling_period_ns
+    def add_events(
+        self,
+        instrument_alias: str,
+        waveforms: Sequence[str] | npt.ArrayLike,
+        start_offsets_ns: TimeArray,
+        gains: npt.ArrayLike = 1.0,
+        phase_offsets_deg: npt.ArrayLike = 0.0,
+    ):
+        """Schedule many registered waveforms on an instrument at once.
+
+        Equivalent to calling `add_event()` for each element, but the whole
+        batch is validated in one vectorized pass and nothing is added if any
+        element is invalid.
+
+        Args:
+            instrument_alias: Alias of the (bound) target instrument.
+            waveforms: Waveform names, or integer positions in
+                `waveform_names`, one per event.
+            start_offsets_ns: Start times of the events, in nanoseconds, or as
+                a `FemtosecondArray` or `SampleArray`.
+            gains: Linear gains, one per event or a single value for all.
+            phase_offsets_deg: Phase offsets in degrees, one per event or a
+                single value for all.
+
+        Raises:
+            ValueError: If the arrays differ in length, a waveform is not
+                registered, or offsets are off the sample grid while grid
+                enforcement is on. The message lists every offending element.
+        """
+        waveform_ids = self._resolve_waveform_ids(waveforms)
+        offsets = self._check_and_convert_array_to_samples(
+            instrument_alias, start_offsets_ns, "Event start_offset_ns"
+        )
+        try:
+            offsets, gains_arr, phases = np.broadcast_arrays(
+                offsets,
+                np.asarray(gains, dtype=np.float64),
+                np.asarray(phase_offsets_deg, dtype=np.float64),
+            )
+        except ValueError as e:
+            raise ValueError(f"Event arrays have mismatched lengths: {e}") from e
+        if len(waveform_ids) != len(offsets):
+            raise ValueError(
+                f"Got {len(waveform_ids)} waveforms for {len(offsets)} offsets."
+            )
+
+        self._alias_to_events[instrument_alias].extend(
+            waveform_ids, offsets, gains_arr, phases
+        )
+        self._invalidate(instrument_alias)
+
+        if len(offsets):
+            durations_fs = np.array(
+                [
+                    self._waveform_duration_fs(i)
+                    for i in range(len(self._waveform_names))
+                ],
+                dtype=np.int64,
+            )
+            period_fs = self._bindings[instrument_alias].sampling_period_fs
+            end_at_fs = int(np.max(offsets * period_fs + durations_fs[waveform_ids]))
+            self._length_fs = max(self._length_fs, end_at_fs)
+
+    def _resolve_waveform_ids(
+        self, waveforms: Sequence[str] | npt.ArrayLike
+    ) -> npt.NDArray[np.int64]:
+        array = np.asarray(waveforms).reshape(-1)
+        if array.dtype.kind in "iu":
+            unknown = np.flatnonzero((array < 0) | (array >= len(self._waveform_names)))
+            if len(unknown):
+                raise ValueError(
+                    "waveform indices are not registered: "
+                    + ", ".join(f"[{i}] {array[i]}" for i in unknown.tolist())
+                )
+            return array.astype(np.int64)
+
+        names = array.tolist()
+        unknown = [
+            (i, name) for i, name in enumerate(names) if name not in self._waveform_ids
+        ]
+        if unknown:
+            raise ValueError(
+                "waveforms are not registered: "
+                + ", ".join(f"[{i}] '{name}'" for i, name in unknown)
+            )
+        return np.fromiter(
+            (self._waveform_ids[name] for name in names),
+            dtype=np.int64,
+            count=len(names),
         )
-        self._length_ns = max(self._length_ns, end_at_ns)
 
     def add_capture_window(
         self,
         instrument_alias: str,
         window_name: str,
-        start_offset_ns: float,
-        length_ns: float,
+        start_offset_ns: Time,
+        length_ns: Time,
     ):
         """Schedule a capture window on an instrument.
 
         Args:
             instrument_alias: Alias of the (bound) target instrument.
             window_name: Name of the capture window.
-            start_offset_ns: Start time of the window, in nanoseconds.
-            length_ns: Length of the window, in nanoseconds.
+            start_offset_ns: Start time of the window, in nanoseconds, or as
+                `Femtoseconds` or `Samples`.
+            length_ns: Length of the window, in the same forms.
 
         Raises:
             ValueError: If the offset or length is off the sample grid while
                 grid enforcement is on.
         """
-        self._check_and_convert_to_samples(
+        start_offset_samples = self._check_and_convert_to_samples(
             instrument_alias,
             start_offset_ns,
             f"Capture window '{window_name}' start_offset_ns",
         )
-        self._check_and_convert_to_samples(
+        length_samples = self._check_and_convert_to_samples(
             instrument_alias, length_ns, f"Capture window '{window_name}' length_ns"
         )
 
         capwin = _SequencerCaptureWindow(
             name=window_name,
-            start_offset_ns=start_offset_ns,
-            length_ns=length_ns,
+            start_offset_samples=start_offset_samples,
+            length_samples=length_samples,
         )
         self._alias_to_capwin[instrument_alias].append(capwin)
-        end_at_ns = start_offset_ns + length_ns
-        self._length_ns = max(self._length_ns, end_at_ns)
+        self._invalidate(instrument_alias)
+        period_fs = self._bindings[instrument_alias].sampling_period_fs
+        end_at_fs = (start_offset_samples + length_samples) * period_fs
+        self._length_fs = max(self._length_fs, end_at_fs)
+
+    def add_capture_windows(
+        self,
+        instrument_alias: str,
+        window_names: Sequence[str],
+        start_offsets_ns: TimeArray,
+        lengths_ns: TimeArray,
+    ):
+        """Schedule many capture windows on an instrument at once.
 
-    def extend_length_ns(self, additional_ns: float):
-        """Extend the overall timeline by ``additional_ns`` nanoseconds."""
-        self._length_ns += additional_ns
+        Equivalent to calling `add_capture_window()` for each element, but the
+        whole batch is validated in one vectorized pass and nothing is added
+        if any element is invalid.
+
+        Args:
+            instrument_alias: Alias of the (bound) target instrument.
+            window_names: Names of the capture windows.
+            start_offsets_ns: Start times of the windows, in nanoseconds, or as
+                a `FemtosecondArray` or `SampleArray`.
+            lengths_ns: Lengths of the windows in the same forms, one per
+                window or a single value for all.
+
+        Raises:
+            ValueError: If the arrays differ in length, or offsets or lengths
+                are off the sample grid while grid enforcement is on. The
+                message lists every offending element.
+        """
+        names = list(window_names)
+        offsets, lengths = self._check_and_convert_arrays_to_samples(
+            instrument_alias,
+            (start_offsets_ns, "Capture window start_offset_ns"),
+            (lengths_ns, "Capture window length_ns"),
+        )
+        if len(lengths) == 1:
+            lengths = np.broadcast_to(lengths, offsets.shape)
+        if len(names) != len(offsets) or len(lengths) != len(offsets):
+            raise ValueError(
+                f"Got {len(names)} capture window names and {len(lengths)} "
+                f"lengths for {len(offsets)} offsets."
+            )
+
+        self._alias_to_capwin[instrument_alias].extend(
+            _SequencerCaptureWindow(
+                name=name, start_offset_samples=start, length_samples=n
+            )
+            for name, start, n in zip(
+                names, offsets.tolist(), lengths.tolist(), strict=True
+            )
+        )
+        self._invalidate(instrument_alias)
+        if len(offsets):
+            period_fs = self._bindings[instrument_alias].sampling_period_fs
+            end_at_fs = int(np.max(offsets + lengths)) * period_fs
+            self._length_fs = max(self._length_fs, end_at_fs)
+
+    @property
+    def default_sampling_period_fs(self) -> int:
+        """Sampling period of waveforms registered without one, in fs."""
+        return self._default_sampling_period_fs
+
+    @property
+    def waveform_names(self) -> list[str]:
+        """Registered waveform names, in registration order."""
+        return list(self._waveform_names)
+
+    def extend_length_ns(self, additional_ns: float | Femtoseconds):
+        """Extend the overall timeline by ``additional_ns`` nanoseconds.
+
+        ``additional_ns`` may also be given as `Femtoseconds`.
+        """
+        self._length_fs += _time_to_fs(additional_ns)
 
     def set_iterations(self, iterations: int):
         """Set how many times the exported timeline repeats."""
@@ -241,27 +1002,105 @@ class Sequencer:
         multiple of each bound alias's ``sampling_period_fs * step_samples``.
         """
         if not self._bindings:
-            return math.ceil(self._length_ns * 1e6)
+            return self._length_fs
 
-        lcm_step_fs = 1
-        for b in self._bindings.values():
-            step_fs = b.sampling_period_fs * b.step_samples
-            lcm_step_fs = math.lcm(lcm_step_fs, step_fs)
+        if self._lcm_step_fs is None:
+            lcm_step_fs = 1
+            for b in self._bindings.values():
+                step_fs = b.sampling_period_fs * b.step_samples
+                lcm_step_fs = math.lcm(lcm_step_fs, step_fs)
+            self._lcm_step_fs = lcm_step_fs
+        lcm_step_fs = self._lcm_step_fs
 
-        length_fs = math.ceil(self._length_ns * 1e6)
+        length_fs = self._length_fs
         remainder = length_fs % lcm_step_fs
         if remainder != 0:
             length_fs += lcm_step_fs - remainder
         return length_fs
 
+    def compile(self) -> dict[str, SetFixedTimeline]:
+        """Build the timeline directives of every bound alias.
+
+        Only aliases changed since their last export are rebuilt; the others
+        are served from the cache. Aliases with parameters are left out; build
+        them with `template()`.
+
+        Returns:
+            The `SetFixedTimeline` directive of each bound alias.
+        """
+        return self.export_all()
+
+    def export_all(
+        self, executor: Executor | None = None
+    ) -> dict[str, SetFixedTimeline]:
+        """Export the timeline directive of every bound alias.
+
+        Aliases with parameters are left out; build them with `template()`.
+
+        Args:
+            executor: Executor in which aliases changed since their last
+                export are built concurrently. A thread pool suits most
+                sequencers since the numpy work releases the GIL; a process
+                pool copies the whole sequencer per alias. `None` builds them
+                one after another on the calling thread.
+
+        Returns:
+            The `SetFixedTimeline` directive of each exported alias.
+
+        Note:
+            The calling thread waits for the builds, so do not call this from
+            a coroutine; use `export_all_async()` there.
+        """
+        aliases = self._exported_aliases()
+        if executor is not None:
+            futures = {
+                alias: executor.submit(self._build, alias, self._length_samples(alias))
+                for alias in aliases
+                if alias not in self._compiled
+            }
+            for alias, future in futures.items():
+                self._compiled[alias] = future.result()
+        return {alias: self._export(alias) for alias in aliases}
+
+    async def export_all_async(
+        self, executor: Executor | None = None
+    ) -> dict[str, SetFixedTimeline]:
+        """Export every bound alias without blocking the event loop.
+
+        Like `export_all()`, but the aliases changed since their last export
+        are built in ``executor`` (the loop's default executor if `None`) and
+        awaited together. Do not modify the sequencer until this returns.
+
+        Returns:
+            The `SetFixedTimeline` directive of each exported alias.
+        """
+        loop = asyncio.get_running_loop()
+        aliases = self._exported_aliases()
+        stale = [alias for alias in aliases if alias not in self._compiled]
+        built = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor, self._build, alias, self._length_samples(alias)
+                )
+                for alias in stale
+            )
+        )
+        self._compiled.update(zip(stale, built, strict=True))
+        return {alias: self._export(alias) for alias in aliases}
+
+    def _exported_aliases(self) -> list[str]:
+        return [a for a in self._bindings if not self._alias_to_slots.get(a)]
+
     def export_set_fixed_timeline_directive(
         self, instrument_alias: str
     ) -> SetFixedTimeline:
         """Build the timeline directive for one instrument.
 
         Collects the events and capture windows scheduled for the alias,
-        converts their nanosecond offsets to samples, and packages them with
-        the aligned length and iteration count.
+        whose offsets were converted to samples when they were added, and
+        packages them with the aligned length and iteration count. The result
+        is cached until the alias changes; only the length and iteration
+        count are refreshed on later calls.
 
         Args:
             instrument_alias: Alias of the (bound) instrument to export.
@@ -269,68 +1108,452 @@ class Sequencer:
         Returns:
             The assembled `SetFixedTimeline` directive.
 
+        Raises:
+            ValueError: If the alias is not bound or has parameters.
+        """
+        if self._alias_to_slots.get(instrument_alias):
+            raise ValueError(
+                f"Alias '{instrument_alias}' has parameters; use template()."
+            )
+        return self._export(instrument_alias)
+
+    def template(self, instrument_alias: str) -> TimelineTemplate:
+        """Build the timeline of one instrument as a parameterized template.
+
+        Parameter start offsets count as 0 when the timeline length is
+        computed, so call `extend_length_ns()` to leave room for the largest
+        offset to be swept.
+
+        Args:
+            instrument_alias: Alias of the (bound) instrument to export.
+
+        Returns:
+            A template whose `instantiate()` and `sweep()` produce the
+            `SetFixedTimeline` directive for each point.
+
         Raises:
             ValueError: If the alias is not bound.
         """
+        directive = self._export(instrument_alias)
+        period_fs = self._bindings[instrument_alias].sampling_period_fs
+        table = self._alias_to_events[instrument_alias]
+        durations_fs = np.array(
+            [self._waveform_duration_fs(i) for i in range(len(self._waveform_names))],
+            dtype=np.int64,
+        )
+        durations_samples = -(-durations_fs[table.waveform_ids] // period_fs)
+        slots = {
+            name: {
+                field: np.array(rows, dtype=np.intp) for field, rows in fields.items()
+            }
+            for name, fields in self._alias_to_slots[instrument_alias].items()
+        }
+
+        def offset_to_samples(time: Time) -> int:
+            return self._check_and_convert_to_samples(
+                instrument_alias, time, "Template start_offset_ns"
+            )
+
+        scales = np.asarray(self._scale_of_name, dtype=complex)[table.waveform_ids]
+        return TimelineTemplate(
+            directive,
+            slots,
+            offset_to_samples,
+            durations_samples,
+            np.abs(scales),
+            np.degrees(np.angle(scales)),
+        )
+
+    def _export(self, instrument_alias: str) -> SetFixedTimeline:
         if instrument_alias not in self._bindings:
             raise ValueError(f"Alias '{instrument_alias}' is not bound.")
 
+        length_sample = self._length_samples(instrument_alias)
+        compiled = self._compiled.get(instrument_alias)
+        if compiled is None:
+            compiled = self._build(instrument_alias, length_sample)
+            self._compiled[instrument_alias] = compiled
+        elif (
+            compiled.directive.length != length_sample
+            or compiled.directive.iterations != self._iterations
+        ):
+            compiled.directive = replace(
+                compiled.directive, length=length_sample, iterations=self._iterations
+            )
+        return compiled.directive
+
+    def footprint(
+        self,
+        instrument_alias: str,
+        config: FixedTimelineConfig,
+        limits: TimelineLimits | None = None,
+    ) -> TimelineFootprint:
+        """Estimate the instrument resources used by one alias's timeline.
+
+        Args:
+            instrument_alias: Alias of the (bound) instrument.
+            config: Configuration of the instrument the alias is bound to.
+            limits: When given, the footprint is checked against them.
+
+        Returns:
+            The estimated `TimelineFootprint`.
+
+        Raises:
+            ValueError: If the alias is not bound.
+            TimelineLimitExceededError: If the footprint exceeds ``limits``.
+        """
+        footprint = estimate_timeline_footprint(self._export(instrument_alias), config)
+        if limits is not None:
+            check_timeline_limits(footprint, limits)
+        return footprint
+
+    def _length_samples(self, instrument_alias: str) -> int:
         sampling_period_fs = self._bindings[instrument_alias].sampling_period_fs
+        return -(-self.aligned_length_fs // sampling_period_fs)
 
-        name_to_index: dict[str, int] = {}
-        counter = 0
-        local_library: list[IqWaveform] = []
-        local_events: list[WaveformEvent] = []
+    def _check_overlaps(self, instrument_alias: str):
+        """Report overlapping events and capture windows of one alias."""
+        period_fs = self._bindings[instrument_alias].sampling_period_fs
+        table = self._alias_to_events[instrument_alias]
+        durations_fs = np.array(
+            [self._waveform_duration_fs(i) for i in range(len(self._waveform_names))],
+            dtype=np.int64,
+        )
+        # Offsets of parameterized events are only known per template point,
+        # so those events are left out.
+        event_rows = np.ones(len(table), dtype=bool)
+        for fields in self._alias_to_slots.get(instrument_alias, {}).values():
+            event_rows[fields.get("start_offsets_samples", [])] = False
+        event_rows = np.flatnonzero(event_rows)
+        event_starts = table.start_offsets_samples[event_rows]
+        event_ends = event_starts + -(
+            -durations_fs[table.waveform_ids[event_rows]] // period_fs
+        )
 
-        for event in self._alias_to_events[instrument_alias]:
-            if event.waveform_name in name_to_index:
-                index = name_to_index[event.waveform_name]
-            else:
-                waveform = self._waveform_library[event.waveform_name]
-                local_library.append(
-                    IqWaveform(
-                        sampling_period_fs=round(waveform.sampling_period_ns * 1e6),
-                        iq_array=waveform.iq_array,
-                    )
-                )
-                index = counter
-                name_to_index[event.waveform_name] = index
-                counter += 1
+        capwins = self._alias_to_capwin[instrument_alias]
+        window_starts = np.array(
+            [c.start_offset_samples for c in capwins], dtype=np.int64
+        )
+        window_ends = window_starts + np.array(
+            [c.length_samples for c in capwins], dtype=np.int64
+        )
 
-            start_offset_samples = self._check_and_convert_to_samples(
-                instrument_alias, event.start_offset_ns, "Export event"
-            )
-            local_events.append(
-                WaveformEvent(
-                    waveform_index=index,
-                    start_offset_samples=start_offset_samples,
-                    gain=event.gain,
-                    phase_offset_deg=event.phase_offset_deg,
-                )
+        problems = []
+        for kind, starts, ends, label in (
+            ("event", event_starts, event_ends, lambda i: f"#{event_rows[i]}"),
+            ("capture window", window_starts, window_ends, lambda i: capwins[i].name),
+        ):
+            overlaps = _find_overlaps(starts, ends)
+            if not overlaps:
+                continue
+            pairs = "; ".join(
+                f"{label(a)} [{starts[a]}, {ends[a]}) overlaps "
+                f"{label(b)} [{starts[b]}, {ends[b]})"
+                for a, b in overlaps[:_MAX_REPORTED_OVERLAPS]
             )
+            more = len(overlaps) - _MAX_REPORTED_OVERLAPS
+            if more > 0:
+                pairs += f"; and {more} more"
+            problems.append(f"{len(overlaps)} overlapping {kind}(s): {pairs}")
 
-        local_capwins: list[CaptureWindow] = []
-        for capwin in self._alias_to_capwin[instrument_alias]:
-            local_capwins.append(
-                CaptureWindow(
-                    name=capwin.name,
-                    start_offset_samples=self._check_and_convert_to_samples(
-                        instrument_alias, capwin.start_offset_ns, "Export capwin start"
-                    ),
-                    length_samples=self._check_and_convert_to_samples(
-                        instrument_alias, capwin.length_ns, "Export capwin length"
-                    ),
-                )
+        if problems:
+            msg = (
+                f"Alias '{instrument_alias}' has "
+                + ", and ".join(problems)
+                + " (offsets in samples)"
             )
+            if self._strict_overlaps:
+                raise ValueError(msg)
+            else:
+                logger.warning(msg)
+
+    def _build(self, instrument_alias: str, length_sample: int) -> _CompiledTimeline:
+        self._check_overlaps(instrument_alias)
+        table = self._alias_to_events[instrument_alias]
 
-        length_sample = (
-            self.aligned_length_fs + sampling_period_fs - 1
-        ) // sampling_period_fs
+        entry_ids = np.asarray(self._entry_of_name, dtype=np.int64)[table.waveform_ids]
 
-        return SetFixedTimeline(
+        # Number the entries used by this alias in order of first use.
+        used_entries, first_use = np.unique(entry_ids, return_index=True)
+        used_entries = used_entries[np.argsort(first_use)]
+        local_index = np.empty(len(self._entries), dtype=np.int64)
+        local_index[used_entries] = np.arange(len(used_entries))
+
+        local_library = [
+            self._entries[entry_id].as_iq_waveform()
+            for entry_id in used_entries.tolist()
+        ]
+
+        gains = table.gains.copy()
+        phase_offsets_deg = table.phase_offsets_deg.copy()
+        scales = np.asarray(self._scale_of_name, dtype=complex)[table.waveform_ids]
+        scaled = scales != 1
+        if np.any(scaled):
+            gains[scaled] *= np.abs(scales[scaled])
+            phase_offsets_deg[scaled] += np.degrees(np.angle(scales[scaled]))
+
+        local_events = WaveformEventTable(
+            waveform_indices=local_index[entry_ids],
+            start_offsets_samples=table.start_offsets_samples.copy(),
+            gains=gains,
+            phase_offsets_deg=phase_offsets_deg,
+        )
+
+        local_capwins = [
+            CaptureWindow(
+                name=c.name,
+                start_offset_samples=c.start_offset_samples,
+                length_samples=c.length_samples,
+            )
+            for c in self._alias_to_capwin[instrument_alias]
+        ]
+
+        directive = SetFixedTimeline(
             waveform_library=local_library,
             events=local_events,
             capture_windows=local_capwins,
             length=length_sample,
             iterations=self._iterations,
         )
+        return _CompiledTimeline(
+            directive, frozenset(np.unique(table.waveform_ids).tolist())
+        )
+
+    def save(
+        self,
+        path: str | os.PathLike,
+        include_encoded_directives: bool = False,
+        iq_encoding: IqEncoding = IqEncoding.LISTS,
+    ):
+        """Write the sequencer to a compact binary file.
+
+        Waveform samples, event columns and capture windows are stored as
+        raw buffers that `load()` maps into memory without copying or
+        validating them again.
+
+        Args:
+            path: Destination file.
+            include_encoded_directives: Also store, for every bound alias
+                without parameters, the serialized `Directive` protobuf message
+                of its timeline. `load()` exposes them as
+                `encoded_directives`.
+            iq_encoding: Sample encoding of the stored directives.
+        """
+        buffers: list[npt.NDArray] = []
+        arrays: dict[str, dict] = {}
+        size = 0
+
+        def add(key: str, array: npt.ArrayLike):
+            nonlocal size
+            array = np.ascontiguousarray(array)
+            size += -size % _FILE_ALIGNMENT
+            arrays[key] = {
+                "offset": size,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+            }
+            buffers.append(array)
+            size += array.nbytes
+
+        add("entry_of_name", np.asarray(self._entry_of_name, dtype=np.int64))
+        add("scale_of_name", np.asarray(self._scale_of_name, dtype=np.complex128))
+        lengths = [len(e.iq_array) for e in self._entries]
+        add("entry_offsets", np.cumsum([0, *lengths], dtype=np.int64))
+        add(
+            "entry_periods_fs",
+            np.array([e.sampling_period_fs for e in self._entries], dtype=np.int64),
+        )
+        add(
+            "entry_samples",
+            np.concatenate(
+                [e.iq_array for e in self._entries]
+                or [np.empty(0, dtype=self._iq_dtype)]
+            ).astype(self._iq_dtype, copy=False),
+        )
+        keys = list(self._entry_ids)
+        add(
+            "entry_keys",
+            np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(
+                len(keys), len(keys[0]) if keys else 0
+            ),
+        )
+        add("entry_key_ids", np.array(list(self._entry_ids.values()), dtype=np.int64))
+
+        aliases = {}
+        for alias in set(self._alias_to_events) | set(self._alias_to_capwin):
+            table = self._alias_to_events.get(alias, _EventTable())
+            add(f"events/{alias}/waveform_ids", table.waveform_ids)
+            add(f"events/{alias}/start_offsets_samples", table.start_offsets_samples)
+            add(f"events/{alias}/gains", table.gains)
+            add(f"events/{alias}/phase_offsets_deg", table.phase_offsets_deg)
+            capwins = self._alias_to_capwin.get(alias, [])
+            add(
+                f"capture_windows/{alias}/start_offsets_samples",
+                np.array([c.start_offset_samples for c in capwins], dtype=np.int64),
+            )
+            add(
+                f"capture_windows/{alias}/length_samples",
+                np.array([c.length_samples for c in capwins], dtype=np.int64),
+            )
+            aliases[alias] = {
+                "capture_window_names": [c.name for c in capwins],
+                "slots": self._alias_to_slots.get(alias, {}),
+            }
+
+        encoded = []
+        if include_encoded_directives:
+            for alias, directive in self.export_all().items():
+                message = bytes(directive_to_pb(directive, iq_encoding))
+                add(f"encoded/{alias}", np.frombuffer(message, dtype=np.uint8))
+                encoded.append(alias)
+
+        header = json.dumps(
+            {
+                "default_sampling_period_fs": self._default_sampling_period_fs,
+                "enforce_sample_grid": self._enforce_sample_grid,
+                "dedupe_scalar_multiples": self._dedupe_scalar_multiples,
+                "strict_overlaps": self._strict_overlaps,
+                "iq_dtype": self._iq_dtype.str,
+                "iterations": self._iterations,
+                "length_fs": self._length_fs,
+                "waveform_names": self._waveform_names,
+                "bindings": {
+                    alias: [b.sampling_period_fs, b.step_samples]
+                    for alias, b in self._bindings.items()
+                },
+                "aliases": aliases,
+                "encoded_directives": encoded,
+                "arrays": arrays,
+            }
+        ).encode()
+
+        # Buffers may be memory-mapped views of ``path`` itself (after
+        # `load()`), so write a new file and swap it in.
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_FILE_MAGIC)
+                f.write(len(header).to_bytes(8, "little"))
+                f.write(header)
+                f.write(b"\0" * (-f.tell() % _FILE_ALIGNMENT))
+                data_start = f.tell()
+                for array, spec in zip(buffers, arrays.values(), strict=True):
+                    f.write(b"\0" * (data_start + spec["offset"] - f.tell()))
+                    f.write(array.data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "Sequencer":
+        """Load a sequencer written by `save()`.
+
+        The file is memory-mapped: waveform samples and event columns are
+        read-only views of it, and nothing is validated again. Events added
+        later move the alias's columns to memory first.
+
+        Raises:
+            ValueError: If the file is not a saved sequencer.
+        """
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(raw[: len(_FILE_MAGIC)]) != _FILE_MAGIC:
+            raise ValueError(f"{os.fspath(path)} is not a saved Sequencer.")
+        header_start = len(_FILE_MAGIC) + 8
+        header_length = int.from_bytes(raw[len(_FILE_MAGIC) : header_start], "little")
+        header = json.loads(bytes(raw[header_start : header_start + header_length]))
+        data_start = header_start + header_length
+        data_start += -data_start % _FILE_ALIGNMENT
+
+        def array(key: str) -> npt.NDArray:
+            spec = header["arrays"][key]
+            dtype = np.dtype(spec["dtype"])
+            start = data_start + spec["offset"]
+            count = math.prod(spec["shape"])
+            view = raw[start : start + count * dtype.itemsize].view(dtype)
+            return np.asarray(view).reshape(spec["shape"])
+
+        seq = cls(
+            Femtoseconds(header["default_sampling_period_fs"]),
+            enforce_sample_grid=header["enforce_sample_grid"],
+            dedupe_scalar_multiples=header["dedupe_scalar_multiples"],
+            strict_overlaps=header["strict_overlaps"],
+            iq_dtype=np.dtype(header["iq_dtype"]).type,
+        )
+        seq._iterations = header["iterations"]
+        seq._length_fs = header["length_fs"]
+        seq._waveform_names = header["waveform_names"]
+        seq._waveform_ids = {name: i for i, name in enumerate(seq._waveform_names)}
+        seq._entry_of_name = array("entry_of_name").tolist()
+        seq._scale_of_name = array("scale_of_name").tolist()
+
+        offsets = array("entry_offsets").tolist()
+        samples = array("entry_samples")
+        seq._entries = [
+            _Waveform(period_fs, samples[start:end])
+            for period_fs, start, end in zip(
+                array("entry_periods_fs").tolist(),
+                offsets[:-1],
+                offsets[1:],
+                strict=True,
+            )
+        ]
+        seq._entry_ids = {
+            bytes(key): entry_id
+            for key, entry_id in zip(
+                array("entry_keys"), array("entry_key_ids").tolist(), strict=True
+            )
+        }
+
+        seq._bindings = {
+            alias: _AliasBinding(sampling_period_fs=period_fs, step_samples=step)
+            for alias, (period_fs, step) in header["bindings"].items()
+        }
+        for alias, meta in header["aliases"].items():
+            seq._alias_to_events[alias] = _EventTable.from_columns(
+                array(f"events/{alias}/waveform_ids"),
+                array(f"events/{alias}/start_offsets_samples"),
+                array(f"events/{alias}/gains"),
+                array(f"events/{alias}/phase_offsets_deg"),
+            )
+            seq._alias_to_capwin[alias] = [
+                _SequencerCaptureWindow(name, start, length)
+                for name, start, length in zip(
+                    meta["capture_window_names"],
+                    array(f"capture_windows/{alias}/start_offsets_samples").tolist(),
+                    array(f"capture_windows/{alias}/length_samples").tolist(),
+                    strict=True,
+                )
+            ]
+            if meta["slots"]:
+                seq._alias_to_slots[alias] = meta["slots"]
+        seq._encoded_directives = {
+            alias: array(f"encoded/{alias}") for alias in header["encoded_directives"]
+        }
+        return seq
+
+    @property
+    def encoded_directives(self) -> dict[str, bytes]:
+        """Serialized `Directive` messages stored by `save()`, per alias.
+
+        Only set on sequencers returned by `load()` from a file saved with
+        ``include_encoded_directives=True``; they do not follow later edits.
+        """
+        return {
+            alias: data.tobytes() for alias, data in self._encoded_directives.items()
+        }
+
+
+__all__ = [
+    "FemtosecondArray",
+    "Femtoseconds",
+    "Parameter",
+    "SampleArray",
+    "Samples",
+    "Sequencer",
+    "Time",
+    "TimeArray",
+    "TimelineTemplate",
+]
@@ -0,0 +1,165 @@
+import functools
+from collections.abc import Callable
+
+import numpy as np
+from quelware_core.entities.waveform.sampled import IqArray
+
+from quelware_client.client.helpers.sequencer import Sequencer
+
+_FS_PER_NS = 1_000_000
+# Generators return read-only arrays memoized on all their arguments, so
+# repeated requests for an envelope share one array, which a Sequencer then
+# registers without copying.
+_CACHE_SIZE = 256
+
+
+def _n_samples(duration_ns: float, sampling_period_fs: int) -> int:
+    samples = duration_ns * _FS_PER_NS / sampling_period_fs
+    n = round(samples)
+    if abs(samples - n) > 0.001:
+        raise ValueError(
+            f"Duration ({duration_ns} ns) is not a multiple of sampling period "
+            f"({sampling_period_fs} fs)"
+        )
+    return n
+
+
+def _times_from_center_ns(n: int, sampling_period_fs: int) -> np.ndarray:
+    return (np.arange(n) - (n - 1) / 2) * (sampling_period_fs / _FS_PER_NS)
+
+
+def _read_only(values: np.ndarray) -> IqArray:
+    array = values.astype(np.complex128, copy=False)
+    array.flags.writeable = False
+    return array
+
+
+def _cosine_ramp(n: int) -> np.ndarray:
+    return 0.5 * (1 - np.cos(np.pi * (np.arange(n) + 0.5) / n))
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def square(
+    duration_ns: float, *, sampling_period_fs: int, amplitude: complex = 1.0
+) -> IqArray:
+    """Return a constant envelope.
+
+    Raises:
+        ValueError: If the duration is not a whole number of samples.
+    """
+    n = _n_samples(duration_ns, sampling_period_fs)
+    return _read_only(np.full(n, amplitude, dtype=np.complex128))
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def gaussian(
+    duration_ns: float,
+    sigma_ns: float,
+    *,
+    sampling_period_fs: int,
+    amplitude: complex = 1.0,
+) -> IqArray:
+    """Return a Gaussian envelope centered in ``duration_ns``.
+
+    Raises:
+        ValueError: If the duration is not a whole number of samples.
+    """
+    n = _n_samples(duration_ns, sampling_period_fs)
+    t = _times_from_center_ns(n, sampling_period_fs)
+    return _read_only(amplitude * np.exp(-0.5 * (t / sigma_ns) ** 2))
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def drag(
+    duration_ns: float,
+    sigma_ns: float,
+    beta_ns: float,
+    *,
+    sampling_period_fs: int,
+    amplitude: complex = 1.0,
+) -> IqArray:
+    """Return a DRAG envelope: a Gaussian plus ``1j * beta_ns`` times its slope.
+
+    Raises:
+        ValueError: If the duration is not a whole number of samples.
+    """
+    n = _n_samples(duration_ns, sampling_period_fs)
+    t = _times_from_center_ns(n, sampling_period_fs)
+    envelope = np.exp(-0.5 * (t / sigma_ns) ** 2)
+    slope = -t / sigma_ns**2 * envelope
+    return _read_only(amplitude * (envelope + 1j * beta_ns * slope))
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def cosine(
+    duration_ns: float, *, sampling_period_fs: int, amplitude: complex = 1.0
+) -> IqArray:
+    """Return a raised-cosine envelope spanning ``duration_ns``.
+
+    Raises:
+        ValueError: If the duration is not a whole number of samples.
+    """
+    n = _n_samples(duration_ns, sampling_period_fs)
+    return _read_only(amplitude * np.sin(np.pi * (np.arange(n) + 0.5) / n) ** 2)
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def flat_top(
+    duration_ns: float,
+    rise_ns: float,
+    *,
+    sampling_period_fs: int,
+    amplitude: complex = 1.0,
+) -> IqArray:
+    """Return a flat envelope with raised-cosine rise and fall of ``rise_ns``.
+
+    Raises:
+        ValueError: If a duration is not a whole number of samples, or the
+            rise and fall do not fit in ``duration_ns``.
+    """
+    n = _n_samples(duration_ns, sampling_period_fs)
+    n_rise = _n_samples(rise_ns, sampling_period_fs)
+    if 2 * n_rise > n:
+        raise ValueError(
+            f"Rise and fall ({2 * rise_ns} ns) exceed the duration ({duration_ns} ns)"
+        )
+    values = np.ones(n)
+    ramp = _cosine_ramp(n_rise)
+    values[:n_rise] = ramp
+    values[n - n_rise :] = ramp[::-1]
+    return _read_only(amplitude * values)
+
+
+def register(
+    sequencer: Sequencer,
+    name: str,
+    shape: Callable[..., IqArray],
+    *args: float,
+    **kwargs: complex,
+):
+    """Generate a shape at the sequencer's default period and register it.
+
+    Example:
+        ``register(seq, "pi", gaussian, 40.0, 10.0, amplitude=0.8)``
+    """
+    iq_array = shape(
+        *args, sampling_period_fs=sequencer.default_sampling_period_fs, **kwargs
+    )
+    sequencer.register_waveform(name, iq_array)
+
+
+def clear_cache():
+    """Drop every memoized envelope."""
+    for shape in (square, gaussian, drag, cosine, flat_top):
+        shape.cache_clear()
+
+
+__all__ = [
+    "clear_cache",
+    "cosine",
+    "drag",
+    "flat_top",
+    "gaussian",
+    "register",
+    "square",
+]
@@ -1,5 +1,13 @@
 from ._agent_container import AgentContainer
 from ._client import AgentFactory, QuelwareClient
 from ._session import Session
+from ._session_pool import SessionPool, SessionPoolStats
 
-__all__ = ["AgentContainer", "AgentFactory", "QuelwareClient", "Session"]
+__all__ = [
+    "AgentContainer",
+    "AgentFactory",
+    "QuelwareClient",
+    "Session",
+    "SessionPool",
+    "SessionPoolStats",
+]
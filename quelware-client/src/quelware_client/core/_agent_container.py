@@ -19,6 +19,7 @@ logger = logging.getLogger(__name__)
 class AgentContainer:
     def __init__(self):
         self._session: SessionAgent | None = None
+        self._keepalive_session: SessionAgent | None = None
         self._conf: SystemConfigurationAgent | None = None
         self._trigger: TriggerAgent | None = None
         self._health: dict[UnitLabel, HealthAgent] = {}
@@ -90,6 +91,17 @@ class AgentContainer:
     def session(self, val: SessionAgent):
         self._session = val
 
+    @property
+    def keepalive_session(self) -> SessionAgent:
+        """Session agent used to renew leases; falls back to `session`."""
+        if self._keepalive_session is None:
+            return self.session
+        return self._keepalive_session
+
+    @keepalive_session.setter
+    def keepalive_session(self, val: SessionAgent):
+        self._keepalive_session = val
+
     @property
     def system_configuration(self) -> SystemConfigurationAgent:
         if self._conf is None:
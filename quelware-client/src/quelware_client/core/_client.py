@@ -19,6 +19,7 @@ from quelware_client.core.interfaces.instrument_agent import InstrumentAgent
 from quelware_client.core.interfaces.worker_agent import WorkerAgent
 
 from ._session import Session
+from ._session_pool import SessionPool
 from .interfaces.resource_agent import ResourceAgent
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,7 @@ A = TypeVar("A")
 AgentFactory: TypeAlias = Callable[[UnitLabel], A]
 """Callable that builds a per-unit agent, given the unit's label."""
 _ResourceId: TypeAlias = ResourceId | str
+_POOL_KEEPALIVE_FRACTION = 0.5
 
 
 class QuelwareClient:
@@ -86,6 +88,7 @@ class QuelwareClient:
         self._unit_labels: list[UnitLabel] = []
         self._close_handlers = close_handlers or []
         self._skip_lock_check = skip_lock_check
+        self._session_pool: SessionPool | None = None
 
     @property
     def agent(self) -> AgentContainer:
@@ -97,7 +100,10 @@ class QuelwareClient:
         await self.initialize()
 
     async def stop(self):
-        """Run the registered close handlers (e.g. close the gRPC channel)."""
+        """Close pooled sessions, then run the registered close handlers."""
+        if self._session_pool is not None:
+            await self._session_pool.close()
+            self._session_pool = None
         for handler in self._close_handlers:
             handler()
 
@@ -156,6 +162,7 @@ class QuelwareClient:
         resource_ids: Collection[_ResourceId],
         ttl_ms: int = 4000,
         tentative_ttl_ms: int = 1000,
+        keepalive_fraction: float | None = None,
     ) -> Session:
         """Create a session that leases the given resources.
 
@@ -167,6 +174,9 @@ class QuelwareClient:
             ttl_ms: Time-to-live, in milliseconds, of the committed lease.
             tentative_ttl_ms: Time-to-live, in milliseconds, of the tentative
                 lease held while the session is being opened.
+            keepalive_fraction: When set, the session renews its lease in the
+                background every ``keepalive_fraction * ttl_ms`` milliseconds
+                while open; see `Session.lease_lost`.
 
         Returns:
             An unopened `Session` for the requested resources.
@@ -177,8 +187,24 @@ class QuelwareClient:
             ttl_ms=ttl_ms,
             tentative_ttl_ms=tentative_ttl_ms,
             skip_lock_check=self._skip_lock_check,
+            keepalive_fraction=keepalive_fraction,
         )
 
+    @property
+    def session_pool(self) -> SessionPool:
+        """A pool of warm sessions, closed by `stop()`.
+
+        Its sessions use the default TTLs and renew their leases in the
+        background at half the TTL, so they stay open between acquisitions.
+        """
+        if self._session_pool is None:
+            self._session_pool = SessionPool(
+                lambda rids: self.create_session(
+                    rids, keepalive_fraction=_POOL_KEEPALIVE_FRACTION
+                )
+            )
+        return self._session_pool
+
     async def list_resource_infos(self) -> list[ResourceInfo]:
         """Return the resource information for every unit, aggregated."""
         coros = [
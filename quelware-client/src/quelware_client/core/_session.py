@@ -1,15 +1,18 @@
 import asyncio
 import logging
 import math
-from collections.abc import Collection
+import random
+import time
+from collections.abc import AsyncIterator, Collection, Iterable
 from types import TracebackType
-from typing import cast
+from typing import TYPE_CHECKING, Any, cast
 
 from quelware_core.entities.instrument import InstrumentDefinition, InstrumentInfo
 from quelware_core.entities.resource import (
     ResourceId,
     extract_unit_label,
 )
+from quelware_core.entities.result import ResultContainer
 from quelware_core.entities.session import SessionToken
 from quelware_core.entities.unit import UnitLabel
 
@@ -22,11 +25,16 @@ from quelware_client.core.trigger_count_proposer import (
 
 from ._utils import create_unit_to_ids_map
 
+if TYPE_CHECKING:
+    from quelware_client.core.pipeline import PipelineJob
+
 logger = logging.getLogger(__name__)
 
 _default_count_proposer = FixedOffsetTriggerCountProposer(grid_step=32, offset=0)
 _CLOCK_FREQUENCY_HZ = 312_500_000
 _FALLBACK_MIN_WAIT_MS = 500
+# After a failed renewal, retry at this fraction of the keepalive interval.
+_KEEPALIVE_RETRY_FRACTION = 0.25
 
 
 class Session:
@@ -54,6 +62,8 @@ class Session:
         token: SessionToken | None = None,
         trigger_count_proposer: TriggerCountProposer | None = None,
         skip_lock_check: bool = False,
+        keepalive_fraction: float | None = None,
+        keepalive_jitter: float = 0.1,
     ):
         """Build a session over a set of resources.
 
@@ -72,7 +82,20 @@ class Session:
                 proposer aligned to a 32-count grid.
             skip_lock_check: When True, skip verifying that the requested
                 resources are locked after opening.
+            keepalive_fraction: When set, `open()` starts a background task
+                that renews the lease to ``ttl_ms`` every
+                ``keepalive_fraction * ttl_ms`` milliseconds, until `close()`.
+                Must be in (0, 1).
+            keepalive_jitter: Relative random spread applied to each renewal
+                interval, so that many sessions do not renew in lockstep.
+
+        Raises:
+            ValueError: If ``keepalive_fraction`` is not in (0, 1).
         """
+        if keepalive_fraction is not None and not 0 < keepalive_fraction < 1:
+            raise ValueError(
+                f"keepalive_fraction must be in (0, 1) (got {keepalive_fraction})"
+            )
         self._rsrc_ids = set(resource_ids)
         self._ttl_ms = ttl_ms
         self._tentative_ttl_ms = tentative_ttl_ms
@@ -89,6 +112,16 @@ class Session:
 
         self._check_lock = not skip_lock_check
 
+        self._keepalive_fraction = keepalive_fraction
+        self._keepalive_jitter = keepalive_jitter
+        self._keepalive_task: asyncio.Task | None = None
+        self._lease_deadline = 0.0
+        self._lease_lost = asyncio.Event()
+        # Directives last configured on each instrument, shared by its drivers
+        # that skip unchanged directives. Dropped whenever the instruments may
+        # have been reset through the session.
+        self._applied_directives: dict[ResourceId, dict[type, Any]] = {}
+
     async def open(self):
         """Open the session, locking its resources and obtaining a token.
 
@@ -104,9 +137,57 @@ class Session:
             committed_ttl_ms=self._ttl_ms,
         )
         self._token = token
+        self._forget_applied_directives()
+        self._lease_lost.clear()
+        self._renewed(self._ttl_ms)
         if self._check_lock:
             await self._ensure_target_resources_locked()
         logger.info(f"Session opened successfully. session_token={token}")
+        if self._keepalive_fraction is not None:
+            self._keepalive_task = asyncio.create_task(self._keep_alive())
+
+    def _renewed(self, ttl_ms: int):
+        self._lease_deadline = time.monotonic() + ttl_ms / 1000
+
+    async def _keep_alive(self):
+        assert self._keepalive_fraction is not None
+        interval_sec = self._ttl_ms * self._keepalive_fraction / 1000
+        delay_sec = interval_sec
+        # Also checked after each renewal: on Python < 3.12, wait_for() may
+        # swallow a cancellation that arrives as the renewal completes.
+        while self._keepalive_task is asyncio.current_task():
+            spread = random.uniform(-self._keepalive_jitter, self._keepalive_jitter)
+            await asyncio.sleep(delay_sec * (1 + spread))
+            remaining_sec = self._lease_deadline - time.monotonic()
+            try:
+                success = await asyncio.wait_for(
+                    self._agent.keepalive_session.extend_session(
+                        self.token, self._ttl_ms
+                    ),
+                    timeout=max(remaining_sec, 0),
+                )
+            except Exception as e:
+                success = None
+                logger.warning(f"Lease renewal failed: {e!r} (token= {self.token} )")
+            if success:
+                self._renewed(self._ttl_ms)
+                delay_sec = interval_sec
+                continue
+            if success is False or time.monotonic() >= self._lease_deadline:
+                logger.error(f"Session lease lost. session_token={self.token}")
+                self._lease_lost.set()
+                return
+            delay_sec = interval_sec * _KEEPALIVE_RETRY_FRACTION
+
+    async def _stop_keepalive(self):
+        task, self._keepalive_task = self._keepalive_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
     async def _ensure_target_resources_locked(self):
         units = list(self._unit_to_ids.keys())
@@ -143,6 +224,28 @@ class Session:
         """The underlying container of agents used by this session."""
         return self._agent
 
+    @property
+    def lease_lost(self) -> asyncio.Event:
+        """Event set when the keepalive task could not renew the lease.
+
+        Set when the server refuses a renewal, or when renewals keep failing
+        until the lease expires. The resources may be taken by others from
+        then on; await it alongside long-running work to abort early.
+        """
+        return self._lease_lost
+
+    @property
+    def lease_active(self) -> bool:
+        """Whether the session is open and its lease has not run out.
+
+        Based on the last successful open or renewal seen by this client.
+        """
+        return (
+            self._token is not None
+            and not self._lease_lost.is_set()
+            and time.monotonic() < self._lease_deadline
+        )
+
     @property
     def token(self) -> SessionToken:
         """The session token obtained when the session was opened.
@@ -155,10 +258,37 @@ class Session:
         return self._token
 
     async def close(self):
-        """Close the session and release its resources."""
-        await self._agent.session.close_session(self.token)
+        """Close the session and release its resources.
+
+        Stops the keepalive task first, if any, and lets the instrument agents
+        drop what they cached for the session.
+        """
+        await self._stop_keepalive()
+        self._lease_deadline = 0.0
+        self._forget_applied_directives()
+        try:
+            await self._agent.session.close_session(self.token)
+        finally:
+            self._release_instrument_agents()
         logger.info(f"Session closed. session_token={self.token}")
 
+    def _forget_applied_directives(self, unit_label: UnitLabel | None = None):
+        # Cleared in place: drivers hold the per-instrument records.
+        for rid, applied in self._applied_directives.items():
+            if unit_label is None or extract_unit_label(rid) == unit_label:
+                applied.clear()
+
+    def _release_instrument_agents(self):
+        for unit in self._unit_to_ids:
+            try:
+                agent = self._agent.instrument(unit)
+            except ValueError:
+                continue
+            # Agents written against older versions of the Protocol lack it.
+            release = getattr(agent, "release_session", None)
+            if release is not None:
+                release(self.token)
+
     async def extend(self, new_ttl_ms: int) -> bool:
         """Extend the session's lease.
 
@@ -169,6 +299,8 @@ class Session:
             True if the server accepted the extension.
         """
         success = await self._agent.session.extend_session(self.token, new_ttl_ms)
+        if success:
+            self._renewed(new_ttl_ms)
         logger.info(
             f"Session extended. session_token={self.token} new_ttl_ms={new_ttl_ms}"
         )
@@ -222,6 +354,8 @@ class Session:
                 profile=d.profile,
             )
             prefixed_definitions.append(prefixed)
+        # Deploying may reset any instrument of the unit.
+        self._forget_applied_directives(unit_label)
         insts = await self._agent.resource(unit_label).deploy_instruments(
             port_id, prefixed_definitions, append, self.token
         )
@@ -275,6 +409,35 @@ class Session:
 
         return await self._client_side_trigger_fallback(unit_to_ids, fallback_wait_ms)
 
+    def run_pipeline(
+        self, jobs: Iterable["PipelineJob"], max_in_flight: int = 2
+    ) -> AsyncIterator[dict[ResourceId, ResultContainer]]:
+        """Run shots back to back, configuring each while the previous one runs.
+
+        Each job's directives are configured through its drivers, then the
+        drivers are triggered and their results awaited. The next job is
+        configured as soon as the previous trigger has committed its
+        configuration, so uploads overlap execution and fetching. At most
+        ``max_in_flight`` jobs are configured but not yet consumed.
+
+        ```python
+        jobs = (PipelineJob({driver: [timeline]}) for timeline in timelines)
+        async for results in session.run_pipeline(jobs):
+            process(results[driver.instrument_id])
+        ```
+
+        Returns:
+            An async iterator over each job's results, in job order, keyed by
+            instrument id.
+
+        Raises:
+            ValueError: If ``max_in_flight`` is less than 1.
+        """
+        # Imported here: the pipeline builds on drivers, which import Session.
+        from quelware_client.core.pipeline import run_pipeline
+
+        return run_pipeline(self, jobs, max_in_flight)
+
     async def _client_side_trigger_fallback(
         self,
         unit_to_ids: dict[UnitLabel, list[ResourceId]],
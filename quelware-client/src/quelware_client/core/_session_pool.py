@@ -0,0 +1,192 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Collection
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from quelware_core.entities.resource import ResourceId
+
+from quelware_client.core.exceptions import LockConflictError
+
+from ._session import Session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SessionPoolStats:
+    """Counters of a `SessionPool`.
+
+    Attributes:
+        hits: Acquisitions served by a session that was already open.
+        misses: Acquisitions that had to open a session, including reopens.
+        reopened: Misses caused by a pooled session whose lease had run out.
+        evicted: Idle sessions closed to respect the pool size or to free
+            resources requested by another set.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    reopened: int = 0
+    evicted: int = 0
+
+
+class _PoolEntry:
+    def __init__(self):
+        self.session: Session | None = None
+        self.lock = asyncio.Lock()
+        # Tasks holding or waiting for the lock.
+        self.users = 0
+
+
+class SessionPool:
+    """Keeps sessions open across experiments, one per resource set.
+
+    Acquiring a resource set that was used recently returns its session
+    without another `OpenSession` round trip or lock check. A session is
+    handed to one user at a time; concurrent acquisitions of the same set
+    wait for it, while acquiring a set that overlaps a borrowed one raises
+    `LockConflictError`. Pooled sessions should renew their own leases (see
+    ``keepalive_fraction``); one whose lease has run out is reopened.
+
+    ```python
+    async with qc.session_pool.acquire(["unit0:port0"]) as session:
+        await session.trigger(instrument_ids)
+    ```
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[Collection[ResourceId]], Session],
+        max_sessions: int = 8,
+    ):
+        """Create an empty pool.
+
+        Args:
+            session_factory: Builds an unopened session for a resource set.
+            max_sessions: Number of sessions kept open. The least recently used
+                idle ones are closed beyond it.
+        """
+        self._session_factory = session_factory
+        self._max_sessions = max_sessions
+        self._entries: OrderedDict[frozenset[ResourceId], _PoolEntry] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._reopened = 0
+        self._evicted = 0
+
+    @property
+    def stats(self) -> SessionPoolStats:
+        """Counters accumulated since the pool was created."""
+        return SessionPoolStats(
+            hits=self._hits,
+            misses=self._misses,
+            reopened=self._reopened,
+            evicted=self._evicted,
+        )
+
+    @asynccontextmanager
+    async def acquire(
+        self, resource_ids: Collection[ResourceId | str]
+    ) -> AsyncIterator[Session]:
+        """Borrow an open session over ``resource_ids``.
+
+        The session returns to the pool on exit. If the body raises, the
+        session is closed instead, since its state is unknown.
+
+        Raises:
+            LockConflictError: If a session has to be opened while another
+                pooled session over some of the same resources is borrowed,
+                including by the caller itself.
+        """
+        key = frozenset(ResourceId(rid) for rid in resource_ids)
+        entry = self._entries.setdefault(key, _PoolEntry())
+        entry.users += 1
+        try:
+            async with entry.lock:
+                self._entries.move_to_end(key)
+                session = entry.session
+                if session is not None and session.lease_active:
+                    self._hits += 1
+                else:
+                    self._misses += 1
+                    if session is not None:
+                        logger.info(
+                            f"Reopening expired session. session_token={session.token}"
+                        )
+                        self._reopened += 1
+                        entry.session = None
+                        await self._close_quietly(session)
+                    await self._evict_overlapping(key)
+                    session = self._session_factory(key)
+                    await session.open()
+                    entry.session = session
+                try:
+                    yield session
+                except BaseException:
+                    entry.session = None
+                    await self._close_quietly(session)
+                    raise
+        finally:
+            entry.users -= 1
+            if (
+                entry.users == 0
+                and entry.session is None
+                and self._entries.get(key) is entry
+            ):
+                del self._entries[key]
+        await self._evict_idle()
+
+    async def _evict_overlapping(self, key: frozenset[ResourceId]):
+        overlapping = [
+            (other, entry)
+            for other, entry in self._entries.items()
+            if other != key and other & key
+        ]
+        in_use = {rid for other, e in overlapping if e.users for rid in other & key}
+        if in_use:
+            # Waiting for the borrower could deadlock, e.g. on nested acquisitions.
+            raise LockConflictError(
+                "Resources are held by a borrowed pooled session."
+            ).with_resource_ids(sorted(in_use))
+        for other, entry in overlapping:
+            await self._evict(other, entry)
+
+    async def _evict_idle(self):
+        open_entries = [
+            (key, entry)
+            for key, entry in self._entries.items()
+            if entry.session is not None
+        ]
+        excess = len(open_entries) - self._max_sessions
+        for key, entry in open_entries[: max(excess, 0)]:
+            if not entry.users:
+                await self._evict(key, entry)
+
+    async def _evict(self, key: frozenset[ResourceId], entry: _PoolEntry):
+        """Close the session of an entry nobody holds or waits for."""
+        session, entry.session = entry.session, None
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        if session is not None:
+            self._evicted += 1
+            await self._close_quietly(session)
+
+    async def _close_quietly(self, session: Session):
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning(f"Failed to close pooled session: {e!r}")
+
+    async def close(self):
+        """Close every pooled session, waiting for borrowed ones to return."""
+        entries, self._entries = list(self._entries.values()), OrderedDict()
+        for entry in entries:
+            async with entry.lock:
+                session, entry.session = entry.session, None
+            if session is not None:
+                await self._close_quietly(session)
+
+
+__all__ = ["SessionPool", "SessionPoolStats"]
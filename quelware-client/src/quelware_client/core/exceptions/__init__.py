@@ -76,3 +76,7 @@ class InvalidUnitStatusError(_ErrorWithUnitLabelsMixin, QuelwareClientError): ..
 
 class ServiceUnavailableError(QuelwareClientError):
     DEFAULT_MESSAGE = "The requested service is not available on the server."
+
+
+class TimelineLimitExceededError(QuelwareClientError):
+    DEFAULT_MESSAGE = "The timeline exceeds the instrument limits."
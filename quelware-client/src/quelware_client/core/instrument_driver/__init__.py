@@ -1,8 +1,15 @@
+import dataclasses
 import logging
-from collections.abc import Sequence
-from typing import Generic, TypeAlias, TypeVar, overload
+from collections.abc import AsyncIterator, Hashable, Sequence
+from typing import Any, Generic, TypeAlias, TypeVar, overload
 
-from quelware_core.entities.directives import Directive, FixedTimelineDirective
+import numpy as np
+from quelware_core.entities.directives import (
+    Directive,
+    FixedTimelineDirective,
+    SetFixedTimeline,
+    WaveformEventTable,
+)
 from quelware_core.entities.instrument import (
     ConfigVariant,
     FixedTimelineConfig,
@@ -14,12 +21,23 @@ from quelware_core.entities.instrument import (
 )
 from quelware_core.entities.resource import ResourceId, extract_unit_label
 from quelware_core.entities.result import (
+    ArrayAllocator,
+    ResultChunk,
     ResultContainer,
 )
 from quelware_core.entities.session import SessionToken
+from quelware_core.entities.waveform.ref import WaveformRef, iq_waveform_digest
+from quelware_core.entities.waveform.sampled import IqEncoding, quantized_iq_encoding
 
 from quelware_client.core import Session
+from quelware_client.core.exceptions import ServiceUnavailableError
 from quelware_client.core.interfaces.instrument_agent import InstrumentAgent
+from quelware_client.core.result_sink import ResultSink
+from quelware_client.core.timeline_footprint import (
+    TimelineLimits,
+    check_timeline_limits,
+    estimate_timeline_footprint,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +46,66 @@ C = TypeVar("C", bound="ConfigVariant")
 P = TypeVar("P", bound="ProfileVariant")
 
 
+def _directive_key(directive: Directive) -> Hashable:
+    """Return the parts of ``directive`` that are cheap to compare with ``==``."""
+    if isinstance(directive, SetFixedTimeline):
+        events = directive.events
+        return (
+            SetFixedTimeline,
+            tuple(
+                w.digest
+                if isinstance(w, WaveformRef)
+                else iq_waveform_digest(w, IqEncoding.LISTS)
+                for w in directive.waveform_library
+            ),
+            len(events)
+            if isinstance(events, WaveformEventTable)
+            else tuple(
+                (e.waveform_index, e.start_offset_samples, e.gain, e.phase_offset_deg)
+                for e in events
+            ),
+            tuple(
+                (c.name, c.start_offset_samples, c.length_samples)
+                for c in directive.capture_windows
+            ),
+            directive.length,
+            directive.iterations,
+        )
+    return (type(directive), dataclasses.astuple(directive))
+
+
+def _event_columns(directive: Directive) -> tuple[np.ndarray, ...]:
+    if isinstance(directive, SetFixedTimeline) and isinstance(
+        directive.events, WaveformEventTable
+    ):
+        events = directive.events
+        return (
+            events.waveform_indices,
+            events.start_offsets_samples,
+            events.gains,
+            events.phase_offsets_deg,
+        )
+    return ()
+
+
+class _AppliedDirective:
+    """A configured directive, remembered to skip sending an equal one."""
+
+    def __init__(self, directive: Directive):
+        self._key = _directive_key(directive)
+        self._columns = tuple(np.array(c) for c in _event_columns(directive))
+
+    def matches(self, directive: Directive) -> bool:
+        if _directive_key(directive) != self._key:
+            return False
+        return all(
+            np.array_equal(stored, column)
+            for stored, column in zip(
+                self._columns, _event_columns(directive), strict=True
+            )
+        )
+
+
 class InstrumentDriver(Generic[D, C, P]):
     def __init__(  # noqa: PLR0913
         self,
@@ -37,6 +115,9 @@ class InstrumentDriver(Generic[D, C, P]):
         definition: InstrumentDefinition[P],
         config: C,
         instrument_agent: InstrumentAgent,
+        iq_encoding: IqEncoding | None = None,
+        limits: TimelineLimits | None = None,
+        applied_directives: dict[type, Any] | None = None,
     ):
         self._token = session_token
         self._id = instrument_id
@@ -44,38 +125,136 @@ class InstrumentDriver(Generic[D, C, P]):
         self._definition = definition
         self._config = config
         self._agent = instrument_agent
+        self._iq_encoding = iq_encoding
+        self._limits = limits
+        # The last configured directive of each type, when skipping unchanged
+        # ones. Shared with the other drivers of the instrument.
+        self._applied = applied_directives
 
     @overload
-    async def apply(self, directive: D) -> bool: ...
+    async def apply(self, directive: D, force: bool = False) -> bool: ...
 
     @overload
-    async def apply(self, directive: Sequence[D]) -> bool: ...
+    async def apply(self, directive: Sequence[D], force: bool = False) -> bool: ...
 
-    async def apply(self, directive) -> bool:
-        if isinstance(directive, Sequence):
-            return await self._agent.configure(self._token, self._id, directive)
-        else:
-            return await self._agent.configure(self._token, self._id, [directive])
+    async def apply(self, directive, force: bool = False) -> bool:
+        """Configure the instrument with one or more directives.
+
+        For drivers created with ``skip_unchanged=True``, directives equal to
+        the last one of the same type configured on the instrument in this
+        session are skipped, and nothing is sent when none changed. Pass
+        ``force=True`` to send every directive regardless. The recorded state
+        is dropped when configuring fails, the instrument is initialized, or
+        the session deploys instruments, reopens or closes. Resets that
+        bypass the session, such as server restarts, are not seen.
+
+        Raises:
+            TimelineLimitExceededError: If the driver has limits and a
+                timeline exceeds them. Nothing is sent in that case.
+        """
+        if not isinstance(directive, Sequence):
+            directive = [directive]
+        if self._limits is not None:
+            for d in directive:
+                if isinstance(d, SetFixedTimeline):
+                    footprint = estimate_timeline_footprint(d, self._config)
+                    check_timeline_limits(footprint, self._limits)
+
+        if self._applied is None:
+            return await self._configure(directive)
+        applied = dict(self._applied)
+        pending = []
+        for d in directive:
+            last = applied.get(type(d))
+            if force or last is None or not last.matches(d):
+                pending.append(d)
+                applied[type(d)] = _AppliedDirective(d)
+        if not pending:
+            return True
+
+        # Unknown until the agent answers, including when it raises.
+        self._applied.clear()
+        ok = await self._configure(pending)
+        if ok:
+            self._applied.update(applied)
+        return ok
+
+    async def _configure(self, directives: Sequence[Directive]) -> bool:
+        # Only pass the encoding when set, for agents predating the argument.
+        kwargs = {} if self._iq_encoding is None else {"iq_encoding": self._iq_encoding}
+        return await self._agent.configure(self._token, self._id, directives, **kwargs)
 
     async def initialize(self):
+        if self._applied is not None:
+            self._applied.clear()
         await self._agent.initialize(self._token, [self._id])
 
+    @property
+    def instrument_id(self) -> ResourceId:
+        return self._id
+
     @property
     def instrument_config(self) -> C:
         return self._config
 
-    async def fetch_result(self) -> ResultContainer:
+    async def fetch_result(self, sink: ResultSink | None = None) -> ResultContainer:
+        """Fetch the result of the last run.
+
+        With a ``sink``, capture windows are decoded into the storage it
+        provides, e.g. `MemmapResultSink` for results that do not fit in RAM.
+        """
+        return await self._agent.fetch_result(
+            self._token, self._id, *self._allocator_args(sink)
+        )
+
+    async def stream_result(
+        self, chunk_iterations: int = 0
+    ) -> AsyncIterator[ResultChunk]:
+        """Iterate over the result in chunks of iterations as the server sends them.
+
+        Each chunk is decoded into arrays before the next one is requested, so
+        analysis can start early and client memory stays bounded by the chunk
+        size. ``chunk_iterations`` caps the iterations per chunk; ``0`` lets
+        the server decide. Servers and agents without streaming support yield
+        the whole result as one chunk.
+        """
+        # Agents predating streaming have no stream_result.
+        stream = getattr(self._agent, "stream_result", None)
+        if stream is None:
+            yield await self._fetch_single_chunk()
+            return
+        streamed = False
+        try:
+            async for chunk in stream(self._token, self._id, chunk_iterations):
+                streamed = True
+                yield chunk
+        except ServiceUnavailableError:
+            if streamed:
+                raise
+            logger.warning(
+                "Result streaming unavailable; falling back to a single fetch."
+            )
+            yield await self._fetch_single_chunk()
+
+    async def _fetch_single_chunk(self) -> ResultChunk:
         res = await self._agent.fetch_result(self._token, self._id)
-        return res
+        return ResultChunk(first_iteration=0, container=res.to_columnar())
 
     async def wait_for_result(
-        self, timeout_sec: float | None = None
+        self, timeout_sec: float | None = None, sink: ResultSink | None = None
     ) -> ResultContainer:
         """Block until the result is ready, retrying transient fetch timeouts.
 
         ``timeout_sec`` caps the total client-side wait; ``None`` is unlimited.
+        ``sink`` has the same meaning as in `fetch_result()`.
         """
-        return await self._agent.wait_for_result(self._token, self._id, timeout_sec)
+        return await self._agent.wait_for_result(
+            self._token, self._id, timeout_sec, *self._allocator_args(sink)
+        )
+
+    def _allocator_args(self, sink: ResultSink | None) -> tuple[ArrayAllocator, ...]:
+        # Agents predating sinks take no allocator argument.
+        return () if sink is None else (sink.allocator(self._id),)
 
 
 FixedTimelineInstrumentDriver: TypeAlias = InstrumentDriver[
@@ -86,8 +265,27 @@ FixedTimelineInstrumentDriver: TypeAlias = InstrumentDriver[
 
 
 def create_instrument_driver_fixed_timeline(
-    session: Session, instrument_info: InstrumentInfo
+    session: Session,
+    instrument_info: InstrumentInfo,
+    quantized_transport: bool = False,
+    limits: TimelineLimits | None = None,
+    skip_unchanged: bool = False,
 ) -> FixedTimelineInstrumentDriver:
+    """Create a driver for a fixed-timeline instrument in the session.
+
+    Args:
+        session: Session the instrument is available in.
+        instrument_info: The instrument to drive.
+        quantized_transport: Send waveforms quantized to the instrument's DAC
+            bitdepth, which is lossless at the hardware resolution and
+            shrinks the payload. Requires server support for quantized
+            encodings.
+        limits: Resource limits that timelines are checked against before
+            they are sent. See `estimate_timeline_footprint()`.
+        skip_unchanged: Skip directives equal to the last one of the same
+            type configured on the instrument in this session. See
+            `InstrumentDriver.apply()` for when the record is dropped.
+    """
     if instrument_info.definition.mode is not InstrumentMode.FIXED_TIMELINE:
         raise ValueError(
             f"Instrument mode is mismatched: '{instrument_info.definition.mode}' "
@@ -106,6 +304,13 @@ def create_instrument_driver_fixed_timeline(
         instrument_info.definition,
         instrument_info.config,
         session.agent_container.instrument(extract_unit_label(instrument_info.id)),
+        quantized_iq_encoding(instrument_info.config.bitdepth)
+        if quantized_transport
+        else None,
+        limits,
+        session._applied_directives.setdefault(instrument_info.id, {})
+        if skip_unchanged
+        else None,
     )
 
 
@@ -1,11 +1,16 @@
-from collections.abc import Collection, Sequence
+from collections.abc import AsyncIterator, Collection, Sequence
 from typing import Protocol
 
 from quelware_core.entities.directives import Directive
 from quelware_core.entities.instrument import InstrumentStatus
 from quelware_core.entities.resource import ResourceId
-from quelware_core.entities.result import ResultContainer
+from quelware_core.entities.result import (
+    ArrayAllocator,
+    ResultChunk,
+    ResultContainer,
+)
 from quelware_core.entities.session import SessionToken
+from quelware_core.entities.waveform.sampled import IqEncoding
 
 
 class InstrumentAgent(Protocol):
@@ -26,6 +31,7 @@ class InstrumentAgent(Protocol):
         token: SessionToken,
         resource_id: ResourceId,
         directives: Sequence[Directive],
+        iq_encoding: IqEncoding | None = None,
     ) -> bool: ...
 
     async def apply(
@@ -49,14 +55,27 @@ class InstrumentAgent(Protocol):
         self,
         token: SessionToken,
         resource_id: ResourceId,
+        allocate: ArrayAllocator | None = None,
     ) -> ResultContainer: ...
 
+    def stream_result(
+        self,
+        token: SessionToken,
+        resource_id: ResourceId,
+        chunk_iterations: int,
+    ) -> AsyncIterator[ResultChunk]: ...
+
     async def wait_for_result(
         self,
         token: SessionToken,
         resource_id: ResourceId,
         timeout_sec: float | None,
+        allocate: ArrayAllocator | None = None,
     ) -> ResultContainer: ...
 
+    def release_session(self, token: SessionToken) -> None:
+        """Drop client-side state kept for a closed session."""
+        ...
+
 
 __all__ = ["InstrumentAgent"]
@@ -0,0 +1,107 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+
+from quelware_core.entities.directives import Directive
+from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.result import ResultContainer
+
+from quelware_client.core import Session
+from quelware_client.core.instrument_driver import InstrumentDriver
+
+_DONE = object()
+
+
+@dataclass(frozen=True, eq=False)
+class PipelineJob:
+    """One shot of a pipelined run.
+
+    Attributes:
+        directives: Directives to configure on each driver before the shot.
+            Every driver is triggered and its result awaited.
+        wait_ms: Minimum trigger delay, as in `Session.trigger()`.
+        timeout_sec: Cap on the wait for each driver's result, as in
+            `InstrumentDriver.wait_for_result()`; ``None`` waits indefinitely.
+    """
+
+    directives: Mapping[InstrumentDriver, Sequence[Directive]]
+    wait_ms: int | None = None
+    timeout_sec: float | None = None
+
+
+async def run_pipeline(
+    session: Session, jobs: Iterable[PipelineJob], max_in_flight: int = 2
+) -> AsyncIterator[dict[ResourceId, ResultContainer]]:
+    """Run shots back to back, configuring the next while the current runs.
+
+    A shot is configured as soon as the previous one has been triggered,
+    which commits the previous configuration, and triggered once the
+    previous results are fetched. At most ``max_in_flight`` shots are
+    configured but not yet consumed by the caller, so a slow consumer stalls
+    the pipeline instead of letting results pile up; ``1`` runs shots one
+    after another. Results are yielded in job order, keyed by instrument id.
+
+    Raises:
+        ValueError: If ``max_in_flight`` is less than 1.
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1 (got {max_in_flight})")
+    slots = asyncio.Semaphore(max_in_flight)
+    # Instruments hold one pending configuration, committed by the trigger.
+    pending_free = asyncio.Semaphore(1)
+    staged: asyncio.Queue = asyncio.Queue(maxsize=1)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def configure():
+        try:
+            for job in jobs:
+                await slots.acquire()
+                await pending_free.acquire()
+                await asyncio.gather(
+                    *(
+                        driver.apply(directives)
+                        for driver, directives in job.directives.items()
+                    )
+                )
+                await staged.put(job)
+        except Exception as e:
+            # Raised to the caller after the results of earlier jobs.
+            await staged.put(e)
+        else:
+            await staged.put(_DONE)
+
+    async def execute():
+        try:
+            while isinstance(job := await staged.get(), PipelineJob):
+                drivers = list(job.directives)
+                await session.trigger(
+                    [d.instrument_id for d in drivers], wait_ms=job.wait_ms
+                )
+                pending_free.release()
+                containers = await asyncio.gather(
+                    *(d.wait_for_result(job.timeout_sec) for d in drivers)
+                )
+                results.put_nowait(
+                    {
+                        d.instrument_id: c
+                        for d, c in zip(drivers, containers, strict=True)
+                    }
+                )
+            results.put_nowait(job)
+        except Exception as e:
+            results.put_nowait(e)
+
+    tasks = [asyncio.create_task(configure()), asyncio.create_task(execute())]
+    try:
+        while (item := await results.get()) is not _DONE:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+            slots.release()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+__all__ = ["PipelineJob", "run_pipeline"]
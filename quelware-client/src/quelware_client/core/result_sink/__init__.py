@@ -0,0 +1,80 @@
+import hashlib
+import re
+import tempfile
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+import numpy.typing as npt
+from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.result import ArrayAllocator, CaptureWindowName
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _file_stem(name: CaptureWindowName) -> str:
+    safe = _UNSAFE_FILENAME_CHARS.sub("_", name)
+    if safe == name:
+        return name
+    # Keep names that only differ in replaced characters apart.
+    digest = hashlib.sha256(name.encode()).hexdigest()[:8]
+    return f"{safe}-{digest}"
+
+
+class ResultSink(Protocol):
+    def allocator(self, resource_id: ResourceId) -> ArrayAllocator: ...
+
+
+class MemmapResultSink(ResultSink):
+    """Decodes fetched results into memory-mapped `.npy` files.
+
+    Every fetch gets a fresh subdirectory of ``directory`` named after the
+    instrument, holding one file per capture window (``<window>.iq.npy`` for
+    complex data, ``<window>.int.npy`` for integers). Window names with
+    characters that are unsafe in file names are sanitized and get a hash
+    suffix, so distinct windows never share a file. The returned container's
+    arrays are `np.memmap` views of those files, so results larger than RAM
+    can be analysed page by page, and the files can be reopened later with
+    ``np.load(path, mmap_mode="r")``. Files are never deleted by the sink.
+
+    Waveform windows whose iterations differ in length cannot be stacked and
+    stay in memory.
+    """
+
+    def __init__(self, directory: str | Path):
+        self._directory = Path(directory)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def allocator(self, resource_id: ResourceId) -> ArrayAllocator:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        fetch_dir = Path(
+            tempfile.mkdtemp(
+                prefix=f"{_UNSAFE_FILENAME_CHARS.sub('_', resource_id)}-",
+                dir=self._directory,
+            )
+        )
+        used: set[Path] = set()
+
+        def allocate(
+            name: CaptureWindowName, shape: tuple[int, ...], dtype: np.dtype
+        ) -> npt.NDArray:
+            if 0 in shape:
+                # Empty files cannot be memory-mapped.
+                return np.empty(shape, dtype=dtype)
+            suffix = "iq" if np.dtype(dtype).kind == "c" else "int"
+            path = fetch_dir / f"{_file_stem(name)}.{suffix}.npy"
+            if path in used:
+                raise ValueError(
+                    f"Capture window '{name}' maps to a file already used in this "
+                    f"fetch: {path}"
+                )
+            used.add(path)
+            return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+        return allocate
+
+
+__all__ = ["MemmapResultSink", "ResultSink"]
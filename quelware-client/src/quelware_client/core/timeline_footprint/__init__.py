@@ -0,0 +1,108 @@
+import math
+from dataclasses import dataclass, fields
+
+from quelware_core.entities.directives import SetFixedTimeline
+from quelware_core.entities.instrument import FixedTimelineConfig
+from quelware_core.entities.waveform.sampled import IqWaveform
+
+from quelware_client.core.exceptions import TimelineLimitExceededError
+
+
+@dataclass(frozen=True)
+class TimelineFootprint:
+    """Instrument resources used by a fixed timeline.
+
+    Waveform samples are counted at the instrument's sampling period and
+    padded to whole ticks; each sample takes two words of the DAC bitdepth,
+    rounded up to bytes.
+    """
+
+    waveform_count: int
+    waveform_samples: int
+    waveform_bytes: int
+    event_count: int
+    capture_window_count: int
+    capture_samples: int
+    length_samples: int
+    length_ticks: int
+
+
+@dataclass(frozen=True)
+class TimelineLimits:
+    """Upper bounds on a `TimelineFootprint`; `None` leaves a field unchecked."""
+
+    waveform_count: int | None = None
+    waveform_samples: int | None = None
+    waveform_bytes: int | None = None
+    event_count: int | None = None
+    capture_window_count: int | None = None
+    capture_samples: int | None = None
+    length_samples: int | None = None
+    length_ticks: int | None = None
+
+
+def estimate_timeline_footprint(
+    directive: SetFixedTimeline, config: FixedTimelineConfig
+) -> TimelineFootprint:
+    """Estimate the instrument resources that ``directive`` occupies.
+
+    Library entries sent as `WaveformRef` are already on the instrument and
+    are not counted.
+    """
+    bytes_per_sample = 2 * math.ceil(config.bitdepth / 8)
+    waveform_samples = 0
+    waveform_count = 0
+    for waveform in directive.waveform_library:
+        if not isinstance(waveform, IqWaveform):
+            continue
+        samples = math.ceil(
+            len(waveform.iq_array)
+            * waveform.sampling_period_fs
+            / config.sampling_period_fs
+        )
+        waveform_samples += _round_up(samples, config.samples_per_tick)
+        waveform_count += 1
+
+    length_samples = _round_up(directive.length, config.timeline_step_samples)
+    return TimelineFootprint(
+        waveform_count=waveform_count,
+        waveform_samples=waveform_samples,
+        waveform_bytes=waveform_samples * bytes_per_sample,
+        event_count=len(directive.events),
+        capture_window_count=len(directive.capture_windows),
+        capture_samples=sum(c.length_samples for c in directive.capture_windows),
+        length_samples=length_samples,
+        length_ticks=math.ceil(length_samples / max(config.samples_per_tick, 1)),
+    )
+
+
+def check_timeline_limits(footprint: TimelineFootprint, limits: TimelineLimits):
+    """Raise if any field of ``footprint`` exceeds its limit.
+
+    Raises:
+        TimelineLimitExceededError: Listing every exceeded limit.
+    """
+    exceeded = [
+        f"{f.name} {getattr(footprint, f.name)} > {limit}"
+        for f in fields(limits)
+        if (limit := getattr(limits, f.name)) is not None
+        and getattr(footprint, f.name) > limit
+    ]
+    if exceeded:
+        raise TimelineLimitExceededError(
+            "The timeline exceeds the instrument limits: " + ", ".join(exceeded)
+        )
+
+
+def _round_up(value: int, step: int) -> int:
+    if step <= 1:
+        return value
+    return -(-value // step) * step
+
+
+__all__ = [
+    "TimelineFootprint",
+    "TimelineLimits",
+    "check_timeline_limits",
+    "estimate_timeline_footprint",
+]
@@ -1,30 +1,110 @@
 import asyncio
-from collections.abc import Collection, Sequence
+from collections.abc import (
+    AsyncIterator,
+    Collection,
+    Container,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from concurrent.futures import Executor
 
 import quelware_core.pb.quelware.instrument.v1 as pb_inst
+import quelware_core.pb.quelware.models.v1 as pb_models
 from grpclib import GRPCError
 from grpclib.client import Channel
 from grpclib.const import Status
 from quelware_core.entities import directives
 from quelware_core.entities.instrument import InstrumentStatus
 from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.result import ArrayAllocator, ResultChunk
 from quelware_core.entities.session import SessionToken
-from quelware_core.pb_converter.directive import directive_to_pb
+from quelware_core.entities.waveform.sampled import IqEncoding
+from quelware_core.pb_converter.directive import directive_to_pb, iq_encoding_to_pb
 from quelware_core.pb_converter.instrument import instrument_status_from_pb
 from quelware_core.pb_converter.result import result_container_from_pb
 from typing_extensions import override
 
+from quelware_client.core.exceptions import ServiceUnavailableError
 from quelware_client.core.interfaces.instrument_agent import (
     InstrumentAgent,
     ResultContainer,
 )
 from quelware_client.infra._grpc_retry import call_with_retry
 
+_DEFAULT_ACCEPTED_IQ_ENCODINGS = (IqEncoding.PACKED_FLOAT64,)
+# Preferred ahead of the defaults with ``quantized_results=True``.
+_QUANTIZED_ACCEPTED_IQ_ENCODINGS = (IqEncoding.PACKED_INT16, IqEncoding.PACKED_INT32)
+
+
+def _directives_to_pb(
+    directives: Sequence[directives.Directive],
+    iq_encoding: IqEncoding,
+    uploaded_digests: Container[bytes] | None,
+) -> list[pb_models.Directive]:
+    return [directive_to_pb(d, iq_encoding, uploaded_digests) for d in directives]
+
+
+def _uploaded_digests_of(req: pb_inst.ConfigureRequest) -> Iterator[bytes]:
+    for directive in req.directives:
+        timeline = directive.fixed_timeline_sampled_waveform
+        if timeline is None or timeline.set_timeline is None:
+            continue
+        for waveform in timeline.set_timeline.waveform_library:
+            if waveform.sampled is not None and waveform.digest:
+                yield waveform.digest
+
 
 class InstrumentAgentGrpc(InstrumentAgent):
-    def __init__(self, grpc_channel: Channel, metadata=None):
+    def __init__(
+        self,
+        grpc_channel: Channel,
+        metadata=None,
+        iq_encoding: IqEncoding = IqEncoding.LISTS,
+        accepted_iq_encodings: Iterable[IqEncoding] = _DEFAULT_ACCEPTED_IQ_ENCODINGS,
+        waveform_cache: bool = False,
+        encode_executor: Executor | None = None,
+        quantized_results: bool = False,
+    ):
+        """Create an instrument agent on a gRPC channel.
+
+        Args:
+            grpc_channel: Channel to the server hosting the instruments.
+            metadata: Metadata attached to every call.
+            iq_encoding: Default encoding of waveform samples sent with
+                `configure()`. Packed encodings require server support, so the
+                default is the list encoding every server understands.
+            accepted_iq_encodings: Packed encodings advertised to the server
+                when fetching results, in order of preference. Servers that
+                support none of them reply with the list encoding, which is
+                always accepted. Defaults to lossless float64.
+            waveform_cache: Upload each waveform once per session and
+                instrument, and refer to it by digest in later `configure()`
+                calls. Requires server support for `WaveformRef`.
+            encode_executor: Executor that encodes directives to protobuf in
+                `configure()`, keeping large waveform libraries from blocking
+                the event loop. Thread and process pools are both accepted.
+                `None` encodes on the event loop.
+            quantized_results: Also accept int16 and int32 results, ahead of
+                ``accepted_iq_encodings``. They decode to complex64 and are
+                only exact for integer-valued data, such as raw ADC counts;
+                see `iq_quantization_is_exact()`.
+        """
         self._channel = grpc_channel
         self._service = pb_inst.InstrumentServiceStub(self._channel, metadata=metadata)
+        self._iq_encoding = iq_encoding
+        self._accepted_iq_encodings = [
+            iq_encoding_to_pb(e)
+            for e in dict.fromkeys(
+                (*_QUANTIZED_ACCEPTED_IQ_ENCODINGS, *accepted_iq_encodings)
+                if quantized_results
+                else accepted_iq_encodings
+            )
+            if e is not IqEncoding.LISTS
+        ]
+        self._waveform_cache = waveform_cache
+        self._encode_executor = encode_executor
+        self._uploaded_digests: dict[tuple[SessionToken, ResourceId], set[bytes]] = {}
 
     @override
     async def get_status(
@@ -52,6 +132,13 @@ class InstrumentAgentGrpc(InstrumentAgent):
         metadata = dict(self._service.metadata or {})
         metadata["x-session-token"] = str(token)
         await call_with_retry(lambda: self._service.initialize(req, metadata=metadata))
+        for rid in resource_ids:
+            self._uploaded_digests.pop((token, rid), None)
+
+    @override
+    def release_session(self, token: SessionToken) -> None:
+        for key in [k for k in self._uploaded_digests if k[0] == token]:
+            del self._uploaded_digests[key]
 
     @override
     async def configure(
@@ -59,16 +146,64 @@ class InstrumentAgentGrpc(InstrumentAgent):
         token: SessionToken,
         resource_id: ResourceId,
         directives: Sequence[directives.Directive],
+        iq_encoding: IqEncoding | None = None,
     ) -> bool:
+        if iq_encoding is None:
+            iq_encoding = self._iq_encoding
+        metadata = dict(self._service.metadata or {})
+        metadata["x-session-token"] = str(token)
+
+        if not self._waveform_cache:
+            req = pb_inst.ConfigureRequest(
+                resource_id=resource_id,
+                directives=await self._encode(directives, iq_encoding, None),
+            )
+            await call_with_retry(
+                lambda: self._service.configure(req, metadata=metadata)
+            )
+            return True
+
+        uploaded = self._uploaded_digests.setdefault((token, resource_id), set())
         req = pb_inst.ConfigureRequest(
             resource_id=resource_id,
-            directives=[directive_to_pb(d) for d in directives],
+            directives=await self._encode(directives, iq_encoding, uploaded),
         )
-        metadata = dict(self._service.metadata or {})
-        metadata["x-session-token"] = str(token)
-        await call_with_retry(lambda: self._service.configure(req, metadata=metadata))
+        try:
+            await call_with_retry(
+                lambda: self._service.configure(req, metadata=metadata)
+            )
+        except GRPCError as e:
+            if e.status is not Status.NOT_FOUND or not uploaded:
+                raise
+            # The server lost waveforms we assumed uploaded; send all samples.
+            uploaded.clear()
+            req = pb_inst.ConfigureRequest(
+                resource_id=resource_id,
+                directives=await self._encode(directives, iq_encoding, uploaded),
+            )
+            await call_with_retry(
+                lambda: self._service.configure(req, metadata=metadata)
+            )
+        uploaded.update(_uploaded_digests_of(req))
         return True
 
+    async def _encode(
+        self,
+        directives: Sequence[directives.Directive],
+        iq_encoding: IqEncoding,
+        uploaded_digests: set[bytes] | None,
+    ) -> list[pb_models.Directive]:
+        if self._encode_executor is None:
+            return _directives_to_pb(directives, iq_encoding, uploaded_digests)
+        snapshot = None if uploaded_digests is None else frozenset(uploaded_digests)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._encode_executor,
+            _directives_to_pb,
+            list(directives),
+            iq_encoding,
+            snapshot,
+        )
+
     @override
     async def apply(
         self,
@@ -115,8 +250,12 @@ class InstrumentAgentGrpc(InstrumentAgent):
         self,
         token: SessionToken,
         resource_id: ResourceId,
+        allocate: ArrayAllocator | None = None,
     ) -> ResultContainer:
-        req = pb_inst.FetchResultRequest(resource_id=str(resource_id))
+        req = pb_inst.FetchResultRequest(
+            resource_id=str(resource_id),
+            accepted_iq_encodings=self._accepted_iq_encodings,
+        )
         metadata = dict(self._service.metadata or {})
         metadata["x-session-token"] = str(token)
         resp = await call_with_retry(
@@ -124,21 +263,57 @@ class InstrumentAgentGrpc(InstrumentAgent):
         )
 
         if resp.result_container:
-            return result_container_from_pb(resp.result_container)
+            # Windows are decoded on first access unless a sink needs them
+            # written out right away.
+            return result_container_from_pb(
+                resp.result_container, allocate, lazy=allocate is None
+            )
 
         return ResultContainer()
 
+    @override
+    async def stream_result(
+        self,
+        token: SessionToken,
+        resource_id: ResourceId,
+        chunk_iterations: int,
+    ) -> AsyncIterator[ResultChunk]:
+        req = pb_inst.FetchResultStreamRequest(
+            resource_id=str(resource_id),
+            chunk_iterations=chunk_iterations,
+            accepted_iq_encodings=self._accepted_iq_encodings,
+        )
+        metadata = dict(self._service.metadata or {})
+        metadata["x-session-token"] = str(token)
+        try:
+            async for resp in self._service.fetch_result_stream(req, metadata=metadata):
+                yield ResultChunk(
+                    first_iteration=resp.first_iteration,
+                    container=result_container_from_pb(
+                        resp.result_container or pb_models.ResultContainer()
+                    ),
+                )
+        except GRPCError as e:
+            if e.status is Status.UNIMPLEMENTED:
+                raise ServiceUnavailableError(
+                    f"FetchResultStream is not available: {e.message}"
+                ) from e
+            raise
+
     @override
     async def wait_for_result(
         self,
         token: SessionToken,
         resource_id: ResourceId,
         timeout_sec: float | None,
+        allocate: ArrayAllocator | None = None,
     ) -> ResultContainer:
+        args = () if allocate is None else (allocate,)
+
         async def _loop() -> ResultContainer:
             while True:
                 try:
-                    return await self.fetch_result(token, resource_id)
+                    return await self.fetch_result(token, resource_id, *args)
                 except GRPCError as e:
                     if e.status is not Status.DEADLINE_EXCEEDED:
                         raise
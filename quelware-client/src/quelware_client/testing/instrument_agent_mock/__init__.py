@@ -1,9 +1,11 @@
-from collections.abc import Collection, Sequence
+from collections.abc import AsyncIterator, Collection, Sequence
 
 from quelware_core.entities.directives import Directive
 from quelware_core.entities.instrument import InstrumentStatus
 from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.result import ArrayAllocator, ResultChunk
 from quelware_core.entities.session import SessionToken
+from quelware_core.entities.waveform.sampled import IqEncoding
 
 from quelware_client.core.interfaces.instrument_agent import (
     InstrumentAgent,
@@ -30,6 +32,7 @@ class InstrumentAgentMock(InstrumentAgent):
         token: SessionToken,
         resource_id: ResourceId,
         directives: Sequence[Directive],
+        iq_encoding: IqEncoding | None = None,
     ) -> bool:
         return True
 
@@ -57,14 +60,25 @@ class InstrumentAgentMock(InstrumentAgent):
         self,
         token: SessionToken,
         resource_id: ResourceId,
+        allocate: ArrayAllocator | None = None,
     ) -> ResultContainer:
         return ResultContainer()
 
+    async def stream_result(
+        self,
+        token: SessionToken,
+        resource_id: ResourceId,
+        chunk_iterations: int,
+    ) -> AsyncIterator[ResultChunk]:
+        result = await self.fetch_result(token, resource_id)
+        yield ResultChunk(first_iteration=0, container=result.to_columnar())
+
     async def wait_for_result(
         self,
         token: SessionToken,
         resource_id: ResourceId,
         timeout_sec: float | None,
+        allocate: ArrayAllocator | None = None,
     ) -> ResultContainer:
         return ResultContainer()
 
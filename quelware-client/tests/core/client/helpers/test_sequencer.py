@@ -1,8 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pytest
+import quelware_core.pb.quelware.models.v1 as pb_models
 from quelware_core.entities.directives import SetFixedTimeline
+from quelware_core.pb_converter.directive import directive_from_pb
 
-from quelware_client.client.helpers.sequencer import Sequencer
+from quelware_client.client.helpers.sequencer import (
+    FemtosecondArray,
+    Femtoseconds,
+    Parameter,
+    SampleArray,
+    Samples,
+    Sequencer,
+)
 
 
 def test_waveform_amplitude_validation():
@@ -11,7 +22,7 @@ def test_waveform_amplitude_validation():
     valid_waveform = np.array([0.5, 0.5j, -0.5, -0.5j])
     seq.register_waveform("valid_pulse", valid_waveform)
 
-    assert "valid_pulse" in seq._waveform_library
+    assert "valid_pulse" in seq.waveform_names
 
     invalid_waveform = np.array([1.1, 0.0])
     with pytest.raises(ValueError, match="amplitude must be in the range"):
@@ -67,3 +78,438 @@ def test_timeline_alignment_pads_to_lcm_step_samples():
     # Padded samples: 48.0ns / 0.5ns = 96
     expected_padded_samples = 96
     assert directive.length == expected_padded_samples
+
+
+def test_export_numbers_waveforms_by_first_use_per_alias():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.bind("inst2", sampling_period_fs=1_000_000, step_samples=4)
+    for amplitude, name in enumerate(("a", "b", "c"), start=1):
+        seq.register_waveform(name, np.array([0.1 * amplitude]))
+
+    seq.add_event("inst1", "c", start_offset_ns=0.0)
+    seq.add_event("inst1", "a", start_offset_ns=4.0, gain=0.5)
+    seq.add_event("inst1", "c", start_offset_ns=8.0, phase_offset_deg=45.0)
+    seq.add_event("inst2", "b", start_offset_ns=0.0)
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+
+    assert len(directive.waveform_library) == 2
+    assert [e.waveform_index for e in directive.events] == [0, 1, 0]
+    assert [e.start_offset_samples for e in directive.events] == [0, 4, 8]
+    assert directive.events[1].gain == 0.5
+    assert directive.events[2].phase_offset_deg == 45.0
+    assert len(seq.export_set_fixed_timeline_directive("inst2").events) == 1
+
+
+def test_export_handles_many_events():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.register_waveform("x", np.array([0.5, 0.5]))
+    seq.register_waveform("y", np.array([0.5j, 0.5j]))
+
+    n_events = 10_000
+    for i in range(n_events):
+        seq.add_event("inst1", "xy"[i % 2], start_offset_ns=4.0 * i, gain=i / n_events)
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+
+    assert len(directive.events) == n_events
+    assert directive.events[n_events - 1].waveform_index == 1
+    assert directive.events[n_events - 1].start_offset_samples == 4 * (n_events - 1)
+    assert directive.events[n_events - 1].gain == (n_events - 1) / n_events
+
+
+def test_add_events_matches_add_event():
+    def build(bulk: bool) -> SetFixedTimeline:
+        seq = Sequencer(default_sampling_period_ns=1.0)
+        seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+        seq.register_waveform("x", np.array([0.5, 0.5]))
+        seq.register_waveform("y", np.array([0.5j]))
+        names = ["y", "x", "y"]
+        offsets = [0.0, 8.0, 20.0]
+        gains = [1.0, 0.5, 0.25]
+        if bulk:
+            seq.add_events("inst1", names, offsets, gains, phase_offsets_deg=30.0)
+        else:
+            for name, offset, gain in zip(names, offsets, gains, strict=True):
+                seq.add_event("inst1", name, offset, gain, phase_offset_deg=30.0)
+        return seq.export_set_fixed_timeline_directive("inst1")
+
+    bulk, single = build(bulk=True), build(bulk=False)
+
+    assert list(bulk.events) == list(single.events)
+    assert bulk.length == single.length
+
+
+def test_add_events_accepts_waveform_indices():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.register_waveform("x", np.array([0.5]))
+    seq.register_waveform("y", np.array([0.5j]))
+
+    seq.add_events("inst1", np.array([1, 0, 1]), np.arange(3) * 4.0)
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+    assert seq.waveform_names == ["x", "y"]
+    assert [e.waveform_index for e in directive.events] == [0, 1, 0]
+    assert directive.waveform_library[0].iq_array[0] == 0.5j
+
+
+def test_add_events_reports_every_invalid_element_and_adds_nothing():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=2_000_000, step_samples=4)
+    seq.register_waveform("x", np.array([0.5]))
+
+    with pytest.raises(ValueError, match=r"2 .* \[1\] 3.0 ns, \[3\] 5.0 ns"):
+        seq.add_events("inst1", ["x"] * 4, [0.0, 3.0, 4.0, 5.0])
+    with pytest.raises(ValueError, match=r"\[1\] 'missing'"):
+        seq.add_events("inst1", ["x", "missing"], [0.0, 2.0])
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+    assert len(directive.events) == 0
+
+
+def test_add_capture_windows():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+
+    seq.add_capture_windows("inst1", ["a", "b"], [0.0, 100.0], lengths_ns=50.0)
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+    assert [
+        (c.name, c.start_offset_samples, c.length_samples)
+        for c in directive.capture_windows
+    ] == [
+        ("a", 0, 50),
+        ("b", 100, 50),
+    ]
+    assert directive.length == 152
+
+    with pytest.raises(ValueError, match=r"\[0\] 0.5 ns"):
+        seq.add_capture_windows("inst1", ["c"], [200.0], lengths_ns=[0.5])
+    with pytest.raises(ValueError) as excinfo:
+        seq.add_capture_windows("inst1", ["c", "d"], [1.5, 0.0], lengths_ns=[8.0, 3.5])
+    assert "start_offset_ns value(s): [0] 1.5 ns" in str(excinfo.value)
+    assert "length_ns value(s): [1] 3.5 ns" in str(excinfo.value)
+
+
+def test_exact_time_units_on_long_timelines():
+    seq = Sequencer(default_sampling_period_ns=Femtoseconds(400_000))
+    seq.bind("inst1", sampling_period_fs=400_000, step_samples=1)
+    seq.register_waveform("x", np.array([0.5]))
+
+    # 1 hour plus one sample: not representable exactly in float nanoseconds.
+    far = 9_000_000_000_001
+    seq.add_event("inst1", "x", start_offset_ns=Samples(far))
+    seq.add_event("inst1", "x", start_offset_ns=Femtoseconds(far * 400_000 + 800_000))
+    seq.add_events("inst1", ["x"], SampleArray(np.array([far + 4])))
+    seq.add_events("inst1", ["x"], FemtosecondArray(np.array([(far + 6) * 400_000])))
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+    assert directive.events.start_offsets_samples.tolist() == [
+        far,
+        far + 2,
+        far + 4,
+        far + 6,
+    ]
+    assert directive.length == far + 7
+
+    with pytest.raises(ValueError, match=r"1 fs"):
+        seq.add_event("inst1", "x", start_offset_ns=Femtoseconds(1))
+
+
+def test_rebinding_alias_with_content_is_rejected():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.bind("inst1", sampling_period_fs=2_000_000, step_samples=4)
+    seq.add_capture_window("inst1", "a", Samples(0), Samples(8))
+
+    seq.bind("inst1", sampling_period_fs=2_000_000, step_samples=4)
+    with pytest.raises(ValueError, match="cannot be rebound"):
+        seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+
+
+def test_compile_rebuilds_only_changed_aliases():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    for alias in ("inst1", "inst2"):
+        seq.bind(alias, sampling_period_fs=1_000_000, step_samples=4)
+    seq.register_waveform("x", np.array([0.5] * 4))
+    seq.register_waveform("y", np.array([0.5] * 4))
+    seq.add_event("inst1", "x", 0.0)
+    seq.add_event("inst2", "y", 0.0)
+
+    first = seq.compile()
+    seq.add_event("inst1", "x", 8.0)
+    second = seq.compile()
+    # inst2 only picks up the new shared length; its content is reused.
+    assert second["inst2"].events is first["inst2"].events
+    assert second["inst2"].length == 12
+    assert second["inst1"].events is not first["inst1"].events
+    assert len(second["inst1"].events) == 2
+
+    seq.register_waveform("y", np.array([0.25] * 4))
+    third = seq.compile()
+    assert third["inst1"] is second["inst1"]
+    assert third["inst2"] is not second["inst2"]
+    assert third["inst2"].waveform_library[0].iq_array[0] == 0.25
+
+    seq.extend_length_ns(100.0)
+    seq.set_iterations(3)
+    directive = seq.export_set_fixed_timeline_directive("inst2")
+    assert (directive.length, directive.iterations) == (112, 3)
+    assert directive.events is third["inst2"].events
+
+
+def test_template_patches_parameters_per_point():
+    seq = Sequencer(default_sampling_period_ns=2.0)
+    seq.bind("inst1", sampling_period_fs=2_000_000, step_samples=4)
+    seq.register_waveform("x", np.array([0.5] * 4))
+    seq.add_event("inst1", "x", 0.0, gain=Parameter("amp"))
+    seq.add_event("inst1", "x", Parameter("delay"), phase_offset_deg=Parameter("phase"))
+    seq.add_capture_window("inst1", "cap", 0.0, 8.0)
+    seq.extend_length_ns(24.0)
+
+    with pytest.raises(ValueError, match="template"):
+        seq.export_set_fixed_timeline_directive("inst1")
+    assert seq.compile() == {}
+
+    template = seq.template("inst1")
+    assert template.parameters == ["amp", "delay", "phase"]
+
+    points = list(template.sweep(amp=[0.1, 0.2], delay=Samples(8), phase=90.0))
+    assert [p.events.gains.tolist() for p in points] == [[0.1, 1.0], [0.2, 1.0]]
+    assert points[0].events.start_offsets_samples.tolist() == [0, 8]
+    assert points[0].events.phase_offsets_deg.tolist() == [0.0, 90.0]
+    assert points[0].waveform_library is points[1].waveform_library
+    assert points[0].events.waveform_indices is points[1].events.waveform_indices
+
+    for delays in (
+        [Samples(4), Samples(8)],
+        SampleArray(np.array([4, 8])),
+        FemtosecondArray(np.array([8_000_000, 16_000_000])),
+        [8.0, 16.0],
+    ):
+        points = list(template.sweep(amp=1.0, delay=delays, phase=0.0))
+        assert [p.events.start_offsets_samples[1] for p in points] == [4, 8]
+    instantiated = template.instantiate(amp=1.0, delay=Samples(8), phase=0.0)
+    assert instantiated.events.start_offsets_samples[1] == 8
+
+    with pytest.raises(ValueError, match="timeline end"):
+        template.instantiate(amp=0.1, delay=40.0, phase=0.0)
+    with pytest.raises(ValueError, match=r"missing \['phase'\]"):
+        template.instantiate(amp=0.1, delay=0.0)
+
+
+def test_identical_waveforms_share_a_library_entry():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    envelope = np.hanning(8) * 0.5
+    for name in ("a", "b"):
+        seq.register_waveform(name, envelope)
+    seq.register_waveform("c", envelope * 0.5j)
+    for i, name in enumerate(("a", "b", "c")):
+        seq.add_event("inst1", name, 8.0 * i)
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+    assert len(directive.waveform_library) == 2
+    assert directive.events.waveform_indices.tolist() == [0, 0, 1]
+
+
+def test_scalar_multiples_fold_into_gain_and_phase():
+    seq = Sequencer(default_sampling_period_ns=1.0, dedupe_scalar_multiples=True)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    envelope = np.hanning(8)
+    seq.register_waveform("small", envelope * 0.25)
+    seq.add_event("inst1", "small", 0.0, gain=0.5)
+    seq.register_waveform("large", envelope * 0.5j)
+    seq.add_event("inst1", "large", 8.0, phase_offset_deg=10.0)
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+    (entry,) = directive.waveform_library
+    np.testing.assert_allclose(entry.iq_array, envelope * 0.5j)
+    np.testing.assert_allclose(directive.events.gains, [0.25, 1.0])
+    np.testing.assert_allclose(directive.events.phase_offsets_deg, [-90.0, 10.0])
+    for event, expected in zip(
+        directive.events,
+        (envelope * 0.125, envelope * 0.5j * np.exp(1j * np.radians(10))),
+        strict=True,
+    ):
+        rotation = np.exp(1j * np.radians(event.phase_offset_deg))
+        np.testing.assert_allclose(
+            entry.iq_array * event.gain * rotation, expected, atol=1e-12
+        )
+
+
+def test_overlapping_events_and_windows_are_reported(caplog):
+    seq = Sequencer(default_sampling_period_ns=1.0, strict_overlaps=True)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.register_waveform("x", np.array([0.5] * 8))
+    seq.add_events("inst1", ["x"] * 4, [16.0, 0.0, 8.0, 4.0])
+    seq.add_capture_windows("inst1", ["a", "b"], [0.0, 10.0], lengths_ns=[10.0, 4.0])
+
+    with pytest.raises(ValueError, match="2 overlapping event") as excinfo:
+        seq.export_set_fixed_timeline_directive("inst1")
+    message = str(excinfo.value)
+    assert "#3 [4, 12) overlaps #1 [0, 8)" in message
+    assert "#2 [8, 16) overlaps #3 [4, 12)" in message
+    assert "overlapping capture window" not in message
+
+    relaxed = Sequencer(default_sampling_period_ns=1.0)
+    relaxed.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    relaxed.add_capture_windows("inst1", ["a", "b"], [0.0, 8.0], lengths_ns=10.0)
+    relaxed.export_set_fixed_timeline_directive("inst1")
+    assert "b [8, 18) overlaps a [0, 10)" in caplog.text
+
+
+def test_strict_overlaps_ignore_parameterized_offsets():
+    seq = Sequencer(default_sampling_period_ns=1.0, strict_overlaps=True)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.register_waveform("x", np.array([0.5] * 8))
+    seq.add_event("inst1", "x", 0.0)
+    seq.add_event("inst1", "x", Parameter("delay"))
+    seq.extend_length_ns(32.0)
+
+    template = seq.template("inst1")
+    assert template.instantiate(delay=16.0).events.start_offsets_samples[1] == 16
+
+    seq.add_event("inst1", "x", 4.0)
+    with pytest.raises(ValueError, match=r"#2 \[4, 12\) overlaps #0 \[0, 8\)"):
+        seq.template("inst1")
+
+
+def test_export_all_builds_aliases_in_executor():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    aliases = [f"inst{i}" for i in range(8)]
+    seq.register_waveform("x", np.array([0.5] * 4))
+    for i, alias in enumerate(aliases):
+        seq.bind(alias, sampling_period_fs=1_000_000, step_samples=4)
+        seq.add_events(alias, ["x"] * (i + 1), np.arange(i + 1) * 4.0)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        exported = seq.export_all(executor)
+
+    assert list(exported) == aliases
+    assert [len(d.events) for d in exported.values()] == list(range(1, 9))
+    assert {d.length for d in exported.values()} == {32}
+    assert seq.export_all() == exported
+
+
+@pytest.mark.asyncio
+async def test_export_all_async_builds_aliases_off_the_loop():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.register_waveform("x", np.array([0.5] * 4))
+    for i in range(4):
+        seq.bind(f"inst{i}", sampling_period_fs=1_000_000, step_samples=4)
+        seq.add_events(f"inst{i}", ["x"] * (i + 1), np.arange(i + 1) * 4.0)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        exported = await seq.export_all_async(executor)
+
+    assert [len(d.events) for d in exported.values()] == [1, 2, 3, 4]
+    assert await seq.export_all_async() == exported
+
+
+def test_register_waveform_stores_read_only_view_without_copy():
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    samples = np.full(8, 0.5 + 0.5j)
+    seq.register_waveform("x", samples)
+    seq.add_event("inst1", "x", 0.0)
+
+    (stored,) = seq.export_set_fixed_timeline_directive("inst1").waveform_library
+    assert np.shares_memory(stored.iq_array, samples)
+    assert not stored.iq_array.flags.writeable
+    assert samples.flags.writeable
+
+    with pytest.raises(ValueError, match="amplitude"):
+        seq.register_waveform("y", np.array([0.8 + 0.8j]))
+
+
+def test_complex64_storage_is_kept_through_export():
+    seq = Sequencer(
+        default_sampling_period_ns=1.0,
+        dedupe_scalar_multiples=True,
+        iq_dtype=np.complex64,
+    )
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    envelope = np.hanning(16)
+    seq.register_waveform("full", envelope)
+    seq.register_waveform("half", (envelope * 0.5).astype(np.complex64))
+    seq.add_event("inst1", "full", 0.0)
+    seq.add_event("inst1", "half", 16.0)
+
+    directive = seq.export_set_fixed_timeline_directive("inst1")
+    (entry,) = directive.waveform_library
+    assert entry.iq_array.dtype == np.complex64
+    np.testing.assert_allclose(directive.events.gains, [1.0, 0.5], rtol=1e-6)
+
+
+def _assert_same_timeline(actual: SetFixedTimeline, expected: SetFixedTimeline):
+    assert list(actual.events) == list(expected.events)
+    assert actual.capture_windows == expected.capture_windows
+    assert (actual.length, actual.iterations) == (expected.length, expected.iterations)
+    for a, e in zip(actual.waveform_library, expected.waveform_library, strict=True):
+        assert a.sampling_period_fs == e.sampling_period_fs
+        np.testing.assert_array_equal(a.iq_array, e.iq_array)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    seq = Sequencer(default_sampling_period_ns=1.0, dedupe_scalar_multiples=True)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.bind("inst2", sampling_period_fs=1_000_000, step_samples=4)
+    envelope = np.hanning(8) * 0.5
+    seq.register_waveform("a", envelope)
+    seq.register_waveform("b", envelope * 0.5j)
+    seq.add_events(
+        "inst1", ["a", "b"] * 50, FemtosecondArray.from_ns(np.arange(100) * 8)
+    )
+    seq.add_capture_window("inst1", "cap", 0.0, 16.0)
+    seq.add_event("inst2", "a", Parameter("delay"))
+    seq.set_iterations(4)
+    path = tmp_path / "experiment.qwseq"
+    seq.save(path, include_encoded_directives=True)
+
+    loaded = Sequencer.load(path)
+    assert loaded.waveform_names == ["a", "b"]
+    _assert_same_timeline(
+        loaded.export_set_fixed_timeline_directive("inst1"),
+        seq.export_set_fixed_timeline_directive("inst1"),
+    )
+    (entry,) = loaded.export_set_fixed_timeline_directive("inst1").waveform_library
+    assert not entry.iq_array.flags.writeable
+    assert loaded.template("inst2").parameters == ["delay"]
+
+    (message,) = loaded.encoded_directives.values()
+    directive = directive_from_pb(pb_models.Directive.parse(message))
+    _assert_same_timeline(directive, seq.export_set_fixed_timeline_directive("inst1"))
+
+    loaded.add_event("inst1", "a", 800.0)
+    assert len(loaded.export_set_fixed_timeline_directive("inst1").events) == 101
+    assert len(Sequencer.load(path).export_all()["inst1"].events) == 100
+
+    (tmp_path / "other").write_bytes(b"not a sequencer")
+    with pytest.raises(ValueError, match="not a saved Sequencer"):
+        Sequencer.load(tmp_path / "other")
+
+
+def test_loaded_sequencer_can_be_saved_over_its_file(tmp_path):
+    seq = Sequencer(default_sampling_period_ns=1.0)
+    seq.bind("inst1", sampling_period_fs=1_000_000, step_samples=4)
+    seq.register_waveform("a", np.full(8, 0.5 + 0j))
+    seq.add_events("inst1", ["a"] * 4, np.arange(4) * 8.0)
+    path = tmp_path / "seq.qws"
+    seq.save(path)
+
+    loaded = Sequencer.load(path)
+    loaded.add_events("inst1", [], [])
+    loaded.set_iterations(3)
+    loaded.save(path)
+
+    reloaded = Sequencer.load(path)
+    assert reloaded.export_all()["inst1"].iterations == 3
+    _assert_same_timeline(
+        reloaded.export_set_fixed_timeline_directive("inst1"),
+        loaded.export_set_fixed_timeline_directive("inst1"),
+    )
+    assert [p.name for p in tmp_path.iterdir()] == ["seq.qws"]
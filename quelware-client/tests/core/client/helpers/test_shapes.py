@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from quelware_client.client.helpers.sequencer import Sequencer, shapes
+
+
+def test_shapes_are_sampled_on_the_grid():
+    period_fs = 1_000_000
+    rect = shapes.square(8.0, sampling_period_fs=period_fs, amplitude=0.5j)
+    np.testing.assert_array_equal(rect, np.full(8, 0.5j))
+
+    pulse = shapes.gaussian(9.0, 2.0, sampling_period_fs=period_fs)
+    assert len(pulse) == 9
+    assert pulse[4] == 1.0
+    np.testing.assert_allclose(pulse, pulse[::-1])
+
+    derivative = shapes.drag(9.0, 2.0, 1.0, sampling_period_fs=period_fs)
+    np.testing.assert_allclose(derivative.real, pulse.real)
+    np.testing.assert_allclose(derivative.imag, -derivative.imag[::-1], atol=1e-15)
+
+    window = shapes.cosine(8.0, sampling_period_fs=period_fs)
+    np.testing.assert_allclose(window, window[::-1])
+    assert 0 < window.real.min() < window.real.max() < 1
+
+    flat = shapes.flat_top(16.0, 4.0, sampling_period_fs=period_fs)
+    np.testing.assert_array_equal(flat[4:12], np.ones(8))
+    assert np.all(np.diff(flat[:4].real) > 0)
+
+    with pytest.raises(ValueError, match="not a multiple"):
+        shapes.square(1.5, sampling_period_fs=period_fs)
+    with pytest.raises(ValueError, match="exceed the duration"):
+        shapes.flat_top(4.0, 3.0, sampling_period_fs=period_fs)
+
+
+def test_shapes_are_cached_and_registered_without_copy():
+    shapes.clear_cache()
+    first = shapes.gaussian(16.0, 4.0, sampling_period_fs=400_000)
+    second = shapes.gaussian(16.0, 4.0, sampling_period_fs=400_000)
+    assert first is second
+    assert not first.flags.writeable
+    assert shapes.gaussian.cache_info().hits == 1
+
+    seq = Sequencer(default_sampling_period_ns=0.4)
+    seq.bind("inst1", sampling_period_fs=400_000, step_samples=4)
+    shapes.register(seq, "pi", shapes.gaussian, 16.0, 4.0)
+    seq.add_event("inst1", "pi", 0.0)
+
+    (entry,) = seq.export_set_fixed_timeline_directive("inst1").waveform_library
+    assert np.shares_memory(entry.iq_array, first)
@@ -1,3 +1,5 @@
+from unittest.mock import AsyncMock
+
 import pytest
 from quelware_core.entities.resource import (
     ResourceCategory,
@@ -10,6 +12,7 @@ from quelware_client.core import AgentContainer, QuelwareClient
 from quelware_client.core._session import Session
 from quelware_client.testing.instrument_agent_mock import InstrumentAgentMock
 from quelware_client.testing.resource_agent_mock import ResourceAgentMock
+from quelware_client.testing.session_agent_mock import SessionAgentMock
 from quelware_client.testing.system_configuration_agent_mock import (
     SystemConfigurationAgentMock,
 )
@@ -153,3 +156,19 @@ async def test_get_instrument():
     )
 
     await client.get_instrument_info(inst_id)
+
+
+@pytest.mark.asyncio
+async def test_session_pool_is_closed_on_stop():
+    agent = AgentContainer()
+    session_agent = SessionAgentMock()
+    session_agent.close_session = AsyncMock(return_value=True)  # type: ignore
+    agent.session = session_agent
+    client = QuelwareClient(agent=agent, skip_lock_check=True)
+
+    async with client.session_pool.acquire(["unit-a:p1"]) as session:
+        assert session.lease_active
+    await client.stop()
+
+    session_agent.close_session.assert_awaited_once_with(session.token)  # type: ignore
+    assert not session.lease_active
@@ -1,3 +1,6 @@
+import dataclasses
+
+import numpy as np
 import pytest
 from quelware_core.entities import directives
 from quelware_core.entities.instrument import (
@@ -8,17 +11,33 @@ from quelware_core.entities.instrument import (
     InstrumentMode,
     InstrumentRole,
 )
-from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.resource import ResourceCategory, ResourceId, ResourceInfo
+from quelware_core.entities.result import (
+    ColumnarResultContainer,
+    ResultChunk,
+    ResultContainer,
+)
 from quelware_core.entities.session import SessionToken
 from quelware_core.entities.unit import UnitLabel
+from quelware_core.entities.waveform.sampled import (
+    IqEncoding,
+    IqWaveform,
+    quantized_iq_encoding,
+)
 
 from quelware_client.core import Session
 from quelware_client.core._agent_container import AgentContainer
+from quelware_client.core.exceptions import (
+    ServiceUnavailableError,
+    TimelineLimitExceededError,
+)
 from quelware_client.core.instrument_driver import (
     InstrumentDriver,
     create_instrument_driver_fixed_timeline,
 )
+from quelware_client.core.timeline_footprint import TimelineLimits
 from quelware_client.testing.instrument_agent_mock import InstrumentAgentMock
+from quelware_client.testing.resource_agent_mock import ResourceAgentMock
 
 
 def _create_inst_driver():
@@ -85,6 +104,50 @@ def test_create_instrument_driver_fixed_timeline():
     create_instrument_driver_fixed_timeline(session, instrument_info)
 
 
+@pytest.mark.asyncio
+async def test_skip_unchanged_state_is_shared_and_reset_by_the_session():
+    agent = _RecordingAgent()
+    agent_container = AgentContainer()
+    agent_container.update_instrument_agent(UnitLabel("unit-a"), agent)
+    agent_container.update_resource_agent(
+        UnitLabel("unit-a"),
+        ResourceAgentMock(
+            [ResourceInfo(ResourceId("unit-a:p1"), ResourceCategory.PORT)]
+        ),
+    )
+    session = Session(
+        resource_ids=[ResourceId("unit-a:i1")],
+        agent=agent_container,
+        token=SessionToken("token"),
+    )
+    driver = _create_inst_driver()
+    info = InstrumentInfo(
+        id=ResourceId("unit-a:i1"),
+        port_id=ResourceId("unit-a:p1"),
+        definition=driver._definition,
+        config=driver.instrument_config,
+    )
+    frequency = directives.SetFrequency(60_000_000)
+
+    await create_instrument_driver_fixed_timeline(session, info).apply(frequency)
+    await create_instrument_driver_fixed_timeline(session, info).apply(frequency)
+    assert len(agent.configured) == 2
+
+    first, second = (
+        create_instrument_driver_fixed_timeline(session, info, skip_unchanged=True)
+        for _ in range(2)
+    )
+    await first.apply(frequency)
+    await second.apply(frequency)
+    assert len(agent.configured) == 3
+
+    await second.initialize()
+    await first.apply(frequency)
+    await session.deploy_instruments("unit-a:p1", [driver._definition])
+    await second.apply(frequency)
+    assert len(agent.configured) == 5
+
+
 def test_create_instrument_driver_fixed_timeline_with_invalid_id_raises_error():
     agent_container = AgentContainer()
     agent_container.update_instrument_agent(UnitLabel("unit-a"), InstrumentAgentMock())
@@ -147,3 +210,229 @@ def test_create_instrument_driver_fixed_timeline_with_mismatched_mode_raises_err
 
     with pytest.raises(ValueError):
         create_instrument_driver_fixed_timeline(session, instrument_info)
+
+
+@pytest.mark.asyncio
+async def test_stream_result_yields_chunks_from_agent():
+    inst_driver = _create_inst_driver()
+
+    chunks = [c async for c in inst_driver.stream_result(chunk_iterations=128)]
+
+    assert len(chunks) == 1
+    assert chunks[0].first_iteration == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_result_falls_back_to_fetch_when_unavailable():
+    class _NoStreamAgent(InstrumentAgentMock):
+        async def stream_result(self, token, resource_id, chunk_iterations):
+            raise ServiceUnavailableError()
+            yield
+
+        async def fetch_result(self, token, resource_id):
+            return ResultContainer(integer_result={"count": [1, 2, 3]})
+
+    inst_driver = _create_inst_driver()
+    inst_driver._agent = _NoStreamAgent()
+
+    chunks = [c async for c in inst_driver.stream_result()]
+
+    assert len(chunks) == 1
+    assert chunks[0].container.integer_arrays["count"].tolist() == [1, 2, 3]
+    assert chunks[0].n_iterations == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_result_falls_back_to_fetch_without_agent_support():
+    class _LegacyAgent:
+        async def fetch_result(self, token, resource_id):
+            return ResultContainer(integer_result={"count": [4, 5]})
+
+    inst_driver = _create_inst_driver()
+    inst_driver._agent = _LegacyAgent()
+
+    chunks = [c async for c in inst_driver.stream_result()]
+
+    assert len(chunks) == 1
+    assert chunks[0].container.integer_arrays["count"].tolist() == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_stream_result_reraises_after_chunks_were_yielded():
+    class _BrokenStreamAgent(InstrumentAgentMock):
+        async def stream_result(self, token, resource_id, chunk_iterations):
+            yield ResultChunk(
+                first_iteration=0,
+                container=ColumnarResultContainer(
+                    integer_arrays={"count": np.arange(2)}
+                ),
+            )
+            raise ServiceUnavailableError()
+
+        async def fetch_result(self, token, resource_id):
+            raise AssertionError("must not fall back after chunks")
+
+    inst_driver = _create_inst_driver()
+    inst_driver._agent = _BrokenStreamAgent()
+
+    chunks = []
+    with pytest.raises(ServiceUnavailableError):
+        async for chunk in inst_driver.stream_result():
+            chunks.append(chunk)
+    assert len(chunks) == 1
+
+
+@pytest.mark.asyncio
+async def test_apply_passes_driver_iq_encoding_to_agent():
+    encodings = []
+
+    class _EncodingRecordingAgent(InstrumentAgentMock):
+        async def configure(self, token, resource_id, directives, iq_encoding=None):
+            encodings.append(iq_encoding)
+            return True
+
+    inst_driver = _create_inst_driver()
+    inst_driver._agent = _EncodingRecordingAgent()
+    inst_driver._iq_encoding = quantized_iq_encoding(
+        inst_driver.instrument_config.bitdepth
+    )
+
+    await inst_driver.apply(directives.SetFrequency(60_000_000))
+
+    assert encodings == [IqEncoding.PACKED_INT16]
+
+
+@pytest.mark.asyncio
+async def test_fetch_without_sink_keeps_agent_signature():
+    class _AgentWithoutSinks(InstrumentAgentMock):
+        async def fetch_result(self, token, resource_id):
+            return ResultContainer(integer_result={"count": [1]})
+
+    inst_driver = _create_inst_driver()
+    inst_driver._agent = _AgentWithoutSinks()
+
+    assert (await inst_driver.fetch_result()).integer_result == {"count": [1]}
+
+
+class _RecordingAgent(InstrumentAgentMock):
+    def __init__(self):
+        self.configured = []
+        self.fail = False
+
+    # The signature predating ``iq_encoding``, which plain drivers must not pass.
+    async def configure(self, token, resource_id, directives):
+        if self.fail:
+            raise RuntimeError("configure failed")
+        self.configured.append(list(directives))
+        return True
+
+
+def _create_recording_driver():
+    inst_driver = _create_inst_driver()
+    agent = _RecordingAgent()
+    inst_driver._agent = agent
+    inst_driver._applied = {}
+    return inst_driver, agent
+
+
+def _timeline(gain: float) -> directives.SetFixedTimeline:
+    return directives.SetFixedTimeline(
+        waveform_library=[IqWaveform(400_000, np.full(16, 0.5 + 0.0j))],
+        events=[directives.WaveformEvent(0, 0, gain, 0.0)],
+        capture_windows=[directives.CaptureWindow("cap", 0, 64)],
+        length=256,
+        iterations=10,
+    )
+
+
+@pytest.mark.asyncio
+async def test_apply_sends_only_changed_directives():
+    inst_driver, agent = _create_recording_driver()
+
+    await inst_driver.apply(
+        [
+            directives.SetFrequency(60_000_000),
+            directives.SetPhaseOffset(0),
+            _timeline(1.0),
+        ]
+    )
+    await inst_driver.apply(
+        [
+            directives.SetFrequency(60_000_000),
+            directives.SetPhaseOffset(90),
+            _timeline(1.0),
+        ]
+    )
+    await inst_driver.apply([directives.SetFrequency(60_000_000), _timeline(0.5)])
+
+    assert [type(d) for d in agent.configured[1]] == [directives.SetPhaseOffset]
+    assert len(agent.configured[2]) == 1
+    assert agent.configured[2][0].events[0].gain == 0.5
+
+
+@pytest.mark.asyncio
+async def test_apply_skips_rpc_when_nothing_changed():
+    inst_driver, agent = _create_recording_driver()
+
+    await inst_driver.apply(_timeline(1.0))
+    assert await inst_driver.apply(_timeline(1.0))
+
+    assert len(agent.configured) == 1
+
+
+@pytest.mark.asyncio
+async def test_apply_compares_event_tables_by_value():
+    inst_driver, agent = _create_recording_driver()
+    table = directives.WaveformEventTable.from_events(
+        [directives.WaveformEvent(0, 0, 1.0, 0.0)]
+    )
+    timeline = dataclasses.replace(_timeline(1.0), events=table)
+
+    await inst_driver.apply(timeline)
+    await inst_driver.apply(
+        dataclasses.replace(
+            timeline, events=directives.WaveformEventTable.from_events(list(table))
+        )
+    )
+    table.gains[0] = 0.5
+    await inst_driver.apply(timeline)
+
+    assert len(agent.configured) == 2
+    assert agent.configured[1][0].events.gains[0] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_apply_with_force_resends_everything():
+    inst_driver, agent = _create_recording_driver()
+
+    await inst_driver.apply(directives.SetFrequency(60_000_000))
+    await inst_driver.apply(directives.SetFrequency(60_000_000), force=True)
+
+    assert len(agent.configured) == 2
+
+
+@pytest.mark.asyncio
+async def test_apply_forgets_state_after_failure_and_initialize():
+    inst_driver, agent = _create_recording_driver()
+    await inst_driver.apply(directives.SetFrequency(60_000_000))
+
+    agent.fail = True
+    with pytest.raises(RuntimeError):
+        await inst_driver.apply(directives.SetPhaseOffset(90))
+    agent.fail = False
+    await inst_driver.apply(directives.SetFrequency(60_000_000))
+    await inst_driver.initialize()
+    await inst_driver.apply(directives.SetFrequency(60_000_000))
+
+    assert len(agent.configured) == 3
+
+
+@pytest.mark.asyncio
+async def test_apply_checks_timeline_limits_before_sending():
+    inst_driver, agent = _create_recording_driver()
+    inst_driver._limits = TimelineLimits(waveform_bytes=32, event_count=1)
+
+    with pytest.raises(TimelineLimitExceededError, match="waveform_bytes 64 > 32"):
+        await inst_driver.apply([directives.SetFrequency(60_000_000), _timeline(1.0)])
+
+    assert agent.configured == []
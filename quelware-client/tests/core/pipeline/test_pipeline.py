@@ -0,0 +1,157 @@
+import asyncio
+from collections.abc import Sequence
+
+import pytest
+from quelware_core.entities import directives
+from quelware_core.entities.directives import Directive
+from quelware_core.entities.instrument import (
+    FixedTimelineConfig,
+    FixedTimelineProfile,
+    InstrumentDefinition,
+    InstrumentMode,
+    InstrumentRole,
+)
+from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.result import ArrayAllocator, ResultContainer
+from quelware_core.entities.session import SessionToken
+from quelware_core.entities.unit import UnitLabel
+from quelware_core.entities.waveform.sampled import IqEncoding
+
+from quelware_client.core import AgentContainer, Session
+from quelware_client.core.instrument_driver import InstrumentDriver
+from quelware_client.core.pipeline import PipelineJob
+from quelware_client.testing.instrument_agent_mock import InstrumentAgentMock
+from quelware_client.testing.trigger_agent_mock import TriggerAgentMock
+
+
+class _RecordingInstrumentAgent(InstrumentAgentMock):
+    def __init__(self, fetch_delay_sec: float = 0.01, fail_fetch_at: int = -1):
+        super().__init__()
+        self.log: list[str] = []
+        self._pending = 0.0
+        self._committed = 0.0
+        self._fetch_delay_sec = fetch_delay_sec
+        self._fail_fetch_at = fail_fetch_at
+        self.timeouts: list[float | None] = []
+
+    async def configure(
+        self,
+        token: SessionToken,
+        resource_id: ResourceId,
+        directives: Sequence[Directive],
+        iq_encoding: IqEncoding | None = None,
+    ) -> bool:
+        (directive,) = directives
+        self._pending = directive.hz
+        self.log.append(f"configure {directive.hz:.0f}")
+        return True
+
+    async def apply(self, token, resource_ids) -> bool:
+        self._committed = self._pending
+        return True
+
+    async def wait_for_result(
+        self,
+        token: SessionToken,
+        resource_id: ResourceId,
+        timeout_sec: float | None,
+        allocate: ArrayAllocator | None = None,
+    ) -> ResultContainer:
+        shot = self._committed
+        self.timeouts.append(timeout_sec)
+        await asyncio.sleep(self._fetch_delay_sec)
+        if shot == self._fail_fetch_at:
+            raise RuntimeError("fetch failed")
+        self.log.append(f"fetch {shot:.0f}")
+        return ResultContainer()
+
+
+def _build(agent: InstrumentAgentMock) -> tuple[Session, InstrumentDriver]:
+    agents = AgentContainer()
+    agents.trigger = TriggerAgentMock()
+    agents.update_instrument_agent(UnitLabel("unit-a"), agent)
+    instrument_id = ResourceId("unit-a:i1")
+    session = Session([instrument_id], agents, token=SessionToken("tok"))
+    driver = InstrumentDriver(
+        session.token,
+        instrument_id,
+        ResourceId("unit-a:p1"),
+        InstrumentDefinition(
+            alias="alias",
+            mode=InstrumentMode.FIXED_TIMELINE,
+            role=InstrumentRole.TRANSCEIVER,
+            profile=FixedTimelineProfile(frequency_range_min=0, frequency_range_max=10),
+        ),
+        FixedTimelineConfig(
+            sampling_period_fs=400_000,
+            bitdepth=16,
+            timeline_step_samples=256,
+            samples_per_tick=4,
+        ),
+        agent,
+    )
+    return session, driver
+
+
+def _jobs(driver: InstrumentDriver, n: int):
+    return [PipelineJob({driver: [directives.SetFrequency(hz=i)]}) for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_configures_next_shot_during_fetch():
+    agent = _RecordingInstrumentAgent()
+    session, driver = _build(agent)
+
+    results = [r async for r in session.run_pipeline(_jobs(driver, 3))]
+
+    assert [list(r) for r in results] == [[driver.instrument_id]] * 3
+    assert agent.log == [
+        "configure 0",
+        "configure 1",
+        "fetch 0",
+        "configure 2",
+        "fetch 1",
+        "fetch 2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_depth_one_runs_shots_serially():
+    agent = _RecordingInstrumentAgent()
+    session, driver = _build(agent)
+
+    async for _ in session.run_pipeline(_jobs(driver, 2), max_in_flight=1):
+        await asyncio.sleep(0.02)
+
+    assert agent.log == ["configure 0", "fetch 0", "configure 1", "fetch 1"]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_raises_after_earlier_results():
+    agent = _RecordingInstrumentAgent(fail_fetch_at=1)
+    session, driver = _build(agent)
+
+    received = []
+    with pytest.raises(RuntimeError, match="fetch failed"):
+        async for r in session.run_pipeline(_jobs(driver, 3)):
+            received.append(r)
+    assert len(received) == 1
+
+    with pytest.raises(ValueError, match="max_in_flight"):
+        async for _ in session.run_pipeline([], max_in_flight=0):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_pipeline_waits_for_results_with_job_timeout():
+    agent = _RecordingInstrumentAgent()
+    session, driver = _build(agent)
+    jobs = [
+        PipelineJob({driver: [directives.SetFrequency(hz=0)]}, timeout_sec=5.0),
+        PipelineJob({driver: [directives.SetFrequency(hz=1)]}),
+    ]
+
+    results = [r async for r in session.run_pipeline(jobs)]
+
+    assert len(results) == 2
+    assert agent.timeouts == [5.0, None]
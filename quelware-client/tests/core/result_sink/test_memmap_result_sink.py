@@ -0,0 +1,93 @@
+import numpy as np
+from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.result import ColumnarResultContainer, IqWaveformBlock
+from quelware_core.entities.waveform.sampled import IqEncoding
+from quelware_core.pb_converter.result import (
+    result_container_from_pb,
+    result_container_to_pb,
+)
+
+from quelware_client.core.result_sink import MemmapResultSink
+
+RID = ResourceId("unit-a:i1")
+
+
+def _original() -> ColumnarResultContainer:
+    rng = np.random.default_rng(0)
+    iq = rng.normal(size=(8, 16)) + 1j * rng.normal(size=(8, 16))
+    return ColumnarResultContainer(
+        iq_waveform_blocks={"cap": IqWaveformBlock(400_000, iq)},
+        iq_point_arrays={"avg": iq.mean(axis=1)},
+        integer_arrays={"cap": np.arange(8, dtype=np.int64)},
+    )
+
+
+def test_memmap_result_sink_decodes_into_npy_files(tmp_path):
+    original = _original()
+    sink = MemmapResultSink(tmp_path / "results")
+
+    pb = result_container_to_pb(original, iq_encoding=IqEncoding.PACKED_FLOAT64)
+    recovered = result_container_from_pb(pb, sink.allocator(RID))
+
+    block = recovered.iq_waveform_blocks["cap"].iq_array
+    assert isinstance(block, np.memmap)
+    assert isinstance(recovered.iq_point_arrays["avg"], np.memmap)
+    assert isinstance(recovered.integer_arrays["cap"], np.memmap)
+    np.testing.assert_array_equal(block, original.iq_waveform_blocks["cap"].iq_array)
+
+    (fetch_dir,) = (tmp_path / "results").iterdir()
+    assert fetch_dir.name.startswith("unit-a_i1-")
+    assert sorted(p.name for p in fetch_dir.iterdir()) == [
+        "avg.iq.npy",
+        "cap.int.npy",
+        "cap.iq.npy",
+    ]
+    np.testing.assert_array_equal(
+        np.load(fetch_dir / "avg.iq.npy", mmap_mode="r"),
+        original.iq_point_arrays["avg"],
+    )
+
+
+def test_memmap_result_sink_uses_fresh_directory_per_fetch(tmp_path):
+    sink = MemmapResultSink(tmp_path)
+    pb = result_container_to_pb(_original())
+
+    first = result_container_from_pb(pb, sink.allocator(RID))
+    second = result_container_from_pb(pb, sink.allocator(RID))
+
+    assert len(list(tmp_path.iterdir())) == 2
+    np.testing.assert_array_equal(first.integer_arrays["cap"], np.arange(8))
+    np.testing.assert_array_equal(second.integer_arrays["cap"], np.arange(8))
+
+
+def test_memmap_result_sink_keeps_empty_windows_in_memory(tmp_path):
+    original = ColumnarResultContainer(
+        integer_arrays={"empty": np.array([], dtype=np.int64)}
+    )
+    sink = MemmapResultSink(tmp_path)
+
+    recovered = result_container_from_pb(
+        result_container_to_pb(original), sink.allocator(RID)
+    )
+
+    assert recovered.integer_arrays["empty"].shape == (0,)
+    assert not isinstance(recovered.integer_arrays["empty"], np.memmap)
+
+
+def test_memmap_result_sink_keeps_sanitized_names_apart(tmp_path):
+    original = ColumnarResultContainer(
+        integer_arrays={
+            "a/b": np.arange(4, dtype=np.int64),
+            "a_b": np.arange(4, 8, dtype=np.int64),
+        }
+    )
+    sink = MemmapResultSink(tmp_path)
+
+    recovered = result_container_from_pb(
+        result_container_to_pb(original), sink.allocator(RID)
+    )
+
+    np.testing.assert_array_equal(recovered.integer_arrays["a/b"], np.arange(4))
+    np.testing.assert_array_equal(recovered.integer_arrays["a_b"], np.arange(4, 8))
+    (fetch_dir,) = tmp_path.iterdir()
+    assert len(list(fetch_dir.iterdir())) == 2
@@ -1,4 +1,5 @@
-from unittest.mock import AsyncMock
+import asyncio
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from quelware_core.entities.instrument import (
@@ -51,9 +52,15 @@ async def test_open_and_close():
     agents.session = session_agent_mock
     session = Session(resource_ids, agents, ttl_ms=1234, tentative_ttl_ms=56)
 
+    # Agents predating `release_session` are left alone on close.
+    agents.update_instrument_agent(UnitLabel("unit-c"), object())  # type: ignore
+    released = Mock()
+    agents.update_instrument_agent(UnitLabel("unit-d"), released)
+
     await session.open()
     await session.close()
     session_agent_mock.close_session.assert_called_once()  # type: ignore
+    released.release_session.assert_called_once_with(session.token)
 
 
 @pytest.mark.asyncio
@@ -119,3 +126,51 @@ async def test_configure_instruments():
     res = await session.deploy_instruments(port_id, definitions=definitions)
 
     assert len(res) == len(definitions)
+
+
+@pytest.mark.asyncio
+async def test_keepalive_renews_lease_until_close():
+    resource_id = ResourceId("unit-a:p1")
+    agents = AgentContainer()
+    agents.session = SessionAgentMock()
+    keepalive_agent = SessionAgentMock()
+    keepalive_agent.extend_session = AsyncMock(return_value=True)  # type: ignore
+    agents.keepalive_session = keepalive_agent
+    session = Session(
+        [resource_id],
+        agents,
+        ttl_ms=40,
+        skip_lock_check=True,
+        keepalive_fraction=0.25,
+    )
+
+    await session.open()
+    await asyncio.sleep(0.1)
+    await session.close()
+    calls = keepalive_agent.extend_session.await_count  # type: ignore
+    assert calls >= 3
+    keepalive_agent.extend_session.assert_awaited_with(session.token, 40)  # type: ignore
+    await asyncio.sleep(0.05)
+    assert keepalive_agent.extend_session.await_count == calls  # type: ignore
+    assert not session.lease_lost.is_set()
+
+
+@pytest.mark.asyncio
+async def test_keepalive_signals_lost_lease():
+    agents = AgentContainer()
+    agents.session = SessionAgentMock()
+    agents.session.extend_session_result = False  # type: ignore
+    session = Session(
+        [ResourceId("unit-a:p1")],
+        agents,
+        ttl_ms=40,
+        skip_lock_check=True,
+        keepalive_fraction=0.25,
+    )
+
+    await session.open()
+    await asyncio.wait_for(session.lease_lost.wait(), timeout=1.0)
+    await session.close()
+
+    with pytest.raises(ValueError, match="keepalive_fraction"):
+        Session([ResourceId("unit-a:p1")], agents, keepalive_fraction=1.5)
@@ -0,0 +1,101 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from quelware_core.entities.resource import ResourceId
+
+from quelware_client.core import AgentContainer, Session, SessionPool, SessionPoolStats
+from quelware_client.core.exceptions import LockConflictError
+from quelware_client.testing.session_agent_mock import SessionAgentMock
+
+
+def _build_pool(ttl_ms: int = 4000, max_sessions: int = 8):
+    agents = AgentContainer()
+    session_agent = SessionAgentMock()
+    session_agent.open_session = AsyncMock(wraps=session_agent.open_session)  # type: ignore
+    session_agent.close_session = AsyncMock(return_value=True)  # type: ignore
+    agents.session = session_agent
+    pool = SessionPool(
+        lambda rids: Session(rids, agents, ttl_ms=ttl_ms, skip_lock_check=True),
+        max_sessions=max_sessions,
+    )
+    return pool, session_agent
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_sessions_per_resource_set():
+    pool, session_agent = _build_pool()
+
+    async with pool.acquire(["unit-a:p1", "unit-a:p2"]) as first:
+        pass
+    async with pool.acquire([ResourceId("unit-a:p2"), "unit-a:p1"]) as second:
+        assert second is first
+
+    assert pool.stats == SessionPoolStats(hits=1, misses=1)
+    session_agent.open_session.assert_awaited_once()  # type: ignore
+    session_agent.close_session.assert_not_awaited()  # type: ignore
+
+    await pool.close()
+    session_agent.close_session.assert_awaited_once_with(first.token)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_pool_reopens_expired_sessions():
+    pool, session_agent = _build_pool(ttl_ms=10)
+
+    async with pool.acquire(["unit-a:p1"]) as first:
+        pass
+    await asyncio.sleep(0.02)
+    async with pool.acquire(["unit-a:p1"]) as second:
+        assert second is not first
+        assert second.lease_active
+
+    assert pool.stats == SessionPoolStats(misses=2, reopened=1)
+    session_agent.close_session.assert_awaited_once_with(first.token)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_pool_evicts_overlapping_and_excess_sessions():
+    pool, session_agent = _build_pool(max_sessions=1)
+
+    async with pool.acquire(["unit-a:p1"]) as first:
+        pass
+    async with pool.acquire(["unit-a:p1", "unit-a:p2"]):
+        pass
+    session_agent.close_session.assert_awaited_once_with(first.token)  # type: ignore
+    async with pool.acquire(["unit-b:p1"]):
+        pass
+
+    assert pool.stats == SessionPoolStats(misses=3, evicted=2)
+
+
+@pytest.mark.asyncio
+async def test_pool_discards_sessions_after_an_error():
+    pool, session_agent = _build_pool()
+
+    with pytest.raises(RuntimeError):
+        async with pool.acquire(["unit-a:p1"]) as first:
+            raise RuntimeError
+    async with pool.acquire(["unit-a:p1"]) as second:
+        assert second is not first
+
+    session_agent.close_session.assert_awaited_once_with(first.token)  # type: ignore
+    assert pool.stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_sets_overlapping_a_borrowed_session():
+    pool, session_agent = _build_pool()
+
+    async def acquire_overlapping():
+        async with pool.acquire(["unit-a:p1", "unit-a:p2"]):
+            pass
+
+    async with pool.acquire(["unit-a:p1"]) as outer:
+        with pytest.raises(LockConflictError, match="unit-a:p1"):
+            await asyncio.wait_for(acquire_overlapping(), timeout=1)
+        assert outer.lease_active
+
+    await acquire_overlapping()
+    session_agent.close_session.assert_awaited_once_with(outer.token)  # type: ignore
+    assert list(pool._entries) == [frozenset({"unit-a:p1", "unit-a:p2"})]
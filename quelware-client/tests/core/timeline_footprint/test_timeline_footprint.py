@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from quelware_core.entities import directives
+from quelware_core.entities.instrument import FixedTimelineConfig
+from quelware_core.entities.waveform.ref import WaveformRef
+from quelware_core.entities.waveform.sampled import IqWaveform
+
+from quelware_client.client.helpers.sequencer import Sequencer
+from quelware_client.core.exceptions import TimelineLimitExceededError
+from quelware_client.core.timeline_footprint import (
+    TimelineFootprint,
+    TimelineLimits,
+    check_timeline_limits,
+    estimate_timeline_footprint,
+)
+
+CONFIG = FixedTimelineConfig(
+    sampling_period_fs=400_000,
+    bitdepth=14,
+    timeline_step_samples=64,
+    samples_per_tick=16,
+)
+
+
+def test_estimate_timeline_footprint():
+    directive = directives.SetFixedTimeline(
+        waveform_library=[
+            IqWaveform(400_000, np.zeros(20, dtype=complex)),
+            IqWaveform(800_000, np.zeros(8, dtype=complex)),
+            WaveformRef(digest=b"\x00" * 32),
+        ],
+        events=[directives.WaveformEvent(0, 0, 1.0, 0.0)] * 3,
+        capture_windows=[directives.CaptureWindow("cap", 0, 100)],
+        length=130,
+        iterations=10,
+    )
+
+    assert estimate_timeline_footprint(directive, CONFIG) == TimelineFootprint(
+        waveform_count=2,
+        waveform_samples=32 + 16,
+        waveform_bytes=48 * 4,
+        event_count=3,
+        capture_window_count=1,
+        capture_samples=100,
+        length_samples=192,
+        length_ticks=12,
+    )
+
+
+def test_check_timeline_limits_lists_every_exceeded_limit():
+    seq = Sequencer(default_sampling_period_ns=0.4)
+    seq.bind("inst1", sampling_period_fs=400_000, step_samples=64)
+    seq.register_waveform("x", np.full(64, 0.5))
+    seq.add_events("inst1", ["x"] * 4, np.arange(4) * 25.6)
+
+    footprint = seq.footprint("inst1", CONFIG)
+    assert (footprint.event_count, footprint.length_samples) == (4, 256)
+    check_timeline_limits(footprint, TimelineLimits(event_count=4))
+
+    with pytest.raises(TimelineLimitExceededError) as excinfo:
+        seq.footprint(
+            "inst1", CONFIG, TimelineLimits(event_count=3, length_samples=128)
+        )
+    assert "event_count 4 > 3" in str(excinfo.value)
+    assert "length_samples 256 > 128" in str(excinfo.value)
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+import quelware_core.pb.quelware.instrument.v1 as pb_inst
+from grpclib import GRPCError
+from grpclib.client import Channel
+from grpclib.const import Status
+from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.result import ColumnarResultContainer
+from quelware_core.entities.session import SessionToken
+from quelware_core.entities.waveform.sampled import IqEncoding
+from quelware_core.pb_converter.directive import iq_encoding_to_pb
+from quelware_core.pb_converter.result import result_container_to_pb
+
+from quelware_client.core.exceptions import ServiceUnavailableError
+from quelware_client.infra.instrument_agent_grpc import InstrumentAgentGrpc
+
+TOKEN = SessionToken("t")
+RID = ResourceId("unit-a:r1")
+
+
+class _FakeService:
+    metadata = None
+
+    def __init__(self, responses):
+        self._responses = responses
+        self.requests = []
+
+    async def fetch_result_stream(self, req, metadata=None):
+        self.requests.append(req)
+        for resp in self._responses:
+            if isinstance(resp, BaseException):
+                raise resp
+            yield resp
+
+
+def _agent_with(responses) -> tuple[InstrumentAgentGrpc, _FakeService]:
+    agent = InstrumentAgentGrpc(Channel("localhost", 1))
+    service = _FakeService(responses)
+    agent._service = service  # type: ignore
+    return agent, service
+
+
+def _chunk_response(first_iteration: int, values: np.ndarray):
+    container = ColumnarResultContainer(iq_point_arrays={"cap": values})
+    return pb_inst.FetchResultStreamResponse(
+        resource_id=str(RID),
+        first_iteration=first_iteration,
+        result_container=result_container_to_pb(
+            container, iq_encoding=IqEncoding.PACKED_FLOAT64
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_result_decodes_each_chunk():
+    values = np.arange(6) + 1j * np.arange(6)
+    agent, service = _agent_with(
+        [_chunk_response(0, values[:4]), _chunk_response(4, values[4:])]
+    )
+
+    chunks = [c async for c in agent.stream_result(TOKEN, RID, chunk_iterations=4)]
+
+    assert [c.first_iteration for c in chunks] == [0, 4]
+    np.testing.assert_array_equal(
+        np.concatenate([c.container.iq_point_arrays["cap"] for c in chunks]), values
+    )
+    assert service.requests[0].chunk_iterations == 4
+
+
+@pytest.mark.asyncio
+async def test_stream_result_maps_unimplemented_to_service_unavailable():
+    agent, _ = _agent_with([GRPCError(Status.UNIMPLEMENTED)])
+
+    with pytest.raises(ServiceUnavailableError):
+        async for _ in agent.stream_result(TOKEN, RID, chunk_iterations=0):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_quantized_results_are_opt_in():
+    agent, service = _agent_with([])
+    _ = [c async for c in agent.stream_result(TOKEN, RID, 0)]
+    assert service.requests[0].accepted_iq_encodings == [
+        iq_encoding_to_pb(IqEncoding.PACKED_FLOAT64)
+    ]
+
+    quantized = InstrumentAgentGrpc(Channel("localhost", 1), quantized_results=True)
+    quantized._service = service  # type: ignore
+    _ = [c async for c in quantized.stream_result(TOKEN, RID, 0)]
+    assert service.requests[1].accepted_iq_encodings == [
+        iq_encoding_to_pb(e)
+        for e in (
+            IqEncoding.PACKED_INT16,
+            IqEncoding.PACKED_INT32,
+            IqEncoding.PACKED_FLOAT64,
+        )
+    ]
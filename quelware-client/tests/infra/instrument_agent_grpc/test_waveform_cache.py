@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from grpclib import GRPCError
+from grpclib.client import Channel
+from grpclib.const import Status
+from quelware_core.entities.directives import SetFixedTimeline, WaveformEvent
+from quelware_core.entities.resource import ResourceId
+from quelware_core.entities.session import SessionToken
+from quelware_core.entities.waveform.sampled import IqWaveform
+
+from quelware_client.infra.instrument_agent_grpc import InstrumentAgentGrpc
+
+TOKEN = SessionToken("t")
+RID = ResourceId("unit-a:r1")
+
+
+class _FakeService:
+    metadata = None
+
+    def __init__(self, errors=()):
+        self._errors = list(errors)
+        self.requests = []
+
+    async def configure(self, req, metadata=None):
+        self.requests.append(req)
+        if self._errors:
+            raise self._errors.pop(0)
+
+    async def initialize(self, req, metadata=None):
+        pass
+
+
+def _agent_with(errors=()) -> tuple[InstrumentAgentGrpc, _FakeService]:
+    agent = InstrumentAgentGrpc(Channel("localhost", 1), waveform_cache=True)
+    service = _FakeService(errors)
+    agent._service = service  # type: ignore
+    return agent, service
+
+
+def _timeline(gain: float, *iq_arrays) -> SetFixedTimeline:
+    return SetFixedTimeline(
+        waveform_library=[IqWaveform(400_000, a) for a in iq_arrays],
+        events=[WaveformEvent(0, 0, gain, 0.0)],
+        capture_windows=[],
+        length=64,
+        iterations=1,
+    )
+
+
+def _library(req):
+    return req.directives[
+        0
+    ].fixed_timeline_sampled_waveform.set_timeline.waveform_library
+
+
+PULSE = np.full(16, 0.5 + 0.0j)
+OTHER = np.full(16, 0.0 + 0.5j)
+
+
+@pytest.mark.asyncio
+async def test_configure_sends_only_new_waveforms():
+    agent, service = _agent_with()
+
+    await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+    await agent.configure(TOKEN, RID, [_timeline(0.5, PULSE, OTHER)])
+
+    first, second = (_library(r) for r in service.requests)
+    assert first[0].sampled is not None
+    assert second[0].sampled is None
+    assert second[0].ref.digest == first[0].digest
+    assert second[1].sampled is not None
+
+
+@pytest.mark.asyncio
+async def test_configure_tracks_uploads_per_session():
+    agent, service = _agent_with()
+
+    await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+    await agent.configure(SessionToken("other"), RID, [_timeline(1.0, PULSE)])
+
+    assert _library(service.requests[1])[0].sampled is not None
+
+
+@pytest.mark.asyncio
+async def test_configure_reuploads_when_server_lost_waveforms():
+    agent, service = _agent_with()
+    await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+    service._errors = [GRPCError(Status.NOT_FOUND, "unknown digest")]
+
+    await agent.configure(TOKEN, RID, [_timeline(0.5, PULSE)])
+
+    assert len(service.requests) == 3
+    assert _library(service.requests[1])[0].sampled is None
+    assert _library(service.requests[2])[0].sampled is not None
+
+
+@pytest.mark.asyncio
+async def test_initialize_forgets_uploads():
+    agent, service = _agent_with()
+    await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+
+    await agent.initialize(TOKEN, [RID])
+    await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+
+    assert _library(service.requests[1])[0].sampled is not None
+
+
+@pytest.mark.asyncio
+async def test_release_session_forgets_its_uploads():
+    agent, _ = _agent_with()
+    other = SessionToken("u")
+    await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+    await agent.configure(other, RID, [_timeline(1.0, PULSE)])
+
+    agent.release_session(TOKEN)
+
+    assert list(agent._uploaded_digests) == [(other, RID)]
+
+
+@pytest.mark.asyncio
+async def test_failed_configure_does_not_record_uploads():
+    agent, service = _agent_with([GRPCError(Status.INVALID_ARGUMENT, "bad")])
+
+    with pytest.raises(GRPCError):
+        await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+    await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+
+    assert _library(service.requests[1])[0].sampled is not None
+
+
+@pytest.mark.asyncio
+async def test_configure_encodes_in_executor():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        agent = InstrumentAgentGrpc(
+            Channel("localhost", 1), waveform_cache=True, encode_executor=executor
+        )
+        service = _FakeService()
+        agent._service = service  # type: ignore
+
+        await agent.configure(TOKEN, RID, [_timeline(1.0, PULSE)])
+        await agent.configure(TOKEN, RID, [_timeline(0.5, PULSE)])
+
+    first, second = (_library(r) for r in service.requests)
+    assert first[0].sampled is not None
+    assert second[0].ref.digest == first[0].digest
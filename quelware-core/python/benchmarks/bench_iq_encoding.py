@@ -0,0 +1,116 @@
+"""Allocation and timing benchmark for waveform encoding in `pb_converter`.
+
+Compares the pre-0.5 list conversion (``list(array.real)`` and two temporary
+complex arrays on decode), the current list conversion, and the packed
+encodings. For each waveform size it reports, per sample:
+
+- ``blocks``: Python heap blocks still held by the encoded message or the
+  decoded array (a proxy for per-sample object allocations),
+- ``peak B``: peak traced bytes during the operation,
+
+plus the wall time of a full round trip through protobuf bytes.
+
+Usage:
+    uv run python benchmarks/bench_iq_encoding.py
+"""
+
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+
+import quelware_core.pb.quelware.models.v1 as pb_models
+from quelware_core.entities.waveform.sampled import IqEncoding, IqWaveform
+from quelware_core.pb_converter.directive import (
+    sampled_waveform_from_pb,
+    sampled_waveform_to_pb,
+)
+
+_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def _legacy_to_pb(entity: IqWaveform) -> pb_models.SampledWaveform:
+    return pb_models.SampledWaveform(
+        i_samples=list(entity.iq_array.real),
+        q_samples=list(entity.iq_array.imag),
+        sampling_period_fs=entity.sampling_period_fs,
+    )
+
+
+def _legacy_from_pb(pb: pb_models.SampledWaveform) -> IqWaveform:
+    iq_array = np.array(pb.i_samples, dtype=np.complex128) + 1j * np.array(
+        pb.q_samples, dtype=np.complex128
+    )
+    return IqWaveform(sampling_period_fs=pb.sampling_period_fs, iq_array=iq_array)
+
+
+def _measure(func: Callable[[], object], n: int) -> tuple[float, float]:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = func()
+    held = sum(s.count for s in tracemalloc.take_snapshot().statistics("filename"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held / n, peak / n
+
+
+def _bench(
+    label: str,
+    to_pb: Callable[[IqWaveform], pb_models.SampledWaveform],
+    from_pb: Callable[[pb_models.SampledWaveform], IqWaveform],
+    n: int,
+) -> None:
+    rng = np.random.default_rng(0)
+    entity = IqWaveform(
+        sampling_period_fs=400_000,
+        iq_array=rng.uniform(-1, 1, n) + 1j * rng.uniform(-1, 1, n),
+    )
+    enc_blocks, enc_peak = _measure(lambda: to_pb(entity), n)
+    wire = bytes(to_pb(entity))
+    pb = pb_models.SampledWaveform().parse(wire)
+    dec_blocks, dec_peak = _measure(lambda: from_pb(pb), n)
+
+    start = time.perf_counter()
+    from_pb(pb_models.SampledWaveform().parse(bytes(to_pb(entity))))
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+
+    print(
+        f"{label:<16} {n:>9} "
+        f"{enc_blocks:>7.2f} {enc_peak:>8.1f} "
+        f"{dec_blocks:>7.2f} {dec_peak:>8.1f} "
+        f"{len(wire) / n:>7.1f} {elapsed_ms:>10.2f}"
+    )
+
+
+def main() -> None:
+    cases: list[tuple[str, Callable, Callable]] = [
+        ("legacy lists", _legacy_to_pb, _legacy_from_pb),
+        ("lists", sampled_waveform_to_pb, sampled_waveform_from_pb),
+    ]
+    for encoding in (
+        IqEncoding.PACKED_FLOAT64,
+        IqEncoding.PACKED_FLOAT32,
+        IqEncoding.PACKED_INT16,
+    ):
+        cases.append(
+            (
+                encoding.name.lower(),
+                lambda w, e=encoding: sampled_waveform_to_pb(w, e),
+                sampled_waveform_from_pb,
+            )
+        )
+
+    print(
+        f"{'encoding':<16} {'samples':>9} "
+        f"{'enc blk':>7} {'enc pk B':>8} {'dec blk':>7} {'dec pk B':>8} "
+        f"{'wire B':>7} {'rtrip ms':>10}"
+    )
+    for n in _SIZES:
+        for label, to_pb, from_pb in cases:
+            _bench(label, to_pb, from_pb, n)
+
+
+if __name__ == "__main__":
+    main()
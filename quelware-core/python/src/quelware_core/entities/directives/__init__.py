@@ -1,10 +1,13 @@
 import enum
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
-from typing import TypeAlias
+from typing import TypeAlias, overload
 
+import numpy as np
+import numpy.typing as npt
 from typing_extensions import Never
 
+from quelware_core.entities.waveform.ref import WaveformRef
 from quelware_core.entities.waveform.sampled import IqWaveform
 
 
@@ -36,7 +39,7 @@ class SetCaptureMode:
     mode: CaptureMode
 
 
-WaveformLibrary: TypeAlias = Sequence[IqWaveform]
+WaveformLibrary: TypeAlias = Sequence[IqWaveform | WaveformRef]
 
 
 @dataclass
@@ -47,6 +50,93 @@ class WaveformEvent:
     phase_offset_deg: float
 
 
+@dataclass(eq=False)
+class WaveformEventTable(Sequence[WaveformEvent]):
+    """Waveform events stored as one array per field.
+
+    Behaves as a read-only sequence of `WaveformEvent`s, creating each event
+    on access, while producers and converters work on whole columns. Compares
+    equal to another table with equal columns, or to any sequence of the same
+    events.
+    """
+
+    waveform_indices: npt.NDArray[np.int64]
+    start_offsets_samples: npt.NDArray[np.int64]
+    gains: npt.NDArray[np.float64]
+    phase_offsets_deg: npt.NDArray[np.float64]
+
+    # The columns are mutable arrays.
+    __hash__ = None  # type: ignore[assignment]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, WaveformEventTable):
+            return all(
+                np.array_equal(mine, theirs)
+                for mine, theirs in zip(self._columns(), other._columns(), strict=True)
+            )
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(
+                mine == theirs for mine, theirs in zip(self, other, strict=True)
+            )
+        return NotImplemented
+
+    def __len__(self) -> int:
+        return len(self.waveform_indices)
+
+    @overload
+    def __getitem__(self, index: int) -> WaveformEvent: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "WaveformEventTable": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return WaveformEventTable(
+                self.waveform_indices[index],
+                self.start_offsets_samples[index],
+                self.gains[index],
+                self.phase_offsets_deg[index],
+            )
+        return WaveformEvent(
+            waveform_index=int(self.waveform_indices[index]),
+            start_offset_samples=int(self.start_offsets_samples[index]),
+            gain=float(self.gains[index]),
+            phase_offset_deg=float(self.phase_offsets_deg[index]),
+        )
+
+    def __iter__(self) -> Iterator[WaveformEvent]:
+        for index, offset, gain, phase in self.rows():
+            yield WaveformEvent(index, offset, gain, phase)
+
+    def _columns(self) -> tuple[np.ndarray, ...]:
+        return (
+            self.waveform_indices,
+            self.start_offsets_samples,
+            self.gains,
+            self.phase_offsets_deg,
+        )
+
+    def rows(self) -> Iterator[tuple[int, int, float, float]]:
+        """Iterate over the fields of each event as Python scalars."""
+        return zip(
+            self.waveform_indices.tolist(),
+            self.start_offsets_samples.tolist(),
+            self.gains.tolist(),
+            self.phase_offsets_deg.tolist(),
+            strict=True,
+        )
+
+    @classmethod
+    def from_events(cls, events: Iterable[WaveformEvent]) -> "WaveformEventTable":
+        events = list(events)
+        return cls(
+            np.array([e.waveform_index for e in events], dtype=np.int64),
+            np.array([e.start_offset_samples for e in events], dtype=np.int64),
+            np.array([e.gain for e in events], dtype=np.float64),
+            np.array([e.phase_offset_deg for e in events], dtype=np.float64),
+        )
+
+
 @dataclass
 class CaptureWindow:
     name: str
@@ -57,7 +147,7 @@ class CaptureWindow:
 @dataclass
 class SetFixedTimeline:
     waveform_library: WaveformLibrary
-    events: list[WaveformEvent]
+    events: Sequence[WaveformEvent]
     capture_windows: list[CaptureWindow]
     length: int
     iterations: int
@@ -1,9 +1,21 @@
+from collections.abc import Callable, Iterator, Mapping, MutableMapping, Sequence
 from dataclasses import dataclass, field
-from typing import TypeAlias
+from typing import Generic, TypeAlias, TypeVar
 
-from quelware_core.entities.waveform.sampled import IqPoint, IqWaveform
+import numpy as np
+import numpy.typing as npt
+
+from quelware_core.entities.waveform.sampled import IqArray, IqPoint, IqWaveform
 
 CaptureWindowName: TypeAlias = str
+IntegerArray: TypeAlias = npt.NDArray[np.int64]
+ArrayAllocator: TypeAlias = Callable[
+    [CaptureWindowName, tuple[int, ...], np.dtype], npt.NDArray
+]
+"""Returns an uninitialized array of the given shape and dtype for a window."""
+
+_T = TypeVar("_T")
+_V = TypeVar("_V")
 
 
 @dataclass
@@ -15,3 +27,388 @@ class ResultContainer:
         default_factory=dict
     )
     integer_result: dict[CaptureWindowName, list[int]] = field(default_factory=dict)
+
+    def to_columnar(self) -> "ColumnarResultContainer":
+        """Return the results stacked into one array per capture window.
+
+        Windows whose waveforms differ in length or sampling period cannot be
+        stacked and are carried over as lists.
+        """
+        return ColumnarResultContainer(
+            iq_waveform_result=self.iq_waveform_result,
+            iq_point_result=self.iq_point_result,
+            integer_result=self.integer_result,
+        )
+
+
+@dataclass
+class IqWaveformBlock:
+    """Equal-length waveforms of one capture window, one row per iteration.
+
+    ``iq_array`` has shape ``(n_iterations, n_samples)``.
+    """
+
+    sampling_period_fs: int
+    iq_array: IqArray
+
+    def __len__(self) -> int:
+        return self.iq_array.shape[0]
+
+    def to_waveforms(self) -> list[IqWaveform]:
+        """Split the block into per-iteration waveforms viewing its rows."""
+        return [IqWaveform(self.sampling_period_fs, row) for row in self.iq_array]
+
+    @classmethod
+    def stack(cls, waveforms: list[IqWaveform]) -> "IqWaveformBlock | None":
+        """Stack waveforms into a block, or return None if they are ragged."""
+        if not waveforms:
+            return None
+        period = waveforms[0].sampling_period_fs
+        length = len(waveforms[0].iq_array)
+        for w in waveforms:
+            if w.sampling_period_fs != period or len(w.iq_array) != length:
+                return None
+        return cls(period, np.stack([w.iq_array for w in waveforms]))
+
+
+def _stack_waveforms(
+    waveforms: Mapping[CaptureWindowName, list[IqWaveform]],
+) -> tuple[
+    dict[CaptureWindowName, IqWaveformBlock], dict[CaptureWindowName, list[IqWaveform]]
+]:
+    blocks: dict[CaptureWindowName, IqWaveformBlock] = {}
+    ragged: dict[CaptureWindowName, list[IqWaveform]] = {}
+    for name, waves in waveforms.items():
+        block = IqWaveformBlock.stack(waves)
+        if block is None:
+            ragged[name] = list(waves)
+        else:
+            blocks[name] = block
+    return blocks, ragged
+
+
+def _point_array(points: list[IqPoint]) -> IqArray:
+    return np.array(points, dtype=np.complex128)
+
+
+def _integer_array(ints: list[int]) -> IntegerArray:
+    return np.array(ints, dtype=np.int64)
+
+
+class _FrozenList(tuple):
+    """Immutable window values that still compare equal to lists."""
+
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, list):
+            other = tuple(other)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+
+class _MaterializedView(MutableMapping[CaptureWindowName, _V], Generic[_T, _V]):
+    """Values materialized from ``source`` on first access and cached.
+
+    ``extra`` holds ready values for keys outside ``source``. Assigned values,
+    passed through ``freeze`` if given, take precedence over both and deleted
+    keys hide them; ``on_set`` / ``on_delete`` let the owner write the change
+    through to the arrays the view is built from.
+    """
+
+    def __init__(
+        self,
+        source: Mapping[CaptureWindowName, _T],
+        materialize: Callable[[_T], _V],
+        extra: Mapping[CaptureWindowName, _V] | None = None,
+        on_set: Callable[[CaptureWindowName, _V], None] | None = None,
+        on_delete: Callable[[CaptureWindowName], None] | None = None,
+        freeze: Callable[[_V], _V] | None = None,
+    ):
+        self._source = source
+        self._materialize = materialize
+        self._extra = extra or {}
+        self._assigned: dict[CaptureWindowName, _V] = {}
+        self._deleted: set[CaptureWindowName] = set()
+        self._cache: dict[CaptureWindowName, _V] = {}
+        self._on_set = on_set
+        self._on_delete = on_delete
+        self._freeze = freeze
+
+    def __getitem__(self, key: CaptureWindowName) -> _V:
+        if key in self._assigned:
+            return self._assigned[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        if key in self._extra:
+            return self._extra[key]
+        if key not in self._cache:
+            self._cache[key] = self._materialize(self._source[key])
+        return self._cache[key]
+
+    def __setitem__(self, key: CaptureWindowName, value: _V):
+        if self._freeze is not None:
+            value = self._freeze(value)
+        self._assigned[key] = value
+        self._deleted.discard(key)
+        self._cache.pop(key, None)
+        if self._on_set is not None:
+            self._on_set(key, value)
+
+    def __delitem__(self, key: CaptureWindowName):
+        if key not in self:
+            raise KeyError(key)
+        self._assigned.pop(key, None)
+        self._cache.pop(key, None)
+        self._deleted.add(key)
+        if self._on_delete is not None:
+            self._on_delete(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._assigned or (
+            key not in self._deleted and (key in self._extra or key in self._source)
+        )
+
+    def __iter__(self) -> Iterator[CaptureWindowName]:
+        seen = set()
+        for keys in (self._source, self._extra, self._assigned):
+            for key in keys:
+                if key not in seen and key in self:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)})"
+
+
+class ColumnarResultContainer(ResultContainer):
+    """Result container backed by one ndarray per capture window.
+
+    Waveform results are stored as `IqWaveformBlock`s, IQ point results as 1-D
+    complex arrays and integer results as 1-D int64 arrays. The list-based
+    attributes inherited from `ResultContainer` are mutable views that
+    materialize a window as an immutable sequence on first access and cache
+    it, so code that only uses the arrays never creates per-iteration objects.
+    Assigning or deleting a window through them updates the arrays as well;
+    a materialized window cannot be edited in place.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        iq_waveform_blocks: Mapping[CaptureWindowName, IqWaveformBlock] | None = None,
+        iq_point_arrays: Mapping[CaptureWindowName, IqArray] | None = None,
+        integer_arrays: Mapping[CaptureWindowName, IntegerArray] | None = None,
+        ragged_iq_waveform_result: Mapping[CaptureWindowName, list[IqWaveform]]
+        | None = None,
+        *,
+        iq_waveform_result: Mapping[CaptureWindowName, list[IqWaveform]] | None = None,
+        iq_point_result: Mapping[CaptureWindowName, list[IqPoint]] | None = None,
+        integer_result: Mapping[CaptureWindowName, list[int]] | None = None,
+    ):
+        """Create a container from per-window arrays.
+
+        Args:
+            iq_waveform_blocks: Stacked waveforms per capture window.
+            iq_point_arrays: IQ points per capture window.
+            integer_arrays: Integer results per capture window.
+            ragged_iq_waveform_result: Waveform lists for windows that cannot
+                be stacked into a block. They appear only in
+                `iq_waveform_result`.
+            iq_waveform_result: Waveform lists, as in `ResultContainer`,
+                stacked into blocks where possible. Accepted so that
+                `dataclasses.replace()` works on columnar containers.
+            iq_point_result: IQ point lists, as in `ResultContainer`.
+            integer_result: Integer lists, as in `ResultContainer`.
+        """
+        blocks, ragged = _stack_waveforms(iq_waveform_result or {})
+        blocks.update(iq_waveform_blocks or {})
+        ragged.update(ragged_iq_waveform_result or {})
+        points = {k: _point_array(v) for k, v in (iq_point_result or {}).items()}
+        points.update(iq_point_arrays or {})
+        integers = {k: _integer_array(v) for k, v in (integer_result or {}).items()}
+        integers.update(integer_arrays or {})
+        self._init_views(blocks, points, integers, ragged)
+
+    def _init_views(
+        self,
+        blocks: MutableMapping[CaptureWindowName, IqWaveformBlock],
+        points: MutableMapping[CaptureWindowName, IqArray],
+        integers: MutableMapping[CaptureWindowName, IntegerArray],
+        ragged: Mapping[CaptureWindowName, list[IqWaveform]],
+    ) -> None:
+        self.iq_waveform_blocks: MutableMapping[CaptureWindowName, IqWaveformBlock] = (
+            blocks
+        )
+        self.iq_point_arrays: MutableMapping[CaptureWindowName, IqArray] = points
+        self.integer_arrays: MutableMapping[CaptureWindowName, IntegerArray] = integers
+
+        def set_waveforms(key: CaptureWindowName, waves: list[IqWaveform]):
+            block = IqWaveformBlock.stack(waves)
+            if block is None:
+                blocks.pop(key, None)
+            else:
+                blocks[key] = block
+
+        def set_points(key: CaptureWindowName, values: list[IqPoint]):
+            points[key] = _point_array(values)
+
+        def set_integers(key: CaptureWindowName, values: list[int]):
+            integers[key] = _integer_array(values)
+
+        self._waveform_view = _MaterializedView(
+            blocks,
+            lambda block: _FrozenList(block.to_waveforms()),
+            _MaterializedView(ragged, _FrozenList),
+            on_set=set_waveforms,
+            on_delete=lambda key: blocks.pop(key, None),
+            freeze=_FrozenList,
+        )
+        self._point_view = _MaterializedView(
+            points,
+            lambda array: _FrozenList(array.tolist()),
+            on_set=set_points,
+            on_delete=lambda key: points.pop(key, None),
+            freeze=_FrozenList,
+        )
+        self._integer_view = _MaterializedView(
+            integers,
+            lambda array: _FrozenList(array.tolist()),
+            on_set=set_integers,
+            on_delete=lambda key: integers.pop(key, None),
+            freeze=_FrozenList,
+        )
+
+    @property  # type: ignore[override]
+    def iq_waveform_result(
+        self,
+    ) -> MutableMapping[CaptureWindowName, Sequence[IqWaveform]]:
+        return self._waveform_view
+
+    @property  # type: ignore[override]
+    def iq_point_result(self) -> MutableMapping[CaptureWindowName, Sequence[IqPoint]]:
+        return self._point_view
+
+    @property  # type: ignore[override]
+    def integer_result(self) -> MutableMapping[CaptureWindowName, Sequence[int]]:
+        return self._integer_view
+
+    def to_columnar(self) -> "ColumnarResultContainer":
+        return self
+
+    def __repr__(self) -> str:
+        blocks = {k: v.iq_array.shape for k, v in self.iq_waveform_blocks.items()}
+        points = {k: v.shape for k, v in self.iq_point_arrays.items()}
+        integers = {k: v.shape for k, v in self.integer_arrays.items()}
+        return (
+            f"{type(self).__name__}(iq_waveform_blocks={blocks}, "
+            f"iq_point_arrays={points}, integer_arrays={integers})"
+        )
+
+
+def _call(thunk: Callable[[], _V]) -> _V:
+    return thunk()
+
+
+class LazyResultContainer(ColumnarResultContainer):
+    """Columnar container that decodes each capture window on first access.
+
+    Every window is given as a function returning its decoded data. The
+    function runs when the window is first read through any attribute, and
+    its result is cached, so callers only pay for the windows they use.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        iq_waveform_blocks: Mapping[CaptureWindowName, Callable[[], IqWaveformBlock]]
+        | None = None,
+        iq_point_arrays: Mapping[CaptureWindowName, Callable[[], IqArray]]
+        | None = None,
+        integer_arrays: Mapping[CaptureWindowName, Callable[[], IntegerArray]]
+        | None = None,
+        ragged_iq_waveform_result: Mapping[
+            CaptureWindowName, Callable[[], list[IqWaveform]]
+        ]
+        | None = None,
+        *,
+        iq_waveform_result: Mapping[CaptureWindowName, list[IqWaveform]] | None = None,
+        iq_point_result: Mapping[CaptureWindowName, list[IqPoint]] | None = None,
+        integer_result: Mapping[CaptureWindowName, list[int]] | None = None,
+    ):
+        """Create a container from per-window decoders.
+
+        Args:
+            iq_waveform_blocks: Decoders of stacked waveforms per window.
+            iq_point_arrays: Decoders of IQ points per window.
+            integer_arrays: Decoders of integer results per window.
+            ragged_iq_waveform_result: Decoders of waveform lists for windows
+                that cannot be stacked into a block.
+            iq_waveform_result: Already decoded waveform lists, as in
+                `ResultContainer`. Accepted so that `dataclasses.replace()`
+                works on lazy containers.
+            iq_point_result: Already decoded IQ point lists.
+            integer_result: Already decoded integer lists.
+        """
+        blocks, ragged = _stack_waveforms(iq_waveform_result or {})
+        self._init_views(
+            _MaterializedView(dict(iq_waveform_blocks or {}), _call, blocks),
+            _MaterializedView(
+                dict(iq_point_arrays or {}),
+                _call,
+                {k: _point_array(v) for k, v in (iq_point_result or {}).items()},
+            ),
+            _MaterializedView(
+                dict(integer_arrays or {}),
+                _call,
+                {k: _integer_array(v) for k, v in (integer_result or {}).items()},
+            ),
+            _MaterializedView(dict(ragged_iq_waveform_result or {}), _call, ragged),
+        )
+
+    def __repr__(self) -> str:
+        blocks = list(self.iq_waveform_blocks)
+        points = list(self.iq_point_arrays)
+        integers = list(self.integer_arrays)
+        return (
+            f"{type(self).__name__}(iq_waveform_blocks={blocks}, "
+            f"iq_point_arrays={points}, integer_arrays={integers})"
+        )
+
+
+@dataclass
+class ResultChunk:
+    """A contiguous range of iterations of a streamed result.
+
+    ``container`` holds iterations ``first_iteration`` to
+    ``first_iteration + n_iterations - 1``. Averaged capture modes yield a
+    single chunk starting at iteration 0.
+    """
+
+    first_iteration: int
+    container: ColumnarResultContainer
+
+    @property
+    def n_iterations(self) -> int:
+        """Number of iterations in the chunk, as seen by its largest window."""
+        lengths = [len(b) for b in self.container.iq_waveform_blocks.values()]
+        lengths += [len(a) for a in self.container.iq_point_arrays.values()]
+        lengths += [len(a) for a in self.container.integer_arrays.values()]
+        return max(lengths, default=0)
+
+
+__all__ = [
+    "ArrayAllocator",
+    "CaptureWindowName",
+    "ColumnarResultContainer",
+    "IntegerArray",
+    "IqWaveformBlock",
+    "LazyResultContainer",
+    "ResultChunk",
+    "ResultContainer",
+]
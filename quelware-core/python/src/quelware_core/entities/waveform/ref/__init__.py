@@ -0,0 +1,56 @@
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from quelware_core.entities.waveform.sampled import IqEncoding, IqWaveform
+
+# Attribute of `IqWaveform` holding ``(iq_array, sampling_period_fs, digests)``.
+_DIGEST_CACHE = "_digest_cache"
+
+
+@dataclass(frozen=True)
+class WaveformRef:
+    """A waveform already uploaded to the instrument, identified by its digest."""
+
+    digest: bytes
+
+
+def iq_waveform_digest(waveform: IqWaveform, encoding: IqEncoding) -> bytes:
+    """Return the SHA-256 digest identifying ``waveform`` sent with ``encoding``.
+
+    The encoding is part of the digest because lossy encodings upload
+    different samples for the same waveform. Digests of read-only arrays are
+    remembered on the waveform, so hashing the same library again is free.
+    """
+    array = waveform.iq_array
+    cache = None
+    if isinstance(array, np.ndarray) and not array.flags.writeable:
+        cached = waveform.__dict__.get(_DIGEST_CACHE)
+        if (
+            cached is not None
+            and cached[0] is array
+            and cached[1] == waveform.sampling_period_fs
+        ):
+            cache = cached[2]
+        else:
+            cache = {}
+            waveform.__dict__[_DIGEST_CACHE] = (
+                array,
+                waveform.sampling_period_fs,
+                cache,
+            )
+        if encoding in cache:
+            return cache[encoding]
+
+    h = hashlib.sha256()
+    h.update(encoding.name.encode())
+    h.update(waveform.sampling_period_fs.to_bytes(8, "little", signed=True))
+    h.update(np.ascontiguousarray(array, dtype="<c16").data)
+    digest = h.digest()
+    if cache is not None:
+        cache[encoding] = digest
+    return digest
+
+
+__all__ = ["WaveformRef", "iq_waveform_digest"]
@@ -1,3 +1,4 @@
+import enum
 from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import TypeAlias
@@ -5,37 +6,207 @@ from typing import TypeAlias
 import numpy as np
 import numpy.typing as npt
 
-IqArray: TypeAlias = npt.NDArray[np.complex128]
+IqArray: TypeAlias = npt.NDArray[np.complex128] | npt.NDArray[np.complex64]
 IqPoint: TypeAlias = complex
 
 
+class IqEncoding(enum.Enum):
+    """Wire representation of IQ samples.
+
+    ``LISTS`` sends separate in-phase and quadrature lists of doubles and is
+    understood by every server. The packed encodings send a single buffer of
+    interleaved little-endian samples, which is far cheaper to encode and
+    decode but must be supported by the peer.
+    """
+
+    LISTS = enum.auto()
+    PACKED_FLOAT32 = enum.auto()
+    PACKED_INT16 = enum.auto()
+    PACKED_FLOAT64 = enum.auto()
+    PACKED_INT32 = enum.auto()
+
+
+_PACKED_BYTES_PER_SAMPLE = {
+    IqEncoding.PACKED_FLOAT64: 16,
+    IqEncoding.PACKED_FLOAT32: 8,
+    IqEncoding.PACKED_INT16: 4,
+    IqEncoding.PACKED_INT32: 8,
+}
+
+# Integer dtype and full-scale value of each quantized encoding.
+_QUANTIZED_FORMATS = {
+    IqEncoding.PACKED_INT16: ("<i2", 2**15 - 1),
+    IqEncoding.PACKED_INT32: ("<i4", 2**31 - 1),
+}
+
+
 @dataclass
 class IqWaveform:
     sampling_period_fs: int
     iq_array: IqArray
 
 
-def iq_array_to_in_phase_list(array: IqArray):
-    return list(array.real)
+def iq_array_to_in_phase_list(array: IqArray) -> list[float]:
+    return array.real.tolist()
 
 
-def iq_array_to_quadrature_phase_list(array: IqArray):
-    return list(array.imag)
+def iq_array_to_quadrature_phase_list(array: IqArray) -> list[float]:
+    return array.imag.tolist()
 
 
 def iq_array_from_lists(
     in_phase_list: Sequence[float], quadrature_phase_list: Sequence[float]
-):
-    return np.array(in_phase_list, dtype=np.complex128) + 1j * np.array(
-        quadrature_phase_list, dtype=np.complex128
+) -> IqArray:
+    array = np.empty(len(in_phase_list), dtype=np.complex128)
+    array.real = in_phase_list
+    array.imag = quadrature_phase_list
+    return array
+
+
+def iq_encoding_dtype(encoding: IqEncoding) -> np.dtype:
+    """Return the complex dtype that samples in ``encoding`` decode to."""
+    if encoding in (IqEncoding.PACKED_FLOAT32, IqEncoding.PACKED_INT16):
+        return np.dtype(np.complex64)
+    return np.dtype(np.complex128)
+
+
+def quantized_iq_encoding(bitdepth: int) -> IqEncoding:
+    """Return the narrowest quantized encoding that holds ``bitdepth`` bits."""
+    if bitdepth <= 16:
+        return IqEncoding.PACKED_INT16
+    if bitdepth <= 32:
+        return IqEncoding.PACKED_INT32
+    raise ValueError(f"No quantized encoding holds {bitdepth} bits.")
+
+
+def _interleaved(array: IqArray) -> npt.NDArray[np.floating]:
+    return np.ascontiguousarray(array).view(array.real.dtype)
+
+
+def iq_quantization_scale(array: IqArray, encoding: IqEncoding) -> float:
+    """Return the step size that fits ``array`` into a quantized encoding.
+
+    Integer-valued data within the integer range, such as raw ADC counts,
+    gets a step of 1.0 and is transported exactly. Otherwise returns 0.0,
+    meaning that full scale maps to 1.0, when every component already lies
+    within ``[-1, 1]`` or when ``encoding`` is not quantized, and the peak
+    divided by full scale for larger data. Only the integer case is lossless;
+    check with `iq_quantization_is_exact()`.
+    """
+    if encoding not in _QUANTIZED_FORMATS or array.size == 0:
+        return 0.0
+    _, full_scale = _QUANTIZED_FORMATS[encoding]
+    interleaved = _interleaved(array)
+    peak = float(np.max(np.abs(interleaved)))
+    if peak <= full_scale and np.array_equal(interleaved, np.rint(interleaved)):
+        return 1.0
+    if peak <= 1.0:
+        return 0.0
+    return peak / full_scale
+
+
+def iq_quantization_is_exact(
+    array: IqArray, encoding: IqEncoding, scale: float = 0.0
+) -> bool:
+    """Return whether ``array`` survives `iq_array_to_packed()` unchanged.
+
+    Float encodings are exact for data of their own precision; quantized
+    ones only when every component is a multiple of the step that fits the
+    integer range.
+    """
+    if encoding not in _QUANTIZED_FORMATS:
+        if encoding is IqEncoding.PACKED_FLOAT32:
+            return bool(np.array_equal(array.astype(np.complex64), array))
+        return True
+    _, full_scale = _QUANTIZED_FORMATS[encoding]
+    step = scale or 1 / full_scale
+    interleaved = _interleaved(array)
+    quantized = np.rint(interleaved / step)
+    return bool(
+        np.all(np.abs(quantized) <= full_scale)
+        and np.array_equal(quantized * step, interleaved)
     )
 
 
+def packed_iq_length(data: bytes, encoding: IqEncoding) -> int:
+    """Return the number of IQ samples in a packed buffer."""
+    return len(data) // _PACKED_BYTES_PER_SAMPLE[encoding]
+
+
+def iq_array_to_packed(
+    array: IqArray, encoding: IqEncoding, scale: float = 0.0
+) -> bytes:
+    """Pack IQ samples into interleaved little-endian bytes.
+
+    Quantized encodings store ``round(value / scale)`` and saturate at the
+    integer range. A ``scale`` of 0.0 maps 1.0 to full scale; see
+    `iq_quantization_scale()` for data outside ``[-1, 1]``.
+    """
+    match encoding:
+        case IqEncoding.PACKED_FLOAT64:
+            return np.ascontiguousarray(array, dtype="<c16").tobytes()
+        case IqEncoding.PACKED_FLOAT32:
+            return np.ascontiguousarray(array, dtype="<c8").tobytes()
+        case IqEncoding.PACKED_INT16 | IqEncoding.PACKED_INT32:
+            int_dtype, full_scale = _QUANTIZED_FORMATS[encoding]
+            step = scale or 1 / full_scale
+            interleaved = np.ascontiguousarray(array, dtype="<c16").view("<f8")
+            quantized = np.rint(interleaved / step)
+            np.clip(quantized, -full_scale - 1, full_scale, out=quantized)
+            return quantized.astype(int_dtype).tobytes()
+        case _:
+            raise ValueError(f"Not a packed IQ encoding: {encoding}")
+
+
+def iq_array_from_packed(
+    data: bytes, encoding: IqEncoding, scale: float = 0.0, out: IqArray | None = None
+) -> IqArray:
+    """Unpack interleaved little-endian bytes into a complex array.
+
+    The dtype follows `iq_encoding_dtype()`. Float data is returned as a
+    read-only view of ``data`` without copying; quantized data is multiplied
+    by ``scale`` (0.0 meaning that full scale maps to 1.0) in a single pass.
+    When ``out`` is given, the samples are written into it instead.
+    """
+    match encoding:
+        case IqEncoding.PACKED_FLOAT64 | IqEncoding.PACKED_FLOAT32:
+            dtype = "<c16" if encoding is IqEncoding.PACKED_FLOAT64 else "<c8"
+            array = np.frombuffer(data, dtype=dtype)
+            if out is None:
+                return array
+            out[:] = array
+            return out
+        case IqEncoding.PACKED_INT16 | IqEncoding.PACKED_INT32:
+            int_dtype, full_scale = _QUANTIZED_FORMATS[encoding]
+            if out is None:
+                out = np.empty(
+                    len(data) // _PACKED_BYTES_PER_SAMPLE[encoding],
+                    dtype=iq_encoding_dtype(encoding),
+                )
+            real_out = out.view(out.real.dtype)
+            np.multiply(
+                np.frombuffer(data, dtype=int_dtype),
+                real_out.dtype.type(scale or 1 / full_scale),
+                out=real_out,
+            )
+            return out
+        case _:
+            raise ValueError(f"Not a packed IQ encoding: {encoding}")
+
+
 __all__ = [
     "IqArray",
+    "IqEncoding",
     "IqPoint",
     "IqWaveform",
     "iq_array_from_lists",
+    "iq_array_from_packed",
     "iq_array_to_in_phase_list",
+    "iq_array_to_packed",
     "iq_array_to_quadrature_phase_list",
+    "iq_encoding_dtype",
+    "iq_quantization_is_exact",
+    "iq_quantization_scale",
+    "packed_iq_length",
+    "quantized_iq_encoding",
 ]
@@ -1,3 +1,5 @@
+from collections.abc import Container, Sequence
+
 import betterproto2
 from typing_extensions import assert_never
 
@@ -13,12 +15,20 @@ from quelware_core.entities.directives import (
     SetPhaseOffset,
     SetTimingOffset,
     WaveformEvent,
+    WaveformEventTable,
 )
+from quelware_core.entities.waveform.ref import WaveformRef, iq_waveform_digest
 from quelware_core.entities.waveform.sampled import (
+    IqArray,
+    IqEncoding,
     IqWaveform,
     iq_array_from_lists,
+    iq_array_from_packed,
     iq_array_to_in_phase_list,
+    iq_array_to_packed,
     iq_array_to_quadrature_phase_list,
+    iq_quantization_scale,
+    packed_iq_length,
 )
 
 _CAPTURE_MODE_TO_PB = {
@@ -31,6 +41,16 @@ _CAPTURE_MODE_TO_PB = {
 
 _CAPTURE_MODE_FROM_PB = {v: k for k, v in _CAPTURE_MODE_TO_PB.items()}
 
+_IQ_ENCODING_TO_PB = {
+    IqEncoding.LISTS: pb_models.IqEncoding.UNSPECIFIED,
+    IqEncoding.PACKED_FLOAT32: pb_models.IqEncoding.PACKED_FLOAT32,
+    IqEncoding.PACKED_INT16: pb_models.IqEncoding.PACKED_INT16,
+    IqEncoding.PACKED_FLOAT64: pb_models.IqEncoding.PACKED_FLOAT64,
+    IqEncoding.PACKED_INT32: pb_models.IqEncoding.PACKED_INT32,
+}
+
+_IQ_ENCODING_FROM_PB = {v: k for k, v in _IQ_ENCODING_TO_PB.items()}
+
 
 def capture_mode_to_pb(val: CaptureMode) -> pb_models.CaptureMode:
     return _CAPTURE_MODE_TO_PB[val]
@@ -40,28 +60,92 @@ def capture_mode_from_pb(pb: pb_models.CaptureMode) -> CaptureMode:
     return _CAPTURE_MODE_FROM_PB[pb]
 
 
-def iq_waveform_to_pb(entity: IqWaveform) -> pb_models.Waveform:
-    return pb_models.Waveform(
-        sampled=pb_models.SampledWaveform(
+def iq_encoding_to_pb(val: IqEncoding) -> pb_models.IqEncoding:
+    return _IQ_ENCODING_TO_PB[val]
+
+
+def iq_encoding_from_pb(pb: pb_models.IqEncoding) -> IqEncoding:
+    return _IQ_ENCODING_FROM_PB[pb]
+
+
+def sampled_waveform_to_pb(
+    entity: IqWaveform, encoding: IqEncoding = IqEncoding.LISTS
+) -> pb_models.SampledWaveform:
+    if encoding is IqEncoding.LISTS:
+        return pb_models.SampledWaveform(
             i_samples=iq_array_to_in_phase_list(entity.iq_array),
             q_samples=iq_array_to_quadrature_phase_list(entity.iq_array),
             sampling_period_fs=entity.sampling_period_fs,
         )
+    scale = iq_quantization_scale(entity.iq_array, encoding)
+    return pb_models.SampledWaveform(
+        sampling_period_fs=entity.sampling_period_fs,
+        packed_iq=iq_array_to_packed(entity.iq_array, encoding, scale),
+        packed_iq_encoding=iq_encoding_to_pb(encoding),
+        packed_iq_scale=scale,
     )
 
 
-def iq_waveform_from_pb(pb: pb_models.Waveform) -> IqWaveform:
+def sampled_waveform_from_pb(pb: pb_models.SampledWaveform) -> IqWaveform:
+    encoding = iq_encoding_from_pb(pb.packed_iq_encoding)
+    if encoding is IqEncoding.LISTS:
+        iq_array = iq_array_from_lists(pb.i_samples, pb.q_samples)
+    else:
+        iq_array = iq_array_from_packed(pb.packed_iq, encoding, pb.packed_iq_scale)
+    return IqWaveform(sampling_period_fs=pb.sampling_period_fs, iq_array=iq_array)
+
+
+def sampled_waveform_length(pb: pb_models.SampledWaveform) -> int:
+    encoding = iq_encoding_from_pb(pb.packed_iq_encoding)
+    if encoding is IqEncoding.LISTS:
+        return len(pb.i_samples)
+    return packed_iq_length(pb.packed_iq, encoding)
+
+
+def sampled_waveform_into(pb: pb_models.SampledWaveform, out: IqArray) -> None:
+    """Decode the samples of ``pb`` into the preallocated array ``out``."""
+    encoding = iq_encoding_from_pb(pb.packed_iq_encoding)
+    if encoding is IqEncoding.LISTS:
+        out.real = pb.i_samples
+        out.imag = pb.q_samples
+    else:
+        iq_array_from_packed(pb.packed_iq, encoding, pb.packed_iq_scale, out=out)
+
+
+def iq_waveform_to_pb(
+    entity: IqWaveform, encoding: IqEncoding = IqEncoding.LISTS
+) -> pb_models.Waveform:
+    return pb_models.Waveform(sampled=sampled_waveform_to_pb(entity, encoding))
+
+
+def iq_waveform_from_pb(pb: pb_models.Waveform) -> IqWaveform | WaveformRef:
     _, val = betterproto2.which_one_of(pb, "waveform")
     match val:
         case pb_models.SampledWaveform():
-            return IqWaveform(
-                sampling_period_fs=val.sampling_period_fs,
-                iq_array=iq_array_from_lists(val.i_samples, val.q_samples),
-            )
+            return sampled_waveform_from_pb(val)
+        case pb_models.WaveformRef():
+            return WaveformRef(digest=val.digest)
         case _:
             raise ValueError(f"Unsupported waveform type: {type(val)}")
 
 
+def _library_entry_to_pb(
+    entity: IqWaveform | WaveformRef,
+    encoding: IqEncoding,
+    uploaded_digests: Container[bytes] | None,
+) -> pb_models.Waveform:
+    if isinstance(entity, WaveformRef):
+        return pb_models.Waveform(ref=pb_models.WaveformRef(digest=entity.digest))
+    if uploaded_digests is None:
+        return iq_waveform_to_pb(entity, encoding)
+    digest = iq_waveform_digest(entity, encoding)
+    if digest in uploaded_digests:
+        return pb_models.Waveform(ref=pb_models.WaveformRef(digest=digest))
+    return pb_models.Waveform(
+        sampled=sampled_waveform_to_pb(entity, encoding), digest=digest
+    )
+
+
 def _waveform_event_to_pb(
     entity: WaveformEvent,
 ) -> pb_models.SetFixedTimelineDirectiveWaveformEvent:
@@ -73,6 +157,22 @@ def _waveform_event_to_pb(
     )
 
 
+def _waveform_events_to_pb(
+    events: Sequence[WaveformEvent],
+) -> list[pb_models.SetFixedTimelineDirectiveWaveformEvent]:
+    if not isinstance(events, WaveformEventTable):
+        return [_waveform_event_to_pb(e) for e in events]
+    return [
+        pb_models.SetFixedTimelineDirectiveWaveformEvent(
+            waveform_index=index,
+            start_offset_samples=offset,
+            gain=gain,
+            phase_offset_deg=phase,
+        )
+        for index, offset, gain, phase in events.rows()
+    ]
+
+
 def _waveform_event_from_pb(
     pb: pb_models.SetFixedTimelineDirectiveWaveformEvent,
 ) -> WaveformEvent:
@@ -104,7 +204,21 @@ def _capture_window_from_pb(
     )
 
 
-def directive_to_pb(entity: Directive) -> pb_models.Directive:
+def directive_to_pb(
+    entity: Directive,
+    iq_encoding: IqEncoding = IqEncoding.LISTS,
+    uploaded_digests: Container[bytes] | None = None,
+) -> pb_models.Directive:
+    """Convert a directive to its protobuf message.
+
+    Args:
+        entity: The directive.
+        iq_encoding: Encoding of waveform samples.
+        uploaded_digests: Digests of waveforms the instrument already holds.
+            When given, waveform library entries are sent with their digest,
+            or as a `WaveformRef` if the digest is in the container. `None`
+            sends plain samples, which every server understands.
+    """
     match entity:
         case SetFrequency():
             ft_cmd = pb_models.FixedTimelineDirective(
@@ -123,8 +237,11 @@ def directive_to_pb(entity: Directive) -> pb_models.Directive:
                 )
             )
         case SetFixedTimeline():
-            library_pb = [iq_waveform_to_pb(w) for w in entity.waveform_library]
-            events_pb = [_waveform_event_to_pb(e) for e in entity.events]
+            library_pb = [
+                _library_entry_to_pb(w, iq_encoding, uploaded_digests)
+                for w in entity.waveform_library
+            ]
+            events_pb = _waveform_events_to_pb(entity.events)
             capture_windows_pb = [
                 _capture_window_to_pb(e) for e in entity.capture_windows
             ]
@@ -1,62 +1,233 @@
+from collections.abc import Callable
+from functools import partial
+
 import betterproto2
+import numpy as np
+import numpy.typing as npt
 
 import quelware_core.pb.quelware.models.v1 as pb_models
-from quelware_core.entities.result import ResultContainer
+from quelware_core.entities.result import (
+    ArrayAllocator,
+    CaptureWindowName,
+    ColumnarResultContainer,
+    IntegerArray,
+    IqWaveformBlock,
+    LazyResultContainer,
+    ResultContainer,
+)
+from quelware_core.entities.waveform.sampled import (
+    IqArray,
+    IqEncoding,
+    IqWaveform,
+    iq_array_from_packed,
+    iq_array_to_packed,
+    iq_encoding_dtype,
+    iq_quantization_scale,
+    packed_iq_length,
+)
 from quelware_core.pb_converter.directive import (
-    iq_waveform_from_pb,
-    iq_waveform_to_pb,
+    iq_encoding_from_pb,
+    iq_encoding_to_pb,
+    sampled_waveform_from_pb,
+    sampled_waveform_into,
+    sampled_waveform_length,
+    sampled_waveform_to_pb,
 )
 
 
-def _complex_to_pb_point(val: complex) -> pb_models.IqPoint:
-    return pb_models.IqPoint(i=val.real, q=val.imag)
+def _allocate_in_memory(
+    name: CaptureWindowName, shape: tuple[int, ...], dtype: np.dtype
+) -> npt.NDArray:
+    return np.empty(shape, dtype=dtype)
 
 
-def _pb_point_to_complex(pb: pb_models.IqPoint) -> complex:
-    return complex(pb.i, pb.q)
+def _complex_to_pb_point(val: complex) -> pb_models.IqPoint:
+    return pb_models.IqPoint(i=val.real, q=val.imag)
 
 
-def result_container_to_pb(entity: ResultContainer) -> pb_models.ResultContainer:
+def _iq_point_list_to_pb(
+    points: IqArray, encoding: IqEncoding
+) -> pb_models.IqPointList:
+    if encoding is IqEncoding.LISTS:
+        return pb_models.IqPointList(
+            iq_points=[_complex_to_pb_point(p) for p in points.tolist()]
+        )
+    scale = iq_quantization_scale(points, encoding)
+    return pb_models.IqPointList(
+        packed_iq=iq_array_to_packed(points, encoding, scale),
+        packed_iq_encoding=iq_encoding_to_pb(encoding),
+        packed_iq_scale=scale,
+    )
+
+
+def _iq_point_list_from_pb(
+    pb: pb_models.IqPointList,
+    allocate: ArrayAllocator | None = None,
+    name: CaptureWindowName = "",
+) -> IqArray:
+    encoding = iq_encoding_from_pb(pb.packed_iq_encoding)
+    if encoding is not IqEncoding.LISTS:
+        if allocate is None:
+            return iq_array_from_packed(pb.packed_iq, encoding, pb.packed_iq_scale)
+        out = allocate(
+            name,
+            (packed_iq_length(pb.packed_iq, encoding),),
+            iq_encoding_dtype(encoding),
+        )
+        return iq_array_from_packed(pb.packed_iq, encoding, pb.packed_iq_scale, out)
+    interleaved = np.fromiter(
+        (c for pt in pb.iq_points for c in (pt.i, pt.q)),
+        dtype=np.float64,
+        count=2 * len(pb.iq_points),
+    )
+    if allocate is None:
+        return interleaved.view(np.complex128)
+    out = allocate(name, (len(pb.iq_points),), np.dtype(np.complex128))
+    out.view(np.float64)[:] = interleaved
+    return out
+
+
+def _integer_result_to_pb(
+    integers: IntegerArray, encoding: IqEncoding
+) -> pb_models.IntegerResult:
+    if encoding is IqEncoding.LISTS:
+        return pb_models.IntegerResult(integers=integers.tolist())
+    return pb_models.IntegerResult(
+        packed_integers=np.ascontiguousarray(integers, dtype="<i8").tobytes(),
+        packed=True,
+    )
+
+
+def _integer_result_from_pb(
+    pb: pb_models.IntegerResult,
+    allocate: ArrayAllocator | None = None,
+    name: CaptureWindowName = "",
+) -> IntegerArray:
+    if pb.packed:
+        integers = np.frombuffer(pb.packed_integers, dtype="<i8")
+    else:
+        integers = np.array(pb.integers, dtype=np.int64)
+    if allocate is None:
+        return integers
+    out = allocate(name, integers.shape, np.dtype(np.int64))
+    out[:] = integers
+    return out
+
+
+def result_container_to_pb(
+    entity: ResultContainer, iq_encoding: IqEncoding = IqEncoding.LISTS
+) -> pb_models.ResultContainer:
     pb = pb_models.ResultContainer()
 
     for name, waves in entity.iq_waveform_result.items():
-        waveforms_pb = [iq_waveform_to_pb(w) for w in waves]
         pb.iq_result[name] = pb_models.IqResult(
             waveforms=pb_models.WaveformList(
-                waveforms=[w.sampled for w in waveforms_pb if w.sampled]
+                waveforms=[sampled_waveform_to_pb(w, iq_encoding) for w in waves]
             )
         )
 
-    for name, points in entity.iq_point_result.items():
+    if isinstance(entity, ColumnarResultContainer):
+        point_arrays = entity.iq_point_arrays
+        integer_arrays = entity.integer_arrays
+    else:
+        point_arrays = {
+            name: np.asarray(points, dtype=np.complex128)
+            for name, points in entity.iq_point_result.items()
+        }
+        integer_arrays = {
+            name: np.asarray(ints, dtype=np.int64)
+            for name, ints in entity.integer_result.items()
+        }
+
+    for name, points in point_arrays.items():
         pb.iq_result[name] = pb_models.IqResult(
-            iq_points=pb_models.IqPointList(
-                iq_points=[_complex_to_pb_point(p) for p in points]
-            )
+            iq_points=_iq_point_list_to_pb(points, iq_encoding)
         )
 
-    for name, int_data in entity.integer_result.items():
-        pb.integer_result[name] = pb_models.IntegerResult(integers=int_data)
+    for name, ints in integer_arrays.items():
+        pb.integer_result[name] = _integer_result_to_pb(ints, iq_encoding)
 
     return pb
 
 
-def result_container_from_pb(pb: pb_models.ResultContainer) -> ResultContainer:
-    entity = ResultContainer()
+def _is_stackable(pb: pb_models.WaveformList) -> bool:
+    if not pb.waveforms:
+        return False
+    first = pb.waveforms[0]
+    n_samples = sampled_waveform_length(first)
+    return all(
+        wf.sampling_period_fs == first.sampling_period_fs
+        and wf.packed_iq_encoding == first.packed_iq_encoding
+        and sampled_waveform_length(wf) == n_samples
+        for wf in pb.waveforms
+    )
+
+
+def _waveform_list_to_block(
+    pb: pb_models.WaveformList,
+    allocate: ArrayAllocator = _allocate_in_memory,
+    name: CaptureWindowName = "",
+) -> IqWaveformBlock:
+    first = pb.waveforms[0]
+    n_samples = sampled_waveform_length(first)
+    dtype = iq_encoding_dtype(iq_encoding_from_pb(first.packed_iq_encoding))
+    iq_array = allocate(name, (len(pb.waveforms), n_samples), dtype)
+    for row, wf in zip(iq_array, pb.waveforms, strict=True):
+        sampled_waveform_into(wf, row)
+    return IqWaveformBlock(first.sampling_period_fs, iq_array)
+
+
+def _waveform_list_from_pb(pb: pb_models.WaveformList) -> list[IqWaveform]:
+    return [sampled_waveform_from_pb(wf) for wf in pb.waveforms]
+
+
+def result_container_from_pb(
+    pb: pb_models.ResultContainer,
+    allocate: ArrayAllocator | None = None,
+    lazy: bool = False,
+) -> ColumnarResultContainer:
+    """Decode a result container into per-window arrays.
+
+    Args:
+        pb: The result container message.
+        allocate: Called once per capture window for the array its data is
+            decoded into, e.g. to place large results in memory-mapped files.
+            By default, arrays live in memory and packed float data is
+            returned as views of the message buffers. Waveform windows that
+            cannot be stacked into a block are always decoded in memory.
+        lazy: Return a `LazyResultContainer` that keeps ``pb`` and decodes
+            each window when it is first read.
+    """
+    blocks: dict[str, Callable[[], IqWaveformBlock]] = {}
+    ragged: dict[str, Callable[[], list[IqWaveform]]] = {}
+    points: dict[str, Callable[[], IqArray]] = {}
+    integers: dict[str, Callable[[], IntegerArray]] = {}
 
     for name, iq_res_pb in pb.iq_result.items():
         _, val = betterproto2.which_one_of(iq_res_pb, "result")
         match val:
+            case pb_models.WaveformList() if _is_stackable(val):
+                blocks[name] = partial(
+                    _waveform_list_to_block, val, allocate or _allocate_in_memory, name
+                )
             case pb_models.WaveformList():
-                entity.iq_waveform_result[name] = [
-                    iq_waveform_from_pb(pb_models.Waveform(sampled=wf))
-                    for wf in val.waveforms
-                ]
+                ragged[name] = partial(_waveform_list_from_pb, val)
             case pb_models.IqPointList():
-                entity.iq_point_result[name] = [
-                    _pb_point_to_complex(pt) for pt in val.iq_points
-                ]
+                points[name] = partial(_iq_point_list_from_pb, val, allocate, name)
 
     for name, int_res_pb in pb.integer_result.items():
-        entity.integer_result[name] = list(int_res_pb.integers)
-
-    return entity
+        integers[name] = partial(_integer_result_from_pb, int_res_pb, allocate, name)
+
+    if lazy:
+        return LazyResultContainer(
+            iq_waveform_blocks=blocks,
+            iq_point_arrays=points,
+            integer_arrays=integers,
+            ragged_iq_waveform_result=ragged,
+        )
+    return ColumnarResultContainer(
+        iq_waveform_blocks={k: f() for k, f in blocks.items()},
+        iq_point_arrays={k: f() for k, f in points.items()},
+        integer_arrays={k: f() for k, f in integers.items()},
+        ragged_iq_waveform_result={k: f() for k, f in ragged.items()},
+    )
@@ -1,12 +1,15 @@
 import numpy as np
+import pytest
 
 from quelware_core.entities.directives import (
     CaptureWindow,
     SetFixedTimeline,
     SetFrequency,
     WaveformEvent,
+    WaveformEventTable,
 )
-from quelware_core.entities.waveform.sampled import IqWaveform
+from quelware_core.entities.waveform.ref import WaveformRef, iq_waveform_digest
+from quelware_core.entities.waveform.sampled import IqEncoding, IqWaveform
 from quelware_core.pb_converter.directive import directive_from_pb, directive_to_pb
 
 
@@ -63,3 +66,186 @@ def test_set_fixed_timeline_roundtrip():
     assert recovered.capture_windows[0].name == "cap1"
     assert recovered.capture_windows[0].start_offset_samples == 20
     assert recovered.capture_windows[0].length_samples == 100
+
+
+def _set_fixed_timeline_with(iq_array):
+    return SetFixedTimeline(
+        waveform_library=[IqWaveform(sampling_period_fs=1000, iq_array=iq_array)],
+        events=[],
+        capture_windows=[],
+        length=16,
+        iterations=1,
+    )
+
+
+def test_set_fixed_timeline_packed_float32_roundtrip():
+    iq_array = np.array([1.0 + 0.5j, -0.25 - 1.0j, 0.125j])
+    pb = directive_to_pb(
+        _set_fixed_timeline_with(iq_array), iq_encoding=IqEncoding.PACKED_FLOAT32
+    )
+
+    sampled = pb.fixed_timeline_sampled_waveform.set_timeline.waveform_library[0]
+    assert sampled.sampled.i_samples == []
+    assert len(sampled.sampled.packed_iq) == 8 * len(iq_array)
+
+    recovered = directive_from_pb(pb)
+    assert isinstance(recovered, SetFixedTimeline)
+    decoded = recovered.waveform_library[0].iq_array
+    assert decoded.dtype == np.complex64
+    assert not decoded.flags.writeable
+    np.testing.assert_array_equal(decoded, iq_array.astype(np.complex64))
+
+
+def test_set_fixed_timeline_packed_int16_roundtrip():
+    iq_array = np.array([1.0 + 0.5j, -1.0 - 0.25j, 0.0 + 0.0j])
+    pb = directive_to_pb(
+        _set_fixed_timeline_with(iq_array), iq_encoding=IqEncoding.PACKED_INT16
+    )
+
+    sampled = pb.fixed_timeline_sampled_waveform.set_timeline.waveform_library[0]
+    assert len(sampled.sampled.packed_iq) == 4 * len(iq_array)
+
+    recovered = directive_from_pb(pb)
+    assert isinstance(recovered, SetFixedTimeline)
+    np.testing.assert_allclose(
+        recovered.waveform_library[0].iq_array, iq_array, atol=1 / 32767
+    )
+
+
+def test_set_fixed_timeline_packed_float64_is_lossless():
+    rng = np.random.default_rng(0)
+    iq_array = rng.uniform(-1, 1, 64) + 1j * rng.uniform(-1, 1, 64)
+    pb = directive_to_pb(
+        _set_fixed_timeline_with(iq_array), iq_encoding=IqEncoding.PACKED_FLOAT64
+    )
+
+    recovered = directive_from_pb(directive_to_pb(directive_from_pb(pb)))
+    assert isinstance(recovered, SetFixedTimeline)
+    decoded = recovered.waveform_library[0].iq_array
+    assert decoded.dtype == np.complex128
+    np.testing.assert_array_equal(decoded, iq_array)
+
+
+def test_set_fixed_timeline_packed_int32_scales_out_of_range_samples():
+    iq_array = np.array([4.0 + 0.5j, -2.0 - 0.25j, 0.0 + 1.0j])
+    pb = directive_to_pb(
+        _set_fixed_timeline_with(iq_array), iq_encoding=IqEncoding.PACKED_INT32
+    )
+
+    sampled = pb.fixed_timeline_sampled_waveform.set_timeline.waveform_library[0]
+    assert len(sampled.sampled.packed_iq) == 8 * len(iq_array)
+    assert sampled.sampled.packed_iq_scale == 4.0 / (2**31 - 1)
+
+    recovered = directive_from_pb(pb)
+    assert isinstance(recovered, SetFixedTimeline)
+    np.testing.assert_allclose(
+        recovered.waveform_library[0].iq_array, iq_array, atol=4.0 / 2**31
+    )
+
+
+def test_set_fixed_timeline_refers_to_uploaded_waveforms_by_digest():
+    known = IqWaveform(sampling_period_fs=1000, iq_array=np.array([1.0 + 0.0j]))
+    new = IqWaveform(sampling_period_fs=1000, iq_array=np.array([0.0 + 1.0j]))
+    directive = SetFixedTimeline(
+        waveform_library=[known, new],
+        events=[],
+        capture_windows=[],
+        length=16,
+        iterations=1,
+    )
+    known_digest = iq_waveform_digest(known, IqEncoding.LISTS)
+
+    pb = directive_to_pb(directive, uploaded_digests={known_digest})
+
+    library = pb.fixed_timeline_sampled_waveform.set_timeline.waveform_library
+    assert library[0].sampled is None
+    assert library[0].ref.digest == known_digest
+    assert library[1].sampled is not None
+    assert library[1].digest == iq_waveform_digest(new, IqEncoding.LISTS)
+
+    recovered = directive_from_pb(pb)
+    assert isinstance(recovered, SetFixedTimeline)
+    assert recovered.waveform_library[0] == WaveformRef(known_digest)
+    assert isinstance(recovered.waveform_library[1], IqWaveform)
+
+
+def test_iq_waveform_digest_depends_on_samples_period_and_encoding():
+    iq_array = np.array([0.5 + 0.5j, -0.5j])
+    base = iq_waveform_digest(IqWaveform(1000, iq_array), IqEncoding.LISTS)
+
+    assert base == iq_waveform_digest(
+        IqWaveform(1000, iq_array.copy()), IqEncoding.LISTS
+    )
+    assert base != iq_waveform_digest(IqWaveform(2000, iq_array), IqEncoding.LISTS)
+    assert base != iq_waveform_digest(IqWaveform(1000, -iq_array), IqEncoding.LISTS)
+    assert base != iq_waveform_digest(
+        IqWaveform(1000, iq_array), IqEncoding.PACKED_INT16
+    )
+
+
+def test_iq_waveform_digest_is_cached_for_read_only_arrays():
+    iq_array = np.array([0.5 + 0.5j, -0.5j])
+    iq_array.flags.writeable = False
+    waveform = IqWaveform(1000, iq_array)
+    digest = iq_waveform_digest(waveform, IqEncoding.LISTS)
+
+    assert iq_waveform_digest(waveform, IqEncoding.LISTS) is digest
+    waveform.iq_array = -iq_array
+    assert iq_waveform_digest(waveform, IqEncoding.LISTS) != digest
+
+    writable = IqWaveform(1000, np.array([0.5 + 0.5j, -0.5j]))
+    before = iq_waveform_digest(writable, IqEncoding.LISTS)
+    writable.iq_array[0] = 0
+    assert iq_waveform_digest(writable, IqEncoding.LISTS) != before
+
+
+def test_set_fixed_timeline_with_event_table_roundtrip():
+    events = [
+        WaveformEvent(0, 10, 0.5, 90.0),
+        WaveformEvent(1, 20, 1.0, 0.0),
+    ]
+    table = WaveformEventTable.from_events(events)
+    directive = SetFixedTimeline(
+        waveform_library=[
+            IqWaveform(1000, np.array([0.5 + 0j])),
+            IqWaveform(1000, np.array([0.5j])),
+        ],
+        events=table,
+        capture_windows=[],
+        length=32,
+        iterations=1,
+    )
+
+    recovered = directive_from_pb(directive_to_pb(directive))
+
+    assert list(table) == events
+    assert table[1] == events[1]
+    assert list(table[:1]) == events[:1]
+    assert isinstance(recovered, SetFixedTimeline)
+    assert list(recovered.events) == events
+
+
+def test_event_table_compares_by_value():
+    events = [WaveformEvent(0, 10, 0.5, 90.0), WaveformEvent(1, 20, 1.0, 0.0)]
+    table = WaveformEventTable.from_events(events)
+
+    assert table == WaveformEventTable.from_events(events)
+    assert table == events
+    assert events == table
+    assert table != events[:1]
+    assert table != WaveformEventTable.from_events(events[::-1])
+    assert table[:1] == events[:1]
+    with pytest.raises(TypeError):
+        hash(table)
+
+    def timeline(events):
+        return SetFixedTimeline(
+            waveform_library=[],
+            events=events,
+            capture_windows=[],
+            length=32,
+            iterations=1,
+        )
+
+    assert timeline(table) == timeline(WaveformEventTable.from_events(events))
+    assert timeline(table) == timeline(events)
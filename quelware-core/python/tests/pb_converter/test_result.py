@@ -1,7 +1,19 @@
+import dataclasses
+
 import numpy as np
+import pytest
 
-from quelware_core.entities.result import ResultContainer
-from quelware_core.entities.waveform.sampled import IqWaveform
+from quelware_core.entities.result import (
+    ColumnarResultContainer,
+    LazyResultContainer,
+    ResultContainer,
+)
+from quelware_core.entities.waveform.sampled import (
+    IqEncoding,
+    IqWaveform,
+    iq_quantization_is_exact,
+    iq_quantization_scale,
+)
 from quelware_core.pb_converter.result import (
     result_container_from_pb,
     result_container_to_pb,
@@ -80,3 +92,213 @@ def test_result_container_mixed_roundtrip():
 
     assert recovered.integer_result["int_ch"] == [123]
     assert recovered.integer_result["empty_int_ch"] == []
+
+
+def test_result_container_from_pb_stacks_waveforms_into_block():
+    rng = np.random.default_rng(0)
+    iq_array = rng.uniform(-1, 1, (3, 5)) + 1j * rng.uniform(-1, 1, (3, 5))
+    original = ResultContainer(
+        iq_waveform_result={"raw": [IqWaveform(400_000, row) for row in iq_array]},
+        iq_point_result={"points": [1 + 2j, 3 - 4j]},
+        integer_result={"ints": [7, -8]},
+    )
+
+    recovered = result_container_from_pb(result_container_to_pb(original))
+
+    assert isinstance(recovered, ColumnarResultContainer)
+    block = recovered.iq_waveform_blocks["raw"]
+    assert block.sampling_period_fs == 400_000
+    assert block.iq_array.shape == (3, 5)
+    np.testing.assert_array_equal(block.iq_array, iq_array)
+    np.testing.assert_array_equal(
+        recovered.iq_point_arrays["points"], np.array([1 + 2j, 3 - 4j])
+    )
+    assert recovered.integer_arrays["ints"].dtype == np.int64
+
+    waves = recovered.iq_waveform_result["raw"]
+    assert waves is recovered.iq_waveform_result["raw"]
+    assert np.shares_memory(waves[1].iq_array, block.iq_array)
+    assert recovered.integer_result["ints"] == [7, -8]
+
+
+def test_result_container_to_columnar():
+    original = ResultContainer(
+        iq_waveform_result={
+            "uniform": [IqWaveform(100, np.array([1j, 2j])) for _ in range(4)],
+            "ragged": [
+                IqWaveform(100, np.array([1j])),
+                IqWaveform(100, np.array([1j, 2j])),
+            ],
+        },
+    )
+
+    columnar = original.to_columnar()
+
+    assert columnar.iq_waveform_blocks["uniform"].iq_array.shape == (4, 2)
+    assert "ragged" not in columnar.iq_waveform_blocks
+    assert len(columnar.iq_waveform_result["ragged"]) == 2
+    assert set(columnar.iq_waveform_result) == {"uniform", "ragged"}
+
+
+def test_columnar_container_keeps_result_container_api():
+    columnar = ResultContainer(
+        iq_waveform_result={"cap": [IqWaveform(100, np.array([1j, 2j]))] * 2},
+        integer_result={"count": [1, 2]},
+    ).to_columnar()
+
+    copy = dataclasses.replace(columnar, integer_result={"count": [3]})
+    assert isinstance(copy, ColumnarResultContainer)
+    assert copy.integer_arrays["count"].tolist() == [3]
+    assert copy.iq_waveform_blocks["cap"].iq_array.shape == (2, 2)
+    assert columnar.integer_result["count"] == [1, 2]
+
+    columnar.integer_result["extra"] = [5, 6]
+    columnar.iq_point_result["points"] = [1 + 1j]
+    columnar.iq_waveform_result["cap"] = [IqWaveform(100, np.array([3j]))]
+    del columnar.integer_result["count"]
+    assert columnar.integer_arrays["extra"].tolist() == [5, 6]
+    assert columnar.iq_point_arrays["points"].tolist() == [1 + 1j]
+    assert columnar.iq_waveform_blocks["cap"].iq_array.tolist() == [[3j]]
+    assert set(columnar.integer_result) == set(columnar.integer_arrays) == {"extra"}
+
+    lazy = LazyResultContainer(integer_arrays={"count": lambda: np.arange(2)})
+    lazy_copy = dataclasses.replace(lazy)
+    assert isinstance(lazy_copy, LazyResultContainer)
+    assert lazy_copy.integer_result["count"] == [0, 1]
+
+
+def test_columnar_container_windows_reject_in_place_edits():
+    columnar = ColumnarResultContainer(iq_point_arrays={"c": np.array([1j, 2j])})
+
+    with pytest.raises(AttributeError):
+        columnar.iq_point_result["c"].append(5j)  # type: ignore[attr-defined]
+    with pytest.raises(TypeError):
+        columnar.iq_point_result["c"][0] = 5j  # type: ignore[index]
+    assert columnar.iq_point_arrays["c"].tolist() == [1j, 2j]
+
+    columnar.iq_point_result["c"] = [*columnar.iq_point_result["c"], 5j]
+    assert columnar.iq_point_result["c"] == [1j, 2j, 5j]
+    assert columnar.iq_point_arrays["c"].tolist() == [1j, 2j, 5j]
+    assert len(result_container_to_pb(columnar).iq_result["c"].iq_points.iq_points) == 3
+
+
+def test_result_container_packed_points_and_integers_roundtrip():
+    points = np.array([1.0 + 2.0j, -3.0 - 4.0j, 0.5j])
+    ints = np.array([2**40, -1, 0], dtype=np.int64)
+    original = ColumnarResultContainer(
+        iq_point_arrays={"points": points}, integer_arrays={"ints": ints}
+    )
+
+    pb = result_container_to_pb(original, iq_encoding=IqEncoding.PACKED_FLOAT64)
+    assert pb.iq_result["points"].iq_points.iq_points == []
+    assert pb.integer_result["ints"].integers == []
+
+    recovered = result_container_from_pb(pb)
+
+    assert recovered.iq_point_arrays["points"].dtype == np.complex128
+    np.testing.assert_array_equal(recovered.iq_point_arrays["points"], points)
+    np.testing.assert_array_equal(recovered.integer_arrays["ints"], ints)
+
+
+def test_result_container_float32_points_decode_to_complex64():
+    original = ResultContainer(iq_point_result={"points": [0.25 + 0.5j]})
+
+    pb = result_container_to_pb(original, iq_encoding=IqEncoding.PACKED_FLOAT32)
+    recovered = result_container_from_pb(pb)
+
+    assert recovered.iq_point_arrays["points"].dtype == np.complex64
+    assert recovered.iq_point_result["points"] == [0.25 + 0.5j]
+
+
+def test_result_container_int16_points_keep_scale():
+    points = np.array([1000.0 + 2000.0j, -3000.0 - 0.0j, 0.0 + 1.0j])
+    original = ColumnarResultContainer(iq_point_arrays={"points": points})
+
+    pb = result_container_to_pb(original, iq_encoding=IqEncoding.PACKED_INT16)
+    assert len(pb.iq_result["points"].iq_points.packed_iq) == 4 * len(points)
+
+    recovered = result_container_from_pb(pb)
+
+    # Integer-valued data such as ADC counts is sent with a step of 1.
+    assert pb.iq_result["points"].iq_points.packed_iq_scale == 1.0
+    assert recovered.iq_point_arrays["points"].dtype == np.complex64
+    np.testing.assert_array_equal(recovered.iq_point_arrays["points"], points)
+
+
+def test_quantization_exactness_check():
+    counts = np.array([1234 + 5j, -567 - 3j, 20000 + 1j])
+    assert iq_quantization_scale(counts, IqEncoding.PACKED_INT16) == 1.0
+    assert iq_quantization_is_exact(counts, IqEncoding.PACKED_INT16, 1.0)
+
+    too_large = counts * 2
+    scale = iq_quantization_scale(too_large, IqEncoding.PACKED_INT16)
+    assert scale == 40000 / 32767
+    assert not iq_quantization_is_exact(too_large, IqEncoding.PACKED_INT16, scale)
+    assert iq_quantization_is_exact(too_large, IqEncoding.PACKED_INT32, 1.0)
+
+    unit = np.array([0.5 + 0.1j])
+    assert not iq_quantization_is_exact(unit, IqEncoding.PACKED_INT16)
+    assert not iq_quantization_is_exact(unit, IqEncoding.PACKED_FLOAT32)
+    assert iq_quantization_is_exact(unit, IqEncoding.PACKED_FLOAT64)
+
+
+def test_result_container_from_pb_decodes_into_allocated_arrays():
+    allocated = {}
+
+    def allocate(name, shape, dtype):
+        allocated[(name, np.dtype(dtype).kind)] = shape
+        return np.zeros(shape, dtype=dtype)
+
+    original = ResultContainer(
+        iq_waveform_result={
+            "cap": [IqWaveform(1000, np.array([1 + 2j, 3 + 4j])) for _ in range(3)]
+        },
+        iq_point_result={"avg": [0.5 + 0.25j, -1j]},
+        integer_result={"count": [7, 8]},
+    )
+
+    recovered = result_container_from_pb(result_container_to_pb(original), allocate)
+
+    assert allocated == {("cap", "c"): (3, 2), ("avg", "c"): (2,), ("count", "i"): (2,)}
+    assert recovered.iq_point_result["avg"] == [0.5 + 0.25j, -1j]
+    assert recovered.integer_arrays["count"].tolist() == [7, 8]
+    np.testing.assert_array_equal(
+        recovered.iq_waveform_blocks["cap"].iq_array[2], np.array([1 + 2j, 3 + 4j])
+    )
+
+
+def test_result_container_from_pb_lazy_decodes_windows_on_access(monkeypatch):
+    import quelware_core.pb_converter.result as result_converter
+
+    original = ResultContainer(
+        iq_waveform_result={
+            "cap": [IqWaveform(1000, np.array([1 + 2j, 3 + 4j])) for _ in range(3)],
+            "ragged": [
+                IqWaveform(1000, np.array([1j])),
+                IqWaveform(1000, np.array([1j, 2j])),
+            ],
+        },
+        integer_result={"count": [7, 8]},
+    )
+    pb = result_container_to_pb(original, iq_encoding=IqEncoding.PACKED_FLOAT64)
+    decoded = []
+    decode_block = result_converter._waveform_list_to_block
+    monkeypatch.setattr(
+        result_converter,
+        "_waveform_list_to_block",
+        lambda pb, *args: decoded.append(pb) or decode_block(pb, *args),
+    )
+
+    recovered = result_container_from_pb(pb, lazy=True)
+
+    assert isinstance(recovered, LazyResultContainer)
+    assert set(recovered.iq_waveform_result) == {"cap", "ragged"}
+    assert "cap" in recovered.iq_waveform_blocks
+    assert decoded == []
+    assert recovered.integer_arrays["count"].tolist() == [7, 8]
+    assert decoded == []
+
+    block = recovered.iq_waveform_blocks["cap"]
+    assert block is recovered.iq_waveform_blocks["cap"]
+    assert len(decoded) == 1
+    assert len(recovered.iq_waveform_result["ragged"][1].iq_array) == 2